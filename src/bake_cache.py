@@ -0,0 +1,90 @@
+import os
+import json
+import hashlib
+
+# ✅ Marker files kept inside every bake cache directory
+BAKE_PROGRESS_FILE = "bake_progress.json"
+BAKE_COMPLETE_FILE = "bake_complete.json"
+
+
+def bake_cache_key(json_file, **parameters):
+    """Hashes the simulation JSON and the domain parameters into a cache key.
+
+    Args:
+        json_file (str): Path to `fluid_dynamics_animation.json`.
+        **parameters: Scene parameters that affect the bake (gravity, initial
+            velocity, domain scale, resolution, frame range, ...).
+
+    Returns:
+        str: Hex SHA-256 digest identifying the bake.
+    """
+    digest = hashlib.sha256()
+    with open(json_file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(json.dumps(parameters, sort_keys=True, default=list).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def is_bake_complete(cache_dir, key):
+    """Returns True if the cache directory holds a finished bake for this key."""
+    marker = os.path.join(cache_dir, BAKE_COMPLETE_FILE)
+    if not os.path.exists(marker):
+        return False
+    try:
+        with open(marker, "r") as f:
+            return json.load(f).get("key") == key
+    except (OSError, json.JSONDecodeError):
+        return False
+
+
+def load_baked_until(cache_dir, key):
+    """Returns the last frame of the last finished chunk, or None if nothing is baked yet."""
+    progress = os.path.join(cache_dir, BAKE_PROGRESS_FILE)
+    if not os.path.exists(progress):
+        return None
+    try:
+        with open(progress, "r") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return data.get("baked_until") if data.get("key") == key else None
+
+
+def save_baked_until(cache_dir, key, frame):
+    """Records that every frame up to `frame` has been baked."""
+    _write_json(os.path.join(cache_dir, BAKE_PROGRESS_FILE), {"key": key, "baked_until": frame})
+
+
+def mark_bake_complete(cache_dir, key, parameters):
+    """Marks the bake as finished so later runs can reuse it as-is."""
+    _write_json(os.path.join(cache_dir, BAKE_COMPLETE_FILE), {"key": key, "parameters": parameters})
+
+
+def plan_bake_chunks(frame_start, frame_end, chunk_frames, baked_until=None):
+    """Splits the frame range into chunks, skipping those already baked.
+
+    Returns:
+        list: (chunk_start, chunk_end) tuples, inclusive.
+    """
+    first = frame_start if baked_until is None else max(frame_start, baked_until + 1)
+    chunk_frames = max(1, chunk_frames)
+    return [(start, min(start + chunk_frames - 1, frame_end)) for start in range(first, frame_end + 1, chunk_frames)]
+
+
+def resume_pause_frame(chunk_start, frame_start):
+    """Pause frame that makes Blender's bake_data continue into a chunk.
+
+    The bake keeps starting at `frame_start` (the domain's cache_frame_start);
+    Blender resumes a paused bake from its pause frame, so a chunk continues
+    after the last frame baked so far. 0 means a fresh bake.
+    """
+    return chunk_start - 1 if chunk_start > frame_start else 0
+
+
+def _write_json(path, data):
+    # Write-then-rename so an interrupted run never leaves a half-written marker
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(data, f, indent=2, default=list)
+    os.replace(temp_path, path)
@@ -1,16 +1,27 @@
 import os
 import json
 import sys
+import time
 
 # ✅ Retrieve path variables from environment (set by GitHub Actions)
 OUTPUT_FOLDER = os.getenv("OUTPUT_FOLDER", "./RenderedOutput")
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGET_LOG_FILE = "render_budget_log.json"
 
 def run_blender_render(simulation_data):
     """Executes Blender rendering in CLI mode with optimized settings based on simulation data.
 
+    When `render_time_budget` (seconds) is set in the simulation data or the
+    RENDER_TIME_BUDGET environment variable, Cycles samples, adaptive-sampling
+    threshold and resolution are adjusted per frame by `RenderBudgetController`
+    so the job finishes within the budget (frames rendered at reduced resolution
+    are scaled back to the full size); the settings used for every frame are
+    written to `render_budget_log.json` in the output folder.
+
     Args:
         simulation_data (dict): A dictionary containing the simulation parameters.
     """
+    job_start_time = time.time()
     print("🔄 Starting rendering process with enhanced settings...")
     print(f"⚙️ Received simulation data for rendering: {json.dumps(simulation_data, indent=2)}")
 
@@ -35,11 +46,17 @@ def run_blender_render(simulation_data):
     light_location_y = simulation_data.get("light_location_y", -5)
     light_location_z = simulation_data.get("light_location_z", 5)
     cycles_samples = simulation_data.get("cycles_samples", 128)
+    render_time_budget = float(simulation_data.get("render_time_budget", os.getenv("RENDER_TIME_BUDGET", 0)) or 0)
+
+    if render_time_budget > 0:
+        print(f"⏱️ Budget mode: {num_frames} frames within {render_time_budget:.0f}s")
 
     # ✅ Generate and execute Blender rendering command
     render_command = f"""blender -b "{blend_file_path}" --python-expr "
 import bpy
 import math
+import sys
+import time
 
 try:
     # Load Blender scene
@@ -65,12 +82,45 @@ if obj:
     # ✅ Enhance render settings
     bpy.context.scene.cycles.samples = {cycles_samples}
 
+    # ✅ Budget mode: adapt quality per frame to finish within the time budget
+    controller = None
+    if {render_time_budget} > 0:
+        sys.path.insert(0, '{SRC_DIR}')
+        from render_budget import RenderBudgetController, output_size
+        controller = RenderBudgetController({render_time_budget}, {num_frames}, {cycles_samples}, start_time={job_start_time})
+        render_settings = bpy.context.scene.render
+        base_percentage = render_settings.resolution_percentage
+        full_size = output_size(render_settings.resolution_x, render_settings.resolution_y, base_percentage)
+
     # ✅ Render frames dynamically
     for frame in range(1, {num_frames + 1}):
         bpy.context.scene.frame_set(frame)
         bpy.context.scene.render.filepath = '{OUTPUT_FOLDER}/frame_' + str(frame).zfill(4)
+
+        if controller:
+            settings = controller.next_settings()
+            bpy.context.scene.cycles.samples = settings['samples']
+            bpy.context.scene.cycles.use_adaptive_sampling = True
+            bpy.context.scene.cycles.adaptive_threshold = settings['adaptive_threshold']
+            bpy.context.scene.render.resolution_percentage = max(1, base_percentage * settings['resolution_percentage'] // 100)
+            frame_start = time.time()
+
         bpy.ops.render.render(write_still=True)
 
+        if controller:
+            controller.record(frame, time.time() - frame_start, settings)
+            print(f'⏱️ Frame {{frame}}: {{settings}}')
+            if settings['resolution_percentage'] < 100:
+                # Scale reduced frames back up so every frame of the sequence has the same size
+                frame_path = bpy.context.scene.render.filepath + bpy.context.scene.render.file_extension
+                image = bpy.data.images.load(frame_path)
+                image.scale(*full_size)
+                image.save()
+                bpy.data.images.remove(image)
+
+    if controller:
+        controller.write_log('{OUTPUT_FOLDER}/{BUDGET_LOG_FILE}')
+
 else:
     print('❌ Object "MyImportedModel" not found in the Blender scene! Skipping rendering.')
     exit()
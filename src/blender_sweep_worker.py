@@ -0,0 +1,109 @@
+# src/blender_sweep_worker.py
+
+# Blender side of render_sweep.py: run inside Blender with the scene already open.
+# blender -b scene.blend --python blender_sweep_worker.py -- --queue <dir> --output-root <dir> [--worker-id N]
+#
+# The scene is loaded once per worker. Before each variant the model transform,
+# the sun light and the Cycles settings are reset to the state captured right
+# after loading, then the variant's parameters are applied the same way
+# blender_render.py applies them.
+
+import os
+import sys
+import math
+import json
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from render_sweep import claim_job, finish_job
+
+DEFAULTS = {
+    "scale_factor": 1.5,
+    "rotation_z": 45.0,
+    "num_frames": 10,
+    "light_location_x": 5,
+    "light_location_y": -5,
+    "light_location_z": 5,
+    "cycles_samples": 128,
+}
+
+
+def capture_baseline(obj, scene):
+    return {
+        "scale": tuple(obj.scale),
+        "rotation": tuple(obj.rotation_euler),
+        "samples": scene.cycles.samples,
+        "filepath": scene.render.filepath,
+    }
+
+
+def reset_scene(obj, scene, baseline):
+    obj.scale = baseline["scale"]
+    obj.rotation_euler = baseline["rotation"]
+    scene.cycles.samples = baseline["samples"]
+    scene.render.filepath = baseline["filepath"]
+
+
+def sun_light(scene):
+    light_object = bpy.data.objects.get('AutoSunLight')
+    if not light_object:
+        light_data = bpy.data.lights.new(name='AutoSunLight', type='SUN')
+        light_object = bpy.data.objects.new(name='AutoSunLight', object_data=light_data)
+        scene.collection.objects.link(light_object)
+    return light_object
+
+
+def render_variant(obj, scene, params, output_dir):
+    obj.scale *= params["scale_factor"]
+    obj.rotation_euler.z += math.radians(params["rotation_z"])
+    sun_light(scene).location = (params["light_location_x"], params["light_location_y"], params["light_location_z"])
+    scene.cycles.samples = params["cycles_samples"]
+
+    os.makedirs(output_dir, exist_ok=True)
+    for frame in range(1, params["num_frames"] + 1):
+        scene.frame_set(frame)
+        scene.render.filepath = os.path.join(output_dir, "frame_" + str(frame).zfill(4))
+        bpy.ops.render.render(write_still=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    queue_dir, output_root, worker_id = None, None, "0"
+    for i, arg in enumerate(args):
+        if arg == "--queue" and i + 1 < len(args): queue_dir = args[i+1]
+        elif arg == "--output-root" and i + 1 < len(args): output_root = args[i+1]
+        elif arg == "--worker-id" and i + 1 < len(args): worker_id = args[i+1]
+
+    if not queue_dir or not output_root:
+        print("Usage: blender -b scene.blend --python blender_sweep_worker.py -- --queue <dir> --output-root <dir>")
+        sys.exit(1)
+
+    scene = bpy.context.scene
+    obj = bpy.data.objects.get('MyImportedModel')
+    if not obj:
+        print('❌ Object "MyImportedModel" not found in the Blender scene! Worker stopping.')
+        sys.exit(1)
+    baseline = capture_baseline(obj, scene)
+
+    while True:
+        variant = claim_job(queue_dir)
+        if variant is None:
+            break
+        params = dict(DEFAULTS, **variant["params"])
+        output_dir = os.path.join(output_root, variant["name"])
+        print(f"🎬 Worker {worker_id}: rendering '{variant['name']}'")
+        start = time.time()
+        try:
+            reset_scene(obj, scene, baseline)
+            render_variant(obj, scene, params, output_dir)
+            with open(os.path.join(output_dir, "params.json"), "w") as f:
+                json.dump(params, f, indent=2)
+            finish_job(queue_dir, variant, True, {"seconds": round(time.time() - start, 2), "worker": worker_id})
+            print(f"✅ Worker {worker_id}: '{variant['name']}' done in {time.time() - start:.1f}s")
+        except Exception as e:
+            finish_job(queue_dir, variant, False, {"error": str(e), "worker": worker_id})
+            print(f"❌ Worker {worker_id}: '{variant['name']}' failed: {e}")
+
+    reset_scene(obj, scene, baseline)
@@ -20,8 +20,8 @@ else
     exit 1
 fi
 
-# Create video from rendered frames
-ffmpeg -framerate 24 -i "${OUTPUT_FOLDER}/frame_%04d.png" -c:v libx264 -pix_fmt yuv420p "${VIDEO_FILE}"
+# Create video from rendered frames (segmented parallel encode)
+python3 "$(dirname "$0")/encode_video.py" --frames-dir "${OUTPUT_FOLDER}" --output "${VIDEO_FILE}" --framerate 24
 
 # Verify video creation
 if [[ -f "${VIDEO_FILE}" ]]; then
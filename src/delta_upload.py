@@ -0,0 +1,168 @@
+# src/delta_upload.py
+
+# Deduplicated upload of render outputs: only file contents the remote store has
+# not seen before are uploaded, plus a small manifest per run.
+# Example:
+# python3 delta_upload.py upload  data/testing-input-output /engineering_simulations_pipeline/delta run_1234
+# python3 delta_upload.py restore /engineering_simulations_pipeline/delta run_1234 restored_output
+#
+# Remote layout below the base folder:
+#   objects/<ab>/<sha256>   file contents, stored once per distinct content
+#   objects/index.json      list of every object hash already uploaded
+#   manifests/<run>.json    relative path, hash and size of every file of a run
+#
+# Credentials come from APP_KEY / APP_SECRET / REFRESH_TOKEN and the backend from
+# STORAGE_BACKEND, as for the other transfer scripts.
+
+import os
+import sys
+import json
+import time
+import hashlib
+
+import storage_backends
+from download_dropbox_files import refresh_access_token, download_file_atomically
+from upload_to_dropbox import upload_files, UPLOAD_CONCURRENCY
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def object_path(remote_base, content_hash):
+    return f"{remote_base}/objects/{content_hash[:2]}/{content_hash}"
+
+
+def index_path(remote_base):
+    return f"{remote_base}/objects/index.json"
+
+
+def manifest_path(remote_base, run_id):
+    return f"{remote_base}/manifests/{run_id}.json"
+
+
+def scan_tree(local_dir):
+    """Hashes every file below a folder.
+
+    Returns:
+        list: {"path", "hash", "size"} dicts with POSIX relative paths, sorted by path.
+    """
+    entries = []
+    for directory, _, names in os.walk(local_dir):
+        for name in names:
+            local_path = os.path.join(directory, name)
+            entries.append({
+                "path": os.path.relpath(local_path, local_dir).replace(os.sep, "/"),
+                "hash": file_sha256(local_path),
+                "size": os.path.getsize(local_path),
+            })
+    return sorted(entries, key=lambda entry: entry["path"])
+
+
+def load_remote_index(backend, remote_base):
+    """Returns the set of object hashes already stored remotely."""
+    if not backend.exists(index_path(remote_base)):
+        return set()
+    return set(json.loads(backend.download(index_path(remote_base)).decode("utf-8")))
+
+
+def delta_upload(backend, local_dir, remote_base, run_id, concurrency=UPLOAD_CONCURRENCY):
+    """Uploads the contents missing from the remote store and the run manifest.
+
+    Args:
+        backend (StorageBackend): Destination store.
+        local_dir (str): Output tree of the run.
+        remote_base (str): Remote folder holding objects and manifests.
+        run_id (str): Name of the manifest for this run.
+        concurrency (int): Parallel object uploads.
+
+    Returns:
+        dict: Upload statistics, or None if some objects failed to upload.
+    """
+    entries = scan_tree(local_dir)
+    known = load_remote_index(backend, remote_base)
+
+    new_objects = {}
+    for entry in entries:
+        if entry["hash"] not in known and entry["hash"] not in new_objects:
+            new_objects[entry["hash"]] = entry
+
+    uploads = [(os.path.join(local_dir, *entry["path"].split("/")), object_path(remote_base, content_hash))
+               for content_hash, entry in new_objects.items()]
+    print(f"📦 {len(entries)} files, {len(new_objects)} new contents to upload")
+    if upload_files(backend, uploads, concurrency):
+        print("❌ Some objects failed to upload; manifest not written.", file=sys.stderr)
+        return None
+
+    # Re-read the index just before writing it so concurrent runs lose as little as possible
+    index = load_remote_index(backend, remote_base) | known | set(new_objects)
+    backend.upload(json.dumps(sorted(index)).encode("utf-8"), index_path(remote_base))
+
+    manifest = {"run_id": run_id, "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "files": entries}
+    backend.upload(json.dumps(manifest, indent=2).encode("utf-8"), manifest_path(remote_base, run_id))
+
+    stats = {
+        "files": len(entries),
+        "total_bytes": sum(entry["size"] for entry in entries),
+        "uploaded_objects": len(new_objects),
+        "uploaded_bytes": sum(entry["size"] for entry in new_objects.values()),
+    }
+    print(f"✅ Run '{run_id}' uploaded: {stats['uploaded_bytes']} of {stats['total_bytes']} bytes were new")
+    return stats
+
+
+def restore_run(backend, remote_base, run_id, local_dir):
+    """Rebuilds the output tree of a run from its manifest.
+
+    Files already present locally with the right content are kept; every
+    downloaded file is checked against its hash.
+
+    Returns:
+        bool: True if the whole tree was restored, False otherwise.
+    """
+    manifest = json.loads(backend.download(manifest_path(remote_base, run_id)).decode("utf-8"))
+    restored, reused, failed = 0, 0, 0
+    for entry in manifest["files"]:
+        local_path = os.path.join(local_dir, *entry["path"].split("/"))
+        if os.path.exists(local_path) and os.path.getsize(local_path) == entry["size"] and file_sha256(local_path) == entry["hash"]:
+            reused += 1
+            continue
+        try:
+            download_file_atomically(backend, object_path(remote_base, entry["hash"]), local_path)
+            if file_sha256(local_path) != entry["hash"]:
+                raise ValueError("content hash mismatch")
+            restored += 1
+        except Exception as e:
+            print(f"❌ Failed to restore {entry['path']}: {e}", file=sys.stderr)
+            failed += 1
+
+    print(f"✅ Run '{run_id}' restored to {local_dir}: {restored} downloaded, {reused} already present, {failed} failed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5 or sys.argv[1] not in ("upload", "restore"):
+        print("Usage: python3 delta_upload.py upload <local_dir> <remote_base> <run_id>\n"
+              "       python3 delta_upload.py restore <remote_base> <run_id> <local_dir>", file=sys.stderr)
+        sys.exit(1)
+
+    backend = storage_backends.create_backend(token_provider=lambda: refresh_access_token(
+        os.getenv("REFRESH_TOKEN"), os.getenv("APP_KEY"), os.getenv("APP_SECRET")))
+
+    if sys.argv[1] == "upload":
+        local_dir, remote_base, run_id = sys.argv[2], sys.argv[3].rstrip("/"), sys.argv[4]
+        if not os.path.isdir(local_dir):
+            print(f"❌ Error: The local folder '{local_dir}' was not found.", file=sys.stderr)
+            sys.exit(1)
+        if delta_upload(backend, local_dir, remote_base, run_id) is None:
+            sys.exit(1)
+    else:
+        remote_base, run_id, local_dir = sys.argv[2].rstrip("/"), sys.argv[3], sys.argv[4]
+        if not restore_run(backend, remote_base, run_id, local_dir):
+            sys.exit(1)
@@ -1,7 +1,14 @@
-import dropbox
 import os
+import posixpath
 import requests
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pvd_index
+import storage_backends
+from storage_backends import DEFAULT_CHUNK_SIZE
+
+# Parallel downloads used when mirroring a folder
+DOWNLOAD_CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", "4"))
 
 # Function to refresh the access token
 def refresh_access_token(refresh_token, client_id, client_secret):
@@ -33,80 +40,89 @@ def delete_from_dropbox(dbx, path, log_file):
         print(f"Failed to delete {path}, error: {e}")
         # Do not exit here, allow other operations to proceed
 
+# Function to pick the storage backend (STORAGE_BACKEND, Dropbox by default)
+def open_storage_backend(refresh_token, client_id, client_secret):
+    return storage_backends.create_backend(
+        token_provider=lambda: refresh_access_token(refresh_token, client_id, client_secret)
+    )
+
+# Function to download a single remote file so it only appears locally once complete
+def download_file_atomically(backend, remote_path, local_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+    partial_path = local_path + ".part"
+    backend.download_to_file(remote_path, partial_path, chunk_size)
+    os.replace(partial_path, local_path)  # Readers never see a half-written file
+
+# Function to mirror a remote folder with a pool of concurrent downloads
+def download_folder(backend, remote_folder, local_folder, log_file, concurrency=DOWNLOAD_CONCURRENCY, chunk_size=DEFAULT_CHUNK_SIZE, verbose=True):
+    """Downloads every file below a remote folder, keeping the folder structure.
+
+    Args:
+        backend (StorageBackend): Where the files live.
+        remote_folder (str): Remote folder to mirror.
+        local_folder (str): Local target folder.
+        log_file (file): Open log file.
+        concurrency (int): Number of parallel downloads.
+        chunk_size (int): Streaming block size in bytes.
+        verbose (bool): Print a line per downloaded file.
+
+    Returns:
+        list: Local paths of the files that were downloaded.
+    """
+    os.makedirs(local_folder, exist_ok=True)
+
+    log_file.write(f"Listing files in {backend.name} folder: {remote_folder} (recursive: True)\n")
+    if verbose:
+        print(f"Listing files in {backend.name} folder: {remote_folder} (recursive: True)")
+    entries = backend.list_files(remote_folder)
+
+    def local_path_of(remote_path):
+        # Path relative to the base folder, e.g. "vtk_output/file.pvd"; Dropbox paths are lowercase
+        relative_path = remote_path[len(remote_folder.rstrip("/")):].lstrip("/")
+        return os.path.join(local_folder, *relative_path.split("/"))
+
+    # Recreate every remote subfolder, including empty ones
+    for remote_path in backend.list_folders(remote_folder):
+        local_target_dir = local_path_of(remote_path)
+        os.makedirs(local_target_dir, exist_ok=True)
+        log_file.write(f"Created local directory: {local_target_dir}\n")
+
+    def fetch(entry):
+        remote_path, size = entry
+        local_target_path = local_path_of(remote_path)
+        download_file_atomically(backend, remote_path, local_target_path, chunk_size)
+        return remote_path, local_target_path
+
+    downloaded = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(fetch, entry): entry for entry in entries}
+        for future in as_completed(futures):
+            remote_path = futures[future][0]
+            try:
+                remote_path, local_target_path = future.result()
+                log_file.write(f"Downloaded {remote_path} to {local_target_path}\n")
+                if verbose:
+                    print(f"Downloaded: {remote_path} -> {local_target_path}")
+                downloaded.append(local_target_path)
+            except Exception as e:
+                log_file.write(f"Failed to download file {remote_path}, error: {e}\n")
+                print(f"Failed to download file {remote_path}, error: {e}", file=sys.stderr)
+                # Do not exit, try to download other files
+    return downloaded
+
 # Function to download files and folders recursively from a specified Dropbox folder
 def download_files_from_dropbox(dropbox_folder, local_folder, refresh_token, client_id, client_secret, log_file_path):
-    access_token = refresh_access_token(refresh_token, client_id, client_secret)
-    dbx = dropbox.Dropbox(access_token)
-
-    # Use a set to keep track of successfully downloaded items for the final success check
-    downloaded_items = set()
-
     with open(log_file_path, "a") as log_file:
         log_file.write(f"Starting download process for Dropbox folder: {dropbox_folder} to local: {local_folder}\n")
         print(f"Starting download process for Dropbox folder: {dropbox_folder} to local: {local_folder}")
 
         try:
-            os.makedirs(local_folder, exist_ok=True)
-
-            # --- Key change: Use recursive=True in files_list_folder ---
-            # This will list all files and folders within the specified path and its subfolders.
-            # Handle pagination
-            has_more = True
-            cursor = None
-            while has_more:
-                if cursor:
-                    result = dbx.files_list_folder_continue(cursor)
-                else:
-                    # List all entries recursively within the main Dropbox folder
-                    result = dbx.files_list_folder(dropbox_folder, recursive=True)
-                
-                log_file.write(f"Listing files in Dropbox folder: {dropbox_folder} (recursive: True)\n")
-                print(f"Listing files in Dropbox folder: {dropbox_folder} (recursive: True)")
-
-                for entry in result.entries:
-                    # Construct the relative path from the base Dropbox folder.
-                    # entry.path_lower gives the full lowercase path, e.g., "/engineering_simulations_pipeline/vtk_output/file.pvd"
-                    # We need the path relative to the initial dropbox_folder, e.g., "vtk_output/file.pvd"
-                    # Using os.path.relpath ensures correct path construction across OS.
-                    # dropbox_folder.lower() is used for comparison as entry.path_lower is always lowercase.
-                    relative_path = os.path.relpath(entry.path_lower, dropbox_folder.lower())
-
-                    if isinstance(entry, dropbox.files.FileMetadata):
-                        local_target_path = os.path.join(local_folder, relative_path)
-                        local_target_dir = os.path.dirname(local_target_path)
-                        os.makedirs(local_target_dir, exist_ok=True) # Ensure local subdirectories exist for the file
-
-                        try:
-                            with open(local_target_path, "wb") as f:
-                                metadata, res = dbx.files_download(path=entry.path_lower)
-                                f.write(res.content)
-                            log_file.write(f"Downloaded {entry.path_lower} to {local_target_path}\n")
-                            print(f"Downloaded: {entry.path_lower} -> {local_target_path}")
-                            downloaded_items.add(local_target_path) # Add to set of downloaded items
-                        except Exception as e:
-                            log_file.write(f"Failed to download file {entry.path_lower}, error: {e}\n")
-                            print(f"Failed to download file {entry.path_lower}, error: {e}", file=sys.stderr)
-                            # Do not exit, try to download other files
-
-                    elif isinstance(entry, dropbox.files.FolderMetadata):
-                        local_target_dir = os.path.join(local_folder, relative_path)
-                        os.makedirs(local_target_dir, exist_ok=True) # Create local subfolder
-                        log_file.write(f"Created local directory: {local_target_dir}\n")
-                        print(f"Created local directory: {local_target_dir}")
-                        # Folders themselves aren't 'downloaded' in the same way as files,
-                        # but their creation signifies progress.
-
-                    # If you re-enable deletion, consider if you want to delete files or folders
-                    # as they are downloaded/processed, or after all downloads are complete.
-                    # For now, deletion is commented out as in your original script.
-                    # delete_from_dropbox(dbx, entry.path_lower, log_file)
-
-                has_more = result.has_more
-                cursor = result.cursor
+            backend = open_storage_backend(refresh_token, client_id, client_secret)
+            downloaded_items = download_folder(backend, dropbox_folder, local_folder, log_file)
 
             log_file.write("Download process completed.\n")
             print("Download process completed.")
-            
+
             # Indicate success based on whether any files were actually downloaded.
             # This helps to catch cases where the Dropbox folder might be empty or permissions prevent listing.
             if not downloaded_items:
@@ -114,19 +130,83 @@ def download_files_from_dropbox(dropbox_folder, local_folder, refresh_token, cli
                 return False # Indicate failure if no files were downloaded
             return True
 
-        except dropbox.exceptions.ApiError as err:
-            log_file.write(f"Dropbox API error during download: {err}\n")
-            print(f"Dropbox API error during download: {err}", file=sys.stderr)
-            return False
         except Exception as e:
             log_file.write(f"Unexpected error during download: {e}\n")
             print(f"Unexpected error during download: {e}", file=sys.stderr)
             return False
 
+# Function to download a .pvd and only the timesteps (plus extra files) a job needs
+def download_selected_timesteps(dropbox_folder, local_folder, refresh_token, client_id, client_secret, log_file_path,
+                                pvd_path, time_start=None, time_end=None, stride=1, extra_files=()):
+    """Fetches a .pvd collection, then only the datasets inside a time window/stride.
+
+    Extra files (e.g. the turbine model) come first, then the datasets in the
+    order they will be rendered. The local .pvd is rewritten after each dataset
+    lands and only ever lists datasets that are complete on disk, so a reader
+    opened mid-download sees the timesteps that have arrived so far instead of
+    failing on missing files. Datasets that fail to download are left out.
+
+    Args:
+        pvd_path (str): Path of the .pvd relative to `dropbox_folder`.
+        time_start (float): First timestep to fetch (None = from the beginning).
+        time_end (float): Last timestep to fetch (None = to the end).
+        stride (int): Fetch every `stride`-th timestep of the window.
+        extra_files (list): Further paths relative to `dropbox_folder`.
+
+    Returns:
+        bool: True if every selected file was downloaded, False otherwise.
+    """
+    with open(log_file_path, "a") as log_file:
+        remote_pvd = posixpath.join(dropbox_folder, pvd_path)
+        local_pvd = os.path.join(local_folder, pvd_path)
+        try:
+            backend = open_storage_backend(refresh_token, client_id, client_secret)
+            datasets = pvd_index.parse_pvd(backend.download(remote_pvd))
+        except Exception as e:
+            log_file.write(f"Failed to read PVD {remote_pvd}, error: {e}\n")
+            print(f"Failed to read PVD {remote_pvd}, error: {e}", file=sys.stderr)
+            return False
+
+        selected = pvd_index.select_datasets(datasets, time_start, time_end, stride)
+        if not selected:
+            print(f"WARNING: No timesteps of {remote_pvd} fall inside the requested window.", file=sys.stderr)
+            return False
+
+        message = f"Selected {len(pvd_index.timestep_values(selected))} of {len(pvd_index.timestep_values(datasets))} timesteps from {remote_pvd}"
+        log_file.write(message + "\n")
+        print(message)
+
+        os.makedirs(os.path.dirname(local_pvd) or ".", exist_ok=True)
+        pvd_dir = posixpath.dirname(pvd_path)
+        queue = [(relative_path, None) for relative_path in extra_files]
+        queue += [(posixpath.join(pvd_dir, entry["file"]), entry) for entry in selected]
+
+        failed, arrived = False, []
+        for relative_path, entry in queue:
+            remote_path = posixpath.join(dropbox_folder, relative_path)
+            local_path = os.path.join(local_folder, *relative_path.split("/"))
+            try:
+                download_file_atomically(backend, remote_path, local_path)
+                log_file.write(f"Downloaded {remote_path} to {local_path}\n")
+                print(f"Downloaded: {remote_path} -> {local_path}")
+            except Exception as e:
+                log_file.write(f"Failed to download file {remote_path}, error: {e}\n")
+                print(f"Failed to download file {remote_path}, error: {e}", file=sys.stderr)
+                failed = True
+                continue
+            if entry is not None:
+                arrived.append(entry)
+                pvd_index.write_pvd(local_pvd, arrived)  # Extend the local .pvd with the dataset that landed
+
+        log_file.write("Selective download process completed.\n")
+        print("Selective download process completed.")
+        return not failed
+
 # Entry point for the script
 if __name__ == "__main__":
-    if len(sys.argv) != 7:
-        print("Usage: python3 download_dropbox_files.py <dropbox_folder_path> <local_target_folder> <refresh_token> <app_key> <app_secret> <log_file_path>", file=sys.stderr)
+    if len(sys.argv) < 7:
+        print("Usage: python3 download_dropbox_files.py <dropbox_folder_path> <local_target_folder> <refresh_token> <app_key> <app_secret> <log_file_path> "
+              "[--pvd <relative .pvd path> [--time-start T] [--time-end T] [--stride N] [--extra file1,file2]]", file=sys.stderr)
         sys.exit(1)
 
     dropbox_folder = sys.argv[1] # Dropbox folder path
@@ -136,8 +216,22 @@ if __name__ == "__main__":
     client_secret = sys.argv[5]  # Dropbox client secret
     log_file_path = sys.argv[6]  # Path to the log file
 
+    # Optional selective fetch flags
+    pvd_path, time_start, time_end, stride, extra_files = None, None, None, 1, []
+    args = sys.argv
+    for i, arg in enumerate(args):
+        if arg == "--pvd" and i + 1 < len(args): pvd_path = args[i+1]
+        elif arg == "--time-start" and i + 1 < len(args): time_start = float(args[i+1])
+        elif arg == "--time-end" and i + 1 < len(args): time_end = float(args[i+1])
+        elif arg == "--stride" and i + 1 < len(args): stride = int(args[i+1])
+        elif arg == "--extra" and i + 1 < len(args): extra_files = [f for f in args[i+1].split(",") if f]
+
     # Call the function and exit with appropriate status code
-    if not download_files_from_dropbox(dropbox_folder, local_folder, refresh_token, client_id, client_secret, log_file_path):
+    if pvd_path:
+        if not download_selected_timesteps(dropbox_folder, local_folder, refresh_token, client_id, client_secret, log_file_path,
+                                           pvd_path, time_start, time_end, stride, extra_files):
+            sys.exit(1) # Exit with error code if download failed
+    elif not download_files_from_dropbox(dropbox_folder, local_folder, refresh_token, client_id, client_secret, log_file_path):
         sys.exit(1) # Exit with error code if download failed
 
 
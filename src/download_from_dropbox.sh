@@ -11,8 +11,16 @@ LOG_FILE="./dropbox_download_log.txt"
 # Create the local folder if it doesn't exist
 mkdir -p "$LOCAL_FOLDER"
 
+# Optional selective fetch: only the timesteps of PVD_FILE inside TIME_START..TIME_END (every TIME_STRIDE-th)
+SELECTIVE_ARGS=()
+if [ -n "${PVD_FILE}" ]; then
+    SELECTIVE_ARGS+=(--pvd "${PVD_FILE}" --stride "${TIME_STRIDE:-1}" --extra "${EXTRA_FILES:-3d_model.obj}")
+    [ -n "${TIME_START}" ] && SELECTIVE_ARGS+=(--time-start "${TIME_START}")
+    [ -n "${TIME_END}" ] && SELECTIVE_ARGS+=(--time-end "${TIME_END}")
+fi
+
 # Run the Python script to call the Dropbox download function
-python3 src/download_dropbox_files.py "$DROPBOX_FOLDER" "$LOCAL_FOLDER" "$REFRESH_TOKEN" "$APP_KEY" "$APP_SECRET" "$LOG_FILE"
+python3 src/download_dropbox_files.py "$DROPBOX_FOLDER" "$LOCAL_FOLDER" "$REFRESH_TOKEN" "$APP_KEY" "$APP_SECRET" "$LOG_FILE" "${SELECTIVE_ARGS[@]}"
 
 # Verify downloaded files
 if [ "$(ls -A $LOCAL_FOLDER)" ]; then
@@ -0,0 +1,273 @@
+# src/dropbox_emulator.py
+
+# Local stand-in for the Dropbox v2 file endpoints, backed by a directory.
+# Example:
+# python3 dropbox_emulator.py --root /tmp/fake_dropbox --port 8765 --latency 0.05 --bandwidth-mbps 40
+#
+# Emulated endpoints (enough for HttpEmulatorBackend in storage_backends.py):
+#   files/list_folder, files/list_folder/continue, files/get_metadata,
+#   files/download, files/upload,
+#   files/upload_session/start, files/upload_session/append_v2, files/upload_session/finish
+#
+# --latency adds a fixed delay to every request and --bandwidth-mbps throttles
+# request and response bodies, so transfer settings can be tuned offline.
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import tempfile
+import threading
+import posixpath
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LIST_PAGE_SIZE = 500
+THROTTLE_BLOCK = 64 * 1024
+
+
+class EmulatorState:
+    """Storage root, network shaping and open upload sessions / list cursors."""
+
+    def __init__(self, root, latency=0.0, bandwidth_mbps=0.0):
+        self.root = os.path.abspath(root)
+        self.latency = latency
+        self.bytes_per_second = bandwidth_mbps * 1024 * 1024 / 8 if bandwidth_mbps else 0
+        self.session_dir = tempfile.mkdtemp(prefix="dropbox_emulator_sessions_")
+        self.cursors = {}
+        self.lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def local_path(self, path):
+        relative = posixpath.normpath("/" + (path or "")).lstrip("/")
+        return os.path.join(self.root, *relative.split("/")) if relative else self.root
+
+    def close(self):
+        """Removes the partial uploads of unfinished sessions."""
+        shutil.rmtree(self.session_dir, ignore_errors=True)
+
+
+class EmulatorHandler(BaseHTTPRequestHandler):
+    server_version = "DropboxEmulator/1.0"
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+    @property
+    def state(self):
+        return self.server.state
+
+    # --- Network shaping ---
+    def _throttle(self, num_bytes):
+        if self.state.bytes_per_second:
+            time.sleep(num_bytes / self.state.bytes_per_second)
+
+    def _read_body(self):
+        remaining = int(self.headers.get("Content-Length", 0))
+        blocks = []
+        while remaining > 0:
+            block = self.rfile.read(min(THROTTLE_BLOCK, remaining))
+            if not block:
+                break
+            self._throttle(len(block))
+            blocks.append(block)
+            remaining -= len(block)
+        return b"".join(blocks)
+
+    def _send(self, status, body=b"", content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        for offset in range(0, len(body), THROTTLE_BLOCK):
+            block = body[offset:offset + THROTTLE_BLOCK]
+            self._throttle(len(block))
+            self.wfile.write(block)
+
+    def _send_json(self, data, status=200):
+        self._send(status, json.dumps(data).encode("utf-8"))
+
+    def _error(self, status, summary):
+        self._send_json({"error_summary": summary}, status)
+
+    # --- Request dispatch ---
+    def do_POST(self):
+        if self.state.latency:
+            time.sleep(self.state.latency)
+
+        body = self._read_body()
+        endpoint = self.path.split("?")[0]
+        arg_header = self.headers.get("Dropbox-API-Arg")
+        try:
+            arg = json.loads(arg_header) if arg_header else (json.loads(body) if body else {})
+        except json.JSONDecodeError:
+            return self._error(400, "malformed_arguments/")
+
+        handlers = {
+            "/2/files/list_folder": self._list_folder,
+            "/2/files/list_folder/continue": self._list_folder_continue,
+            "/2/files/get_metadata": self._get_metadata,
+            "/2/files/download": self._download,
+            "/2/files/upload": self._upload,
+            "/2/files/upload_session/start": self._session_start,
+            "/2/files/upload_session/append_v2": self._session_append,
+            "/2/files/upload_session/finish": self._session_finish,
+        }
+        handler = handlers.get(endpoint)
+        if handler is None:
+            return self._error(404, f"unknown_endpoint/{endpoint}")
+        handler(arg, body)
+
+    # --- Endpoints ---
+    def _metadata(self, path):
+        local = self.state.local_path(path)
+        display = "/" + os.path.relpath(local, self.state.root).replace(os.sep, "/")
+        if os.path.isdir(local):
+            return {".tag": "folder", "name": os.path.basename(local), "path_lower": display.lower(), "path_display": display}
+        return {".tag": "file", "name": os.path.basename(local), "path_lower": display.lower(),
+                "path_display": display, "size": os.path.getsize(local)}
+
+    def _list_page(self, cursor_id):
+        with self.state.lock:
+            entries = self.state.cursors.get(cursor_id)
+            if entries is None:
+                return None
+            page, rest = entries[:LIST_PAGE_SIZE], entries[LIST_PAGE_SIZE:]
+            self.state.cursors[cursor_id] = rest
+        return {"entries": [self._metadata(p) for p in page], "cursor": cursor_id, "has_more": bool(rest)}
+
+    def _list_folder(self, arg, body):
+        base = self.state.local_path(arg.get("path", ""))
+        if not os.path.isdir(base):
+            return self._error(409, "path/not_found/")
+
+        paths = []
+        for directory, folders, names in os.walk(base):
+            for name in sorted(folders) + sorted(names):
+                paths.append("/" + os.path.relpath(os.path.join(directory, name), self.state.root).replace(os.sep, "/"))
+            if not arg.get("recursive", False):
+                break
+
+        cursor_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.cursors[cursor_id] = paths
+        self._send_json(self._list_page(cursor_id))
+
+    def _list_folder_continue(self, arg, body):
+        page = self._list_page(arg.get("cursor"))
+        if page is None:
+            return self._error(409, "reset/")
+        self._send_json(page)
+
+    def _get_metadata(self, arg, body):
+        if not os.path.exists(self.state.local_path(arg.get("path"))):
+            return self._error(409, "path/not_found/")
+        self._send_json(self._metadata(arg["path"]))
+
+    def _download(self, arg, body):
+        local = self.state.local_path(arg.get("path"))
+        if not os.path.isfile(local):
+            return self._error(409, "path/not_found/")
+        with open(local, "rb") as f:
+            content = f.read()
+        result = json.dumps(self._metadata(arg["path"]))
+        self._send(200, content, "application/octet-stream", {"Dropbox-API-Result": result})
+
+    def _write_file(self, path, source_path=None, data=None):
+        local = self.state.local_path(path)
+        os.makedirs(os.path.dirname(local), exist_ok=True)
+        if source_path is not None:
+            shutil.move(source_path, local)
+        else:
+            with open(local, "wb") as f:
+                f.write(data)
+        return self._metadata(path)
+
+    def _upload(self, arg, body):
+        self._send_json(self._write_file(arg["path"], data=body))
+
+    def _session_file(self, session_id):
+        return os.path.join(self.state.session_dir, os.path.basename(session_id))
+
+    def _session_start(self, arg, body):
+        session_id = uuid.uuid4().hex
+        with open(self._session_file(session_id), "wb") as f:
+            f.write(body)
+        self._send_json({"session_id": session_id})
+
+    def _session_append(self, arg, body):
+        cursor = arg.get("cursor", {})
+        session_path = self._session_file(cursor.get("session_id", ""))
+        if not os.path.exists(session_path):
+            return self._error(409, "lookup_failed/not_found/")
+        if os.path.getsize(session_path) != cursor.get("offset"):
+            return self._error(409, "lookup_failed/incorrect_offset/")
+        with open(session_path, "ab") as f:
+            f.write(body)
+        self._send_json(None)
+
+    def _session_finish(self, arg, body):
+        cursor = arg.get("cursor", {})
+        session_path = self._session_file(cursor.get("session_id", ""))
+        if not os.path.exists(session_path):
+            return self._error(409, "lookup_failed/not_found/")
+        if os.path.getsize(session_path) != cursor.get("offset"):
+            return self._error(409, "lookup_failed/incorrect_offset/")
+        with open(session_path, "ab") as f:
+            f.write(body)
+        self._send_json(self._write_file(arg["commit"]["path"], source_path=session_path))
+
+
+class EmulatorServer(ThreadingHTTPServer):
+    """HTTP server that cleans up the emulator state when it stops."""
+
+    daemon_threads = True
+
+    def __init__(self, address, state):
+        super().__init__(address, EmulatorHandler)
+        self.state = state
+
+    def shutdown(self):
+        super().shutdown()
+        self.server_close()
+
+    def server_close(self):
+        super().server_close()
+        self.state.close()
+
+
+def start_emulator(root, port=0, latency=0.0, bandwidth_mbps=0.0):
+    """Starts the emulator on a background thread.
+
+    Returns:
+        tuple: (server, base_url); call `server.shutdown()` when done.
+    """
+    server = EmulatorServer(("127.0.0.1", port), EmulatorState(root, latency, bandwidth_mbps))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    args = sys.argv
+    root, port, latency, bandwidth = None, 8765, 0.0, 0.0
+    for i, arg in enumerate(args):
+        if arg == "--root" and i + 1 < len(args): root = args[i+1]
+        elif arg == "--port" and i + 1 < len(args): port = int(args[i+1])
+        elif arg == "--latency" and i + 1 < len(args): latency = float(args[i+1])
+        elif arg == "--bandwidth-mbps" and i + 1 < len(args): bandwidth = float(args[i+1])
+
+    if not root:
+        print("Usage: python3 dropbox_emulator.py --root <dir> [--port N] [--latency seconds] [--bandwidth-mbps N]")
+        sys.exit(1)
+
+    server = EmulatorServer(("127.0.0.1", port), EmulatorState(root, latency, bandwidth))
+    print(f"✅ Dropbox emulator serving {os.path.abspath(root)} at http://127.0.0.1:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,366 @@
+# src/encode_video.py
+
+# Segmented, parallel H.264 encoding of rendered frame folders.
+# Example:
+# python3 encode_video.py --base-dir data/testing-input-output
+# python3 encode_video.py --base-dir data/testing-input-output --rendition review:1280x720
+# python3 encode_video.py --frames-dir RenderedOutput --output RenderedOutput/video.mp4
+#
+# With --base-dir, smaller renditions (--rendition name:WxH) of the combined
+# animation come out of the same decode as the full-size video (split + area
+# scale) and are written to --renditions-dir (default <base-dir>/renditions).
+
+import os
+import re
+import sys
+import shutil
+import struct
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# ✅ Encoding defaults (overridable from the environment, e.g. GitHub Actions)
+FRAME_RATE = int(os.getenv("FRAME_RATE", "24"))
+GOP_SIZE = int(os.getenv("GOP_SIZE", "48"))
+FRAME_FILE_REGEX = re.compile(r"^frame_(\d{4,})\.png$")
+
+# Frame folders written by the ParaView passes and the video each one feeds.
+LAYER_OUTPUTS = [
+    ("turbine_animation_frames", "turbine_flow_animation.mp4"),
+    ("particles_layer_frames", "particles_pass.mp4"),
+    ("geometry_layer_frames", "geometry_pass.mp4"),
+    ("volume_layer_frames", "volume_pass.mp4"),
+]
+
+
+def parse_rendition(spec):
+    """Parses a `name:WIDTHxHEIGHT` rendition spec into (name, (width, height)).
+
+    Both sides must be even: libx264 rejects odd sizes with yuv420p.
+    """
+    name, _, size = spec.partition(":")
+    width, height = (int(x) for x in size.lower().split("x"))
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Invalid rendition size in '{spec}'")
+    if width % 2 or height % 2:
+        raise ValueError(f"Rendition size in '{spec}' must be even for yuv420p, e.g. {width + width % 2}x{height + height % 2}")
+    return name.strip(), (width, height)
+
+
+def frame_size(path):
+    """Returns (width, height) of a PNG from its header."""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    return struct.unpack(">II", header[16:24])
+
+
+def rendition_outputs(source_size, master_path, renditions, output_dir, name):
+    """Lists the outputs of one split/scale encode: the full-size video plus every smaller rendition.
+
+    Renditions larger than the frames are skipped (render at the largest size
+    instead); one at exactly the frame size is the full-size video itself, when
+    a `master_path` is given.
+
+    Args:
+        source_size (tuple): (width, height) of the rendered frames.
+        master_path (str): Path of the full-size video, or None.
+        renditions (list): (name, (width, height)) tuples.
+        output_dir (str): Folder for the rendition videos.
+        name (str): Base name of the rendition videos.
+
+    Returns:
+        tuple: ([(video_path, (width, height) or None)], {rendition name: video_path})
+    """
+    outputs, paths = ([(master_path, None)] if master_path else []), {}
+    for rendition_name, size in sorted(renditions, key=lambda r: r[1][0] * r[1][1], reverse=True):
+        if size[0] > source_size[0] or size[1] > source_size[1]:
+            print(f"⚠️ Skipping '{rendition_name}' {size[0]}x{size[1]}: frames are only {source_size[0]}x{source_size[1]}. "
+                  f"Render at the largest rendition size instead.")
+            continue
+        if tuple(size) == tuple(source_size) and master_path:
+            paths[rendition_name] = master_path
+            continue
+        path = os.path.join(output_dir, f"{name}_{rendition_name}.mp4")
+        outputs.append((path, None if tuple(size) == tuple(source_size) else tuple(size)))
+        paths[rendition_name] = path
+    return outputs, paths
+
+
+def base_dir_jobs(base_dir, renditions=(), renditions_dir=None):
+    """Builds the encode jobs for the layer folders of a render output directory.
+
+    The renditions are added to the job of the first layer (the combined animation).
+    """
+    jobs = []
+    for index, (folder, video) in enumerate(LAYER_OUTPUTS):
+        layer_dir = os.path.join(base_dir, folder)
+        numbers = list_frame_numbers(layer_dir) if os.path.isdir(layer_dir) else []
+        if not numbers:
+            continue
+        output = os.path.join(base_dir, video)
+        if index == 0 and renditions:
+            source_size = frame_size(os.path.join(layer_dir, f"frame_{numbers[0]:04d}.png"))
+            output, _ = rendition_outputs(source_size, output, renditions,
+                                          renditions_dir or os.path.join(base_dir, "renditions"), folder)
+        jobs.append((layer_dir, output))
+    return jobs
+
+
+def list_frame_numbers(frames_dir):
+    """Returns the sorted frame numbers of all `frame_NNNN.png` files in a folder."""
+    numbers = []
+    for name in os.listdir(frames_dir):
+        match = FRAME_FILE_REGEX.match(name)
+        if match:
+            numbers.append(int(match.group(1)))
+    return sorted(numbers)
+
+
+def plan_segments(frame_numbers, gop_size, num_workers):
+    """Splits a frame sequence into GOP-aligned segments for parallel encoding.
+
+    Every segment length is a multiple of the GOP size, so each segment starts
+    on a keyframe exactly where a single-pass encode with the same GOP would
+    have placed one. Segments never span a gap in the frame numbering.
+
+    Args:
+        frame_numbers (list): Sorted frame numbers.
+        gop_size (int): Keyframe interval in frames.
+        num_workers (int): Number of encoder processes available.
+
+    Returns:
+        list: (start_number, frame_count) tuples in playback order.
+    """
+    if not frame_numbers:
+        return []
+
+    # Contiguous runs, since the image2 demuxer stops at the first missing frame
+    runs = []
+    run_start = previous = frame_numbers[0]
+    for number in frame_numbers[1:]:
+        if number != previous + 1:
+            runs.append((run_start, previous - run_start + 1))
+            run_start = number
+        previous = number
+    runs.append((run_start, previous - run_start + 1))
+
+    total_gops = sum(-(-count // gop_size) for _, count in runs)
+    gops_per_segment = max(1, -(-total_gops // max(1, num_workers)))
+    segment_length = gops_per_segment * gop_size
+
+    segments = []
+    for start, count in runs:
+        offset = 0
+        while offset < count:
+            length = min(segment_length, count - offset)
+            segments.append((start + offset, length))
+            offset += length
+    return segments
+
+
+def segment_command(task):
+    """Builds the ffmpeg command that encodes one segment to one MP4 file per output.
+
+    Several outputs (renditions) are produced in the same ffmpeg pass: the
+    decoded frames are split and each branch is area-scaled to its size.
+
+    Args:
+        task (dict): Segment description with `frames_dir`, `start`, `count`,
+            `outputs` (list of {"segment_path", "size"}; size is None or
+            (width, height)), `framerate`, `gop` and `threads`.
+
+    Returns:
+        list: The command line.
+    """
+    command = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-framerate", str(task["framerate"]),
+        "-start_number", str(task["start"]),
+        "-i", os.path.join(task["frames_dir"], "frame_%04d.png"),
+    ]
+
+    outputs = task["outputs"]
+    if len(outputs) > 1 or outputs[0]["size"]:
+        branches = "".join(f"[s{i}]" for i in range(len(outputs)))
+        graph = [f"[0:v]split={len(outputs)}{branches}"]
+        for i, output in enumerate(outputs):
+            scale = f"scale={output['size'][0]}:{output['size'][1]}:flags=area" if output["size"] else "null"
+            graph.append(f"[s{i}]{scale}[o{i}]")
+        command += ["-filter_complex", ";".join(graph)]
+
+    encoder = [
+        "-frames:v", str(task["count"]),
+        "-c:v", "libx264",
+        "-pix_fmt", "yuv420p",
+        "-g", str(task["gop"]),
+        "-keyint_min", str(task["gop"]),
+        "-sc_threshold", "0",
+        "-threads", str(task["threads"]),
+    ]
+    for i, output in enumerate(outputs):
+        if "-filter_complex" in command:
+            command += ["-map", f"[o{i}]"]
+        command += encoder + [output["segment_path"]]
+    return command
+
+
+def encode_segment(task):
+    """Runs the `segment_command` of a task.
+
+    Returns:
+        dict: The task, for bookkeeping in the scheduler.
+    """
+    subprocess.run(segment_command(task), check=True)
+    return task
+
+
+def concat_segments(segment_paths, output_path):
+    """Joins encoded segments into one MP4 with the concat demuxer (no re-encode)."""
+    list_path = output_path + ".segments.txt"
+    with open(list_path, "w") as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    command = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "concat", "-safe", "0",
+        "-i", list_path,
+        "-c", "copy",
+        "-movflags", "+faststart",
+        output_path,
+    ]
+    try:
+        subprocess.run(command, check=True)
+    finally:
+        os.remove(list_path)
+
+
+def encode_jobs(jobs, num_workers=None, gop_size=GOP_SIZE, framerate=FRAME_RATE):
+    """Encodes several frame folders to videos in one scheduled parallel job.
+
+    The segments of all jobs share a single process pool, longest first, and
+    each video is assembled as soon as its last segment is done.
+
+    Args:
+        jobs (list): (frames_dir, output) tuples, where output is a video path
+            or a list of (video_path, (width, height) or None) renditions that
+            are all encoded from the same decoded frames.
+        num_workers (int): Encoder processes; defaults to the CPU count.
+        gop_size (int): Keyframe interval in frames.
+        framerate (int): Output frame rate.
+
+    Returns:
+        bool: True if every video was produced, False otherwise.
+    """
+    cpu_count = os.cpu_count() or 1
+    num_workers = num_workers or cpu_count
+    threads_per_segment = max(1, cpu_count // num_workers)
+    work_dir = tempfile.mkdtemp(prefix="encode_segments_")
+
+    tasks = []
+    pending = {}
+    for job_index, (frames_dir, output) in enumerate(jobs):
+        renditions = [(output, None)] if isinstance(output, str) else list(output)
+        segments = plan_segments(list_frame_numbers(frames_dir), gop_size, num_workers)
+        if not segments:
+            print(f"⚠️ No frames found in {frames_dir}, skipping {', '.join(path for path, _ in renditions)}")
+            continue
+        print(f"🧩 {frames_dir}: {sum(c for _, c in segments)} frames in {len(segments)} segments, {len(renditions)} output(s)")
+        pending[job_index] = {
+            "outputs": [path for path, _ in renditions],
+            "segments": [[None] * len(segments) for _ in renditions],
+            "left": len(segments),
+        }
+        for segment_index, (start, count) in enumerate(segments):
+            tasks.append({
+                "job": job_index,
+                "index": segment_index,
+                "frames_dir": frames_dir,
+                "start": start,
+                "count": count,
+                "outputs": [
+                    {"segment_path": os.path.join(work_dir, f"job{job_index:02d}_out{k:02d}_seg{segment_index:04d}.mp4"), "size": size}
+                    for k, (_, size) in enumerate(renditions)
+                ],
+                "framerate": framerate,
+                "gop": gop_size,
+                "threads": threads_per_segment,
+            })
+
+    if not tasks:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return False
+
+    tasks.sort(key=lambda t: t["count"], reverse=True)
+    success = True
+    try:
+        with ProcessPoolExecutor(max_workers=num_workers) as pool:
+            futures = [pool.submit(encode_segment, task) for task in tasks]
+            for future in as_completed(futures):
+                try:
+                    task = future.result()
+                except Exception as e:
+                    print(f"❌ Segment encoding failed: {e}", file=sys.stderr)
+                    success = False
+                    continue
+
+                job = pending[task["job"]]
+                for k, output in enumerate(task["outputs"]):
+                    job["segments"][k][task["index"]] = output["segment_path"]
+                job["left"] -= 1
+                if job["left"] == 0:
+                    for output_path, segment_paths in zip(job["outputs"], job["segments"]):
+                        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+                        try:
+                            concat_segments(segment_paths, output_path)
+                            print(f"✅ Video written: {output_path}")
+                        except subprocess.CalledProcessError as e:
+                            print(f"❌ Failed to join segments for {output_path}: {e}", file=sys.stderr)
+                            success = False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    missing = [path for job in pending.values() if job["left"] > 0 for path in job["outputs"]]
+    for path in missing:
+        print(f"❌ Video not produced: {path}", file=sys.stderr)
+    return success and not missing
+
+
+if __name__ == "__main__":
+    args = sys.argv
+    jobs, renditions = [], []
+    base_dir, renditions_dir, frames_dir, num_workers = None, None, None, None
+    gop_size, framerate = GOP_SIZE, FRAME_RATE
+    for i, arg in enumerate(args):
+        if arg == "--base-dir" and i + 1 < len(args):
+            base_dir = os.path.abspath(args[i+1])
+        elif arg == "--rendition" and i + 1 < len(args):
+            renditions.append(parse_rendition(args[i+1]))
+        elif arg == "--renditions-dir" and i + 1 < len(args):
+            renditions_dir = os.path.abspath(args[i+1])
+        elif arg == "--frames-dir" and i + 1 < len(args):
+            frames_dir = os.path.abspath(args[i+1])
+        elif arg == "--output" and i + 1 < len(args) and frames_dir:
+            jobs.append((frames_dir, os.path.abspath(args[i+1])))
+            frames_dir = None
+        elif arg == "--workers" and i + 1 < len(args):
+            num_workers = int(args[i+1])
+        elif arg == "--gop" and i + 1 < len(args):
+            gop_size = int(args[i+1])
+        elif arg == "--framerate" and i + 1 < len(args):
+            framerate = int(args[i+1])
+
+    if base_dir:
+        jobs += base_dir_jobs(base_dir, renditions, renditions_dir)
+
+    if not jobs:
+        print("Usage: python3 encode_video.py [--base-dir <dir> [--rendition name:WxH]... [--renditions-dir <dir>]] "
+              "[--frames-dir <dir> --output <.mp4>]... [--workers N] [--gop N] [--framerate N]")
+        sys.exit(1)
+
+    if not shutil.which("ffmpeg"):
+        print("❌ Error: FFmpeg is not installed!", file=sys.stderr)
+        sys.exit(1)
+
+    if not encode_jobs(jobs, num_workers=num_workers, gop_size=gop_size, framerate=framerate):
+        sys.exit(1)
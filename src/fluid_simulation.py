@@ -1,11 +1,19 @@
 import bpy
 import os
+import sys
 import json
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import bake_cache
+from pipeline_cache import cache_path
+
 # ✅ Retrieve path variables from environment (set by GitHub Actions)
 data_dir = os.getenv("INPUT_FOLDER", os.path.join("data", "testing-input-output"))
 json_file = os.path.join(data_dir, "fluid_dynamics_animation.json")
 blend_output_path = os.getenv("BLEND_FILE", os.path.join(data_dir, "fluid_simulation.blend"))
+# Outside data_dir, see pipeline_cache.py
+bake_cache_root = os.getenv("BAKE_CACHE_DIR", cache_path("bake_cache"))
+bake_chunk_frames = int(os.getenv("BAKE_CHUNK_FRAMES", "10"))
 
 # ✅ Ensure `data/testing-input-output/` exists
 if not os.path.exists(data_dir):
@@ -34,6 +42,8 @@ print("✅ Successfully loaded fluid dynamics simulation parameters!")
 velocity_field = [dp["velocity"]["components"] for dp in simulation_data.get("data_points", []) if "velocity" in dp]
 gravity_enabled = simulation_data.get("gravity_enabled", False)
 initial_velocity = simulation_data.get("initial_velocity", 15.0)
+domain_resolution = simulation_data.get("domain_resolution", 32)  # Blender's default resolution_max
+domain_scale = (50, 10, 5)
 
 if not velocity_field:
     print("❌ ERROR: Could not extract velocity field data from `data_points`. Check JSON structure.")
@@ -47,7 +57,7 @@ print("✅ Setting up Blender fluid simulation environment...")
 bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 0))
 domain = bpy.context.object
 domain.name = "FluidDomain"
-domain.scale = (50, 10, 5)  # Adjust domain size
+domain.scale = domain_scale  # Adjust domain size
 bpy.ops.object.transform_apply(scale=True)
 
 # ✅ Apply Gravity Settings Based on JSON Input
@@ -76,6 +86,56 @@ print("✅ Gravity adjusted, water source created, velocity applied!")
 for frame, velocity in enumerate(velocity_field):
     print(f"🔹 Frame {frame}: Applying velocity {velocity}")
 
+# ✅ Bake Cache: reuse an identical earlier bake, otherwise bake in resumable chunks
+scene = bpy.context.scene
+scene.frame_start = 1
+scene.frame_end = simulation_data.get("num_frames", len(velocity_field))
+
+bake_parameters = {
+    "gravity": tuple(scene.gravity),
+    "initial_velocity": initial_velocity,
+    "domain_scale": domain_scale,
+    "domain_resolution": domain_resolution,
+    "frame_range": (scene.frame_start, scene.frame_end),
+    "blender_version": bpy.app.version_string,
+}
+bake_key = bake_cache.bake_cache_key(json_file, **bake_parameters)
+bake_dir = os.path.abspath(os.path.join(bake_cache_root, bake_key))
+os.makedirs(bake_dir, exist_ok=True)
+
+domain_settings = domain.modifiers["FluidSim"].domain_settings
+domain_settings.resolution_max = domain_resolution
+domain_settings.cache_directory = bake_dir
+domain_settings.cache_type = 'MODULAR'
+domain_settings.cache_resumable = True  # Keeps the solver state needed to continue from a chunk boundary
+domain_settings.cache_frame_start = scene.frame_start
+domain_settings.cache_frame_end = scene.frame_end
+
+if bake_cache.is_bake_complete(bake_dir, bake_key):
+    print(f"✅ Bake cache hit: {bake_dir}")
+else:
+    baked_until = bake_cache.load_baked_until(bake_dir, bake_key)
+    chunks = bake_cache.plan_bake_chunks(scene.frame_start, scene.frame_end, bake_chunk_frames, baked_until)
+    if baked_until is not None:
+        print(f"🔄 Resuming bake after frame {baked_until} ({len(chunks)} chunks left)")
+    else:
+        print(f"🔄 Bake cache miss, baking {len(chunks)} chunks into {bake_dir}")
+
+    # The simulation always starts at cache_frame_start; every chunk after the first
+    # resumes from the last baked frame through Blender's pause frame, so the solver
+    # continues from the cached state instead of restarting (and freeing the cache)
+    bpy.context.view_layer.objects.active = domain
+    for chunk_start, chunk_end in chunks:
+        domain_settings.cache_frame_end = chunk_end
+        domain_settings.cache_frame_pause_data = bake_cache.resume_pause_frame(chunk_start, scene.frame_start)
+        bpy.ops.fluid.bake_data()
+        bake_cache.save_baked_until(bake_dir, bake_key, chunk_end)
+        print(f"🔹 Baked frames {chunk_start}-{chunk_end}")
+
+    domain_settings.cache_frame_end = scene.frame_end
+    bake_cache.mark_bake_complete(bake_dir, bake_key, bake_parameters)
+    print(f"✅ Bake stored in cache: {bake_dir}")
+
 # ✅ Ensure Blender Scene File Path Exists Before Saving
 if not blend_output_path:
     print("❌ ERROR: Blender scene file path is empty or invalid!")
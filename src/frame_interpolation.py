@@ -0,0 +1,126 @@
+# src/frame_interpolation.py
+
+# Fills the gaps left by a keyframe-stride render with optical-flow interpolated frames.
+# Example:
+# pvpython paraview_layer_volume.py --pvd-file data.pvd --output-video out.mp4 --keyframe-stride 4
+# python3 frame_interpolation.py --frames-dir volume_layer_frames --max-error 6.0
+#
+# Keyframe pairs whose flow cannot reconstruct one keyframe from the other within
+# --max-error (mean absolute error, 0-255 scale) are not interpolated; their frame
+# indices are printed as RENDER_FRAME_INDICES=... so the pass can render them for
+# real with --frame-indices.
+
+import os
+import re
+import sys
+import cv2
+import numpy as np
+
+FRAME_FILE_REGEX = re.compile(r"^frame_(\d{4,})\.png$")
+DEFAULT_MAX_ERROR = float(os.getenv("INTERPOLATION_MAX_ERROR", "6.0"))
+
+
+def compute_flow(from_gray, to_gray):
+    """Dense Farneback optical flow from one grayscale frame to another."""
+    return cv2.calcOpticalFlowFarneback(from_gray, to_gray, None, 0.5, 3, 15, 3, 5, 1.2, 0)
+
+
+def warp(image, flow, factor):
+    """Backward-warps an image by a scaled flow field (samples image at x + factor * flow(x))."""
+    height, width = flow.shape[:2]
+    grid_x, grid_y = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+    map_x = grid_x + factor * flow[..., 0]
+    map_y = grid_y + factor * flow[..., 1]
+    return cv2.remap(image, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def reconstruction_error(frame_a, frame_b, flow_ab, flow_ba):
+    """Estimates how well the flow explains the motion between two keyframes.
+
+    Each keyframe is rebuilt by warping the other one along the flow; the larger
+    of the two mean absolute errors is returned (0-255 scale). Occlusions,
+    lighting changes and fast motion all show up as a high error.
+    """
+    a_from_b = warp(frame_b, flow_ab, 1.0)
+    b_from_a = warp(frame_a, flow_ba, 1.0)
+    error_a = np.mean(np.abs(a_from_b.astype(np.float32) - frame_a.astype(np.float32)))
+    error_b = np.mean(np.abs(b_from_a.astype(np.float32) - frame_b.astype(np.float32)))
+    return float(max(error_a, error_b))
+
+
+def interpolate(frame_a, frame_b, flow_ab, flow_ba, t):
+    """Synthesizes the frame at fraction t (0..1) between two keyframes."""
+    from_a = warp(frame_a, flow_ba, t).astype(np.float32)
+    from_b = warp(frame_b, flow_ab, 1.0 - t).astype(np.float32)
+    blended = (1.0 - t) * from_a + t * from_b
+    return np.clip(blended + 0.5, 0, 255).astype(np.uint8)
+
+
+def fill_frame_gaps(frames_dir, max_error=DEFAULT_MAX_ERROR):
+    """Interpolates every missing frame between consecutive rendered keyframes.
+
+    Args:
+        frames_dir (str): Folder with `frame_NNNN.png` keyframes.
+        max_error (float): Largest keyframe reconstruction error that is still interpolated.
+
+    Returns:
+        list: Frame indices that need a real render because interpolation was rejected.
+    """
+    keyframes = sorted(
+        int(match.group(1))
+        for match in (FRAME_FILE_REGEX.match(name) for name in os.listdir(frames_dir))
+        if match
+    )
+    fallback = []
+
+    for start, end in zip(keyframes, keyframes[1:]):
+        if end - start < 2:
+            continue
+
+        frame_a = cv2.imread(os.path.join(frames_dir, f"frame_{start:04d}.png"))
+        frame_b = cv2.imread(os.path.join(frames_dir, f"frame_{end:04d}.png"))
+        unreadable = [index for index, frame in ((start, frame_a), (end, frame_b)) if frame is None]
+        if unreadable:
+            print(f"❌ Keyframe(s) {', '.join(map(str, unreadable))} missing or corrupt, real render required")
+            fallback.extend(index for index in unreadable if index not in fallback)
+            fallback.extend(range(start + 1, end))
+            continue
+        if frame_a.shape != frame_b.shape:
+            print(f"⚠️ Keyframes {start}-{end}: sizes differ, real render required")
+            fallback.extend(range(start + 1, end))
+            continue
+        gray_a = cv2.cvtColor(frame_a, cv2.COLOR_BGR2GRAY)
+        gray_b = cv2.cvtColor(frame_b, cv2.COLOR_BGR2GRAY)
+        flow_ab = compute_flow(gray_a, gray_b)
+        flow_ba = compute_flow(gray_b, gray_a)
+
+        error = reconstruction_error(frame_a, frame_b, flow_ab, flow_ba)
+        if error > max_error:
+            print(f"⚠️ Keyframes {start}-{end}: error {error:.2f} > {max_error:.2f}, real render required")
+            fallback.extend(range(start + 1, end))
+            continue
+
+        for index in range(start + 1, end):
+            t = (index - start) / (end - start)
+            frame = interpolate(frame_a, frame_b, flow_ab, flow_ba, t)
+            cv2.imwrite(os.path.join(frames_dir, f"frame_{index:04d}.png"), frame)
+        print(f"✅ Keyframes {start}-{end}: interpolated {end - start - 1} frames (error {error:.2f})")
+
+    return sorted(fallback)
+
+
+if __name__ == "__main__":
+    args = sys.argv
+    frames_dir, max_error = None, DEFAULT_MAX_ERROR
+    for i, arg in enumerate(args):
+        if arg == "--frames-dir" and i + 1 < len(args):
+            frames_dir = os.path.abspath(args[i+1])
+        elif arg == "--max-error" and i + 1 < len(args):
+            max_error = float(args[i+1])
+
+    if not frames_dir or not os.path.isdir(frames_dir):
+        print("Usage: python3 frame_interpolation.py --frames-dir <dir> [--max-error E]")
+        sys.exit(1)
+
+    fallback = fill_frame_gaps(frames_dir, max_error)
+    print(f"RENDER_FRAME_INDICES={','.join(str(i) for i in fallback)}")
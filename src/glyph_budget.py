@@ -0,0 +1,212 @@
+# src/glyph_budget.py
+
+# Glyph budget for the particle layers: caps the number of particles that get a
+# glyph and chooses how they are drawn, so particle passes stay within a
+# predictable memory and pathtracer budget whatever the dataset size.
+#
+# Optional flags understood by the particle passes:
+#   --glyph-budget N               maximum number of glyphs per frame (0 = no cap)
+#   --glyph-sampling M             "stratified" (default) or "uniform"; both favour
+#                                  fast particles (weights follow velocity magnitude)
+#   --particle-representation R    "glyphs" (merged sphere meshes, the old look),
+#                                  "points" (Point Gaussian sprites, spheres in OSPRay)
+#                                  or "instanced" (3D Glyphs: one instanced sphere)
+#   --particle-radius R            sprite radius for the "points" representation
+#
+# The masking runs inside a ProgrammableFilter; the selection itself is plain NumPy.
+
+import os
+
+import numpy as np
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+GLYPH_BUDGET = int(os.getenv("GLYPH_BUDGET", "0"))
+PARTICLE_REPRESENTATIONS = ("glyphs", "points", "instanced")
+
+
+def parse_glyph_options(args):
+    """Parses the glyph budget and representation flags shared by the particle passes.
+
+    Args:
+        args (list): The raw command line (sys.argv).
+
+    Returns:
+        dict: Glyph options.
+    """
+    options = {
+        "budget": GLYPH_BUDGET,
+        "sampling": "stratified",
+        "representation": "glyphs",
+        "radius": 0.05,
+    }
+    for i, arg in enumerate(args):
+        if arg == "--glyph-budget" and i + 1 < len(args):
+            options["budget"] = max(0, int(args[i+1]))
+        elif arg == "--glyph-sampling" and i + 1 < len(args):
+            options["sampling"] = args[i+1]
+        elif arg == "--particle-representation" and i + 1 < len(args):
+            options["representation"] = args[i+1]
+        elif arg == "--particle-radius" and i + 1 < len(args):
+            options["radius"] = float(args[i+1])
+    if options["sampling"] not in ("stratified", "uniform"):
+        raise ValueError(f"Unknown glyph sampling '{options['sampling']}'. Use stratified or uniform.")
+    if options["representation"] not in PARTICLE_REPRESENTATIONS:
+        raise ValueError(f"Unknown particle representation '{options['representation']}'. "
+                         f"Use one of {', '.join(PARTICLE_REPRESENTATIONS)}.")
+    return options
+
+
+def allocate_budget(weights, sizes, budget):
+    """Splits a budget over strata in proportion to their weight, never above a stratum's size."""
+    weights = np.asarray(weights, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.int64)
+    allocation = np.zeros(len(sizes), dtype=np.int64)
+    remaining = min(budget, int(sizes.sum()))
+    while remaining > 0:
+        open_weights = np.where(allocation < sizes, weights, 0.0)
+        if open_weights.sum() <= 0:
+            open_weights = (allocation < sizes).astype(np.float64)
+        share = remaining * open_weights / open_weights.sum()
+        add = np.minimum(np.floor(share).astype(np.int64), sizes - allocation)
+        if add.sum() == 0:
+            # Every share is below one glyph: hand them out by largest share
+            for stratum in np.argsort(-share, kind="stable"):
+                if remaining == 0:
+                    break
+                if allocation[stratum] < sizes[stratum]:
+                    allocation[stratum] += 1
+                    remaining -= 1
+            continue
+        allocation += add
+        remaining -= int(add.sum())
+    return allocation
+
+
+def select_glyph_indices(magnitudes, budget, method="stratified", strata=8, seed=0):
+    """Chooses which points get a glyph when there are more points than the budget.
+
+    "uniform" draws a weighted random sample without replacement (weights are the
+    velocity magnitudes). "stratified" sorts points into equal-count magnitude
+    strata, gives every stratum a share of the budget proportional to its total
+    magnitude and picks evenly spaced points inside each stratum, so slow regions
+    stay visible but sparse.
+
+    Args:
+        magnitudes (numpy.ndarray): Velocity magnitude per point.
+        budget (int): Maximum number of glyphs; 0 means no cap.
+        method (str): "stratified" or "uniform".
+        strata (int): Number of magnitude strata for stratified sampling.
+        seed (int): Random seed for uniform sampling.
+
+    Returns:
+        numpy.ndarray: Sorted indices of the selected points.
+    """
+    magnitudes = np.abs(np.asarray(magnitudes, dtype=np.float64))
+    count = len(magnitudes)
+    if budget <= 0 or count <= budget:
+        return np.arange(count)
+
+    weights = magnitudes + max(float(magnitudes.max()) * 1e-3, 1e-12)
+    if method == "uniform":
+        # Efraimidis-Spirakis: the largest log(u) / w keys form a weighted sample
+        keys = np.log(np.random.default_rng(seed).random(count)) / weights
+        return np.sort(np.argpartition(-keys, budget - 1)[:budget])
+
+    groups = np.array_split(np.argsort(magnitudes, kind="stable"), min(strata, count))
+    allocation = allocate_budget([weights[group].sum() for group in groups], [len(group) for group in groups], budget)
+    selected = []
+    for group, picks in zip(groups, allocation):
+        if picks > 0:
+            group = np.sort(group)
+            selected.append(group[np.linspace(0, len(group) - 1, picks).round().astype(np.int64)])
+    return np.sort(np.concatenate(selected))
+
+
+def budget_points(data, options, vectors="Velocity"):
+    """Returns a vtkPolyData with only the budgeted points of `data` (one vertex each).
+
+    Every point array is carried over. Runs inside the ProgrammableFilter built by
+    `show_particles`.
+    """
+    from vtkmodules.vtkCommonCore import vtkPoints
+    from vtkmodules.vtkCommonDataModel import vtkPolyData, vtkCellArray
+    from vtkmodules.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, vtk_to_numpy
+
+    output = vtkPolyData()
+    if data is None or data.GetNumberOfPoints() == 0:
+        return output
+
+    velocity = data.GetPointData().GetArray(vectors)
+    magnitudes = np.linalg.norm(vtk_to_numpy(velocity).reshape(data.GetNumberOfPoints(), -1), axis=1) \
+        if velocity is not None else np.ones(data.GetNumberOfPoints())
+    keep = select_glyph_indices(magnitudes, options["budget"], options["sampling"])
+
+    points = vtkPoints()
+    points.SetData(numpy_to_vtk(vtk_to_numpy(data.GetPoints().GetData())[keep], deep=True))
+    output.SetPoints(points)
+    cells = np.stack([np.ones(len(keep), dtype=np.int64), np.arange(len(keep), dtype=np.int64)], axis=1).ravel()
+    vertices = vtkCellArray()
+    vertices.SetCells(len(keep), numpy_to_vtkIdTypeArray(cells, deep=True))
+    output.SetVerts(vertices)
+
+    point_data = data.GetPointData()
+    for index in range(point_data.GetNumberOfArrays()):
+        array = point_data.GetArray(index)
+        if array is None:
+            continue
+        subset = numpy_to_vtk(vtk_to_numpy(array)[keep], deep=True)
+        subset.SetName(array.GetName())
+        output.GetPointData().AddArray(subset)
+    return output
+
+
+def show_particles(pv_s, source, view, options, scale_factor=0.2, opacity=0.5):
+    """Masks the particle source to the glyph budget and shows it in the chosen representation.
+
+    Returns:
+        tuple: (display proxy, last pipeline proxy)
+    """
+    if options["budget"] > 0:
+        from paraview_parallel import partition_count
+
+        # The mask runs on every rank's region, so each rank gets its share of the budget
+        options = dict(options, budget=-(-options["budget"] // partition_count()))
+        masked = pv_s.ProgrammableFilter(Input=source)
+        masked.OutputDataSetType = 'vtkPolyData'
+        masked.Script = (
+            "import sys\n"
+            f"sys.path.insert(0, {SRC_DIR!r})\n"
+            "from glyph_budget import budget_points\n"
+            f"self.GetOutput().ShallowCopy(budget_points(self.GetInputDataObject(0, 0), {options!r}))\n"
+        )
+        source = masked
+
+    if options["representation"] == "glyphs":
+        source = pv_s.Glyph(Input=source, GlyphType='Sphere')
+        source.ScaleArray = ['POINTS', 'Velocity']
+        source.ScaleFactor = scale_factor
+        if options["budget"] > 0:
+            # The default mode resamples spatially (5000 points at most), which would
+            # override the budgeted selection
+            source.GlyphMode = 'All Points'
+        display = pv_s.Show(source, view)
+        display.Representation = 'Surface'
+    elif options["representation"] == "points":
+        display = pv_s.Show(source, view)
+        display.SetRepresentationType('Point Gaussian')
+        display.ShaderPreset = 'Sphere'
+        display.GaussianRadius = options["radius"]
+    else:
+        display = pv_s.Show(source, view)
+        display.SetRepresentationType('3D Glyphs')
+        display.GlyphType = 'Sphere'
+        display.Orient = 0
+        display.Scaling = 1
+        display.ScaleMode = 'Magnitude'
+        display.ScaleArray = ['POINTS', 'Velocity']
+        display.ScaleFactor = scale_factor
+
+    display.ColorArrayName = ['POINTS', 'Velocity']
+    display.LookupTable = pv_s.GetLookupTableForArray('Velocity', 3)
+    display.Opacity = opacity
+    return display, source
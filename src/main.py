@@ -2,6 +2,7 @@ import os
 import sys
 import json
 import blender_render  # Importing Blender rendering module
+import render_sweep  # Parameter sweeps over the same scene
 
 # Retrieve path variables from environment (set by GitHub Actions)
 LOCAL_INPUT_FOLDER = os.getenv("INPUT_FOLDER", os.path.join("..", "data", "testing-input-output"))
@@ -55,9 +56,34 @@ def prepare_files():
     simulation_data["blender_scene_file"] = BLENDER_SCENE_FILE
     return simulation_data  # ✅ Return updated simulation data
 
+def run_sweep_mode(simulation_data, spec_path, workers):
+    """Renders every variant of a sweep spec into per-variant folders of the output folder."""
+    if not os.path.exists(spec_path):
+        print(f"❌ Error: Sweep spec `{spec_path}` not found!")
+        sys.exit(1)
+
+    variants = render_sweep.expand_sweep(render_sweep.load_sweep_spec(spec_path), base=simulation_data)
+    status = render_sweep.run_sweep(simulation_data["blender_scene_file"], variants, LOCAL_OUTPUT_FOLDER, workers)
+    if status["failed"] or status["pending"] or status["running"]:
+        print(f"❌ Error: Sweep incomplete. Failed: {status['failed']}")
+        sys.exit(1)
+
+    print(f"✅ Sweep completed! Variants saved in {LOCAL_OUTPUT_FOLDER}/<variant>/")
+
 if __name__ == "__main__":
+    sweep_spec, sweep_workers = None, render_sweep.SWEEP_WORKERS
+    for i, arg in enumerate(sys.argv):
+        if arg == "--sweep" and i + 1 < len(sys.argv):
+            sweep_spec = sys.argv[i+1]
+        elif arg == "--workers" and i + 1 < len(sys.argv):
+            sweep_workers = int(sys.argv[i+1])
+
     simulation_data = prepare_files()  # ✅ Capture simulation parameters
 
+    if sweep_spec:
+        run_sweep_mode(simulation_data, sweep_spec, sweep_workers)
+        sys.exit(0)
+
     # Run Blender rendering with JSON-based simulation input
     blender_render.run_blender_render(simulation_data)
 
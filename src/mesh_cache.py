@@ -0,0 +1,237 @@
+# src/mesh_cache.py
+
+# Turbine mesh preparation: the model is converted once into compressed binary
+# .vtp files keyed by the hash of its content, one per level of detail, so the
+# render passes never re-parse the OBJ/STL text.
+# Example (any Python with VTK, e.g. pvpython):
+# pvpython mesh_cache.py data/testing-input-output/3d_model.obj [--cache-dir <dir>] [--levels 100,25,5]
+#
+# Cache layout: <cache_dir>/<hash>/lod<percent>.vtp plus manifest.json with the
+# triangle count of every level. The default cache is
+# <pipeline cache>/mesh_cache (see pipeline_cache.py), or MESH_CACHE_DIR /
+# --mesh-cache-dir. The passes pick a level with --mesh-lod:
+#   auto (default)         from the model's projected size on screen
+#   100 | 25 | 5           an explicit percentage of the original triangles
+#   final | preview | draft  a quality profile (100, 25 and 5 percent)
+
+import os
+import sys
+import json
+import math
+import hashlib
+
+from pipeline_cache import cache_path
+
+MESH_CACHE_VERSION = 1
+DEFAULT_LOD_LEVELS = [100, 25, 5]
+QUALITY_PROFILE_LOD = {"final": 100, "preview": 25, "draft": 5}
+# Projected model height (pixels) from which a level is detailed enough
+LOD_SCREEN_THRESHOLDS = [(600, 100), (150, 25), (0, 5)]
+HASH_BLOCK_SIZE = 1 << 20
+MESH_CACHE_ROOT = cache_path("mesh_cache")
+
+
+def parse_mesh_options(args):
+    """Parses --mesh-lod and --mesh-cache-dir from the raw command line."""
+    options = {"lod": os.getenv("MESH_LOD", "auto"), "cache_dir": os.getenv("MESH_CACHE_DIR")}
+    for i, arg in enumerate(args):
+        if arg == "--mesh-lod" and i + 1 < len(args):
+            options["lod"] = args[i+1]
+        elif arg == "--mesh-cache-dir" and i + 1 < len(args):
+            options["cache_dir"] = args[i+1]
+    return options
+
+
+def mesh_cache_key(model_path):
+    """Returns the cache key of a model: SHA-256 of its content and the cache format version."""
+    digest = hashlib.sha256(f"mesh-cache-v{MESH_CACHE_VERSION}:{os.path.splitext(model_path)[1].lower()}:".encode("utf-8"))
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()[:32]
+
+
+def default_cache_dir():
+    return os.getenv("MESH_CACHE_DIR") or MESH_CACHE_ROOT
+
+
+def projected_size_pixels(bounds, camera_position, focal_point, view_angle, image_height):
+    """Approximate on-screen height in pixels of a bounding box seen by a perspective camera."""
+    center = [(bounds[0] + bounds[1]) / 2, (bounds[2] + bounds[3]) / 2, (bounds[4] + bounds[5]) / 2]
+    radius = 0.5 * math.sqrt((bounds[1] - bounds[0]) ** 2 + (bounds[3] - bounds[2]) ** 2 + (bounds[5] - bounds[4]) ** 2)
+    distance = max(math.dist(camera_position, center), 1e-9)
+    visible_height = 2.0 * distance * math.tan(math.radians(view_angle) / 2.0)
+    return image_height * 2.0 * radius / visible_height
+
+
+def choose_lod(lod, levels, screen_pixels=None):
+    """Resolves a --mesh-lod value to one of the cached percentages.
+
+    Args:
+        lod (str): "auto", a percentage or a quality profile name.
+        levels (list): Available percentages.
+        screen_pixels (float): Projected model height, used by "auto".
+
+    Returns:
+        int: The chosen percentage (the closest available level).
+    """
+    lod = str(lod).lower()
+    if lod in QUALITY_PROFILE_LOD:
+        wanted = QUALITY_PROFILE_LOD[lod]
+    elif lod == "auto":
+        if screen_pixels is None:
+            wanted = max(levels)
+        else:
+            wanted = next(percent for threshold, percent in LOD_SCREEN_THRESHOLDS if screen_pixels >= threshold)
+    else:
+        wanted = int(float(lod))
+    # Never go below what was asked for if a finer level exists
+    finer = [level for level in levels if level >= wanted]
+    return min(finer) if finer else max(levels)
+
+
+def read_model(model_path):
+    """Reads an .obj, .stl or .vtp model into a vtkPolyData."""
+    from vtkmodules.vtkIOGeometry import vtkOBJReader, vtkSTLReader
+    from vtkmodules.vtkIOXML import vtkXMLPolyDataReader
+
+    ext = model_path.lower()
+    if ext.endswith(".obj"):
+        reader = vtkOBJReader()
+    elif ext.endswith(".stl"):
+        reader = vtkSTLReader()
+    elif ext.endswith(".vtp"):
+        reader = vtkXMLPolyDataReader()
+    else:
+        raise ValueError("Unsupported model format. Use .obj, .stl, or .vtp.")
+    reader.SetFileName(model_path)
+    reader.Update()
+    return reader.GetOutput()
+
+
+def write_vtp(path, polydata):
+    """Writes zlib-compressed, raw appended binary .vtp (write-then-rename)."""
+    from vtkmodules.vtkIOXML import vtkXMLPolyDataWriter
+
+    writer = vtkXMLPolyDataWriter()
+    writer.SetFileName(path + ".tmp")
+    writer.SetInputData(polydata)
+    writer.SetDataModeToAppended()
+    writer.EncodeAppendedDataOff()
+    writer.SetCompressorTypeToZLib()
+    writer.Write()
+    os.replace(path + ".tmp", path)
+
+
+def prepare_mesh_cache(model_path, cache_dir=None, levels=DEFAULT_LOD_LEVELS):
+    """Converts a model into its cached LOD variants unless they already exist.
+
+    Args:
+        model_path (str): Source .obj/.stl/.vtp model.
+        cache_dir (str): Cache root; defaults to `default_cache_dir()`.
+        levels (list): Percentages of the original triangles to keep.
+
+    Returns:
+        dict: The manifest: key, source and {percent: {"path", "triangles"}} levels.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    key = mesh_cache_key(model_path)
+    entry_dir = os.path.join(cache_dir, key)
+    manifest_path = os.path.join(entry_dir, "manifest.json")
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        manifest["levels"] = {int(percent): level for percent, level in manifest["levels"].items()}
+        if all(percent in manifest["levels"] and os.path.exists(manifest["levels"][percent]["path"]) for percent in levels):
+            return manifest
+
+    from vtkmodules.vtkFiltersCore import vtkTriangleFilter, vtkCleanPolyData, vtkQuadricDecimation, vtkPolyDataNormals
+
+    os.makedirs(entry_dir, exist_ok=True)
+    print(f"🔧 Building mesh cache for {model_path} ({', '.join(f'{p}%' for p in levels)})")
+    triangles = vtkTriangleFilter()
+    triangles.SetInputData(read_model(model_path))
+    clean = vtkCleanPolyData()
+    clean.SetInputConnection(triangles.GetOutputPort())
+    clean.Update()
+    full = clean.GetOutput()
+
+    manifest = {"key": key, "source": os.path.abspath(model_path), "bounds": list(full.GetBounds()), "levels": {}}
+    for percent in sorted(levels, reverse=True):
+        mesh = full
+        if percent < 100:
+            decimate = vtkQuadricDecimation()
+            decimate.SetInputData(full)
+            decimate.SetTargetReduction(1.0 - percent / 100.0)
+            decimate.VolumePreservationOn()
+            normals = vtkPolyDataNormals()
+            normals.SetInputConnection(decimate.GetOutputPort())
+            normals.SplittingOff()
+            normals.Update()
+            mesh = normals.GetOutput()
+        path = os.path.join(entry_dir, f"lod{percent}.vtp")
+        write_vtp(path, mesh)
+        manifest["levels"][percent] = {"path": path, "triangles": mesh.GetNumberOfCells()}
+        print(f"🔹 LOD {percent}%: {mesh.GetNumberOfCells()} triangles -> {path}")
+
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+def open_turbine_model(pv_s, model_path, options, camera=None, image_height=1080):
+    """Opens the turbine model from the mesh cache at the LOD chosen by the options.
+
+    Falls back to the original file when the cache cannot be built.
+
+    Args:
+        pv_s: The `paraview.simple` module.
+        model_path (str): Original model path.
+        options (dict): Mesh options from `parse_mesh_options`.
+        camera (dict): Optional {"position", "focal_point", "view_angle"} for "auto",
+            or a callable returning it from the model bounds.
+        image_height (int): Output height in pixels, for "auto".
+
+    Returns:
+        The reader proxy.
+    """
+    try:
+        manifest = prepare_mesh_cache(model_path, options.get("cache_dir"))
+    except Exception as e:
+        print(f"⚠️ Mesh cache unavailable ({e}); reading {model_path} directly")
+        ext = model_path.lower()
+        if ext.endswith(".obj"):
+            return pv_s.WavefrontOBJReader(FileName=model_path)
+        elif ext.endswith(".stl"):
+            return pv_s.STLReader(FileName=model_path)
+        return pv_s.XMLPolyDataReader(FileName=model_path)
+
+    levels = sorted(manifest["levels"])
+    screen_pixels = None
+    if str(options.get("lod", "auto")).lower() == "auto" and camera:
+        bounds = manifest["bounds"]
+        camera = camera(bounds) if callable(camera) else camera
+        screen_pixels = projected_size_pixels(bounds, camera["position"], camera["focal_point"],
+                                              camera.get("view_angle", 30.0), image_height)
+
+    percent = choose_lod(options.get("lod", "auto"), levels, screen_pixels)
+    level = manifest["levels"][percent]
+    print(f"✅ Turbine mesh: LOD {percent}% ({level['triangles']} triangles) from cache")
+    return pv_s.XMLPolyDataReader(FileName=level["path"])
+
+
+if __name__ == "__main__":
+    args = sys.argv
+    if len(args) < 2 or not os.path.isfile(args[1]):
+        print("Usage: pvpython mesh_cache.py <model.obj|.stl|.vtp> [--cache-dir <dir>] [--levels 100,25,5]")
+        sys.exit(1)
+
+    cache_dir, levels = None, DEFAULT_LOD_LEVELS
+    for i, arg in enumerate(args):
+        if arg == "--cache-dir" and i + 1 < len(args): cache_dir = args[i+1]
+        elif arg == "--levels" and i + 1 < len(args): levels = [int(x) for x in args[i+1].split(",")]
+
+    manifest = prepare_mesh_cache(args[1], cache_dir, levels)
+    print(f"MESH_CACHE_KEY={manifest['key']}")
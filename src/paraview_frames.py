@@ -0,0 +1,352 @@
+# src/paraview_frames.py
+
+# Frame export helpers shared by the ParaView render passes (run under pvpython).
+#
+# Optional flags understood by every pass:
+#   --keyframe-stride N     render only every Nth timestep (plus the last one);
+#                           the frames in between are synthesized afterwards by
+#                           frame_interpolation.py
+#   --frame-indices 3,4,5   render exactly these timestep indices (used for the
+#                           fallback renders requested by frame_interpolation.py)
+#   --adaptive-samples      double the samples per pixel until each frame
+#                           converges (see refine_samples)
+#   --noise-threshold T     mean absolute change (0-1 scale) between the image at
+#                           N and 2N samples below which a frame counts as converged
+#   --max-samples N         upper sample count per pixel for adaptive frames
+#   --frame-time-cap S      seconds after which an adaptive frame stops refining
+#                           (for the whole frame when it is rendered in tiles)
+#   --resolution WxH        render size, overriding the pass default; render once
+#                           at the largest size needed and derive the smaller
+#                           copies with renditions.py
+#   --max-tile-size WxH     largest framebuffer rendered at once; bigger outputs
+#                           are rendered tile by tile and stitched (render_tiled)
+#   --tile-memory-mb M      framebuffer memory cap per tile, which can shrink
+#                           the tiles further
+#
+# VTK and NumPy are imported inside the capture helpers so the option parsing
+# stays importable from plain Python.
+
+import os
+import json
+import time
+
+ADAPTIVE_LOG_FILE = "adaptive_samples.json"
+TILE_MEMORY_MB = float(os.getenv("TILE_MEMORY_MB", "512"))
+# Rough framebuffer footprint of the pathtracer (float accumulation, variance, depth, ...)
+TILE_BYTES_PER_PIXEL = 64
+
+
+def parse_render_options(args):
+    """Parses the optional frame-selection and sampling flags shared by the render passes.
+
+    Args:
+        args (list): The raw command line (sys.argv).
+
+    Returns:
+        dict: Render options.
+    """
+    options = {
+        "keyframe_stride": 1,
+        "frame_indices": None,
+        "adaptive_samples": False,
+        "min_samples": 1,
+        "max_samples": 64,
+        "noise_threshold": 0.002,
+        "frame_time_cap": 60.0,
+        "resolution": None,
+        "max_tile_size": [1920, 1080],
+        "tile_memory_mb": TILE_MEMORY_MB,
+    }
+    for i, arg in enumerate(args):
+        if arg == "--keyframe-stride" and i + 1 < len(args):
+            options["keyframe_stride"] = max(1, int(args[i+1]))
+        elif arg == "--frame-indices" and i + 1 < len(args):
+            options["frame_indices"] = [int(x) for x in args[i+1].split(",") if x.strip()]
+        elif arg == "--adaptive-samples":
+            options["adaptive_samples"] = True
+        elif arg == "--max-samples" and i + 1 < len(args):
+            options["max_samples"] = max(1, int(args[i+1]))
+        elif arg == "--noise-threshold" and i + 1 < len(args):
+            options["noise_threshold"] = float(args[i+1])
+        elif arg == "--frame-time-cap" and i + 1 < len(args):
+            options["frame_time_cap"] = float(args[i+1])
+        elif arg == "--resolution" and i + 1 < len(args):
+            options["resolution"] = [int(x) for x in args[i+1].lower().split("x")]
+        elif arg == "--max-tile-size" and i + 1 < len(args):
+            options["max_tile_size"] = [int(x) for x in args[i+1].lower().split("x")]
+        elif arg == "--tile-memory-mb" and i + 1 < len(args):
+            options["tile_memory_mb"] = float(args[i+1])
+    return options
+
+
+def select_frame_indices(num_timesteps, options):
+    """Returns the timestep indices to render, or None to render all of them."""
+    if options.get("frame_indices") is not None:
+        return sorted(set(i for i in options["frame_indices"] if 0 <= i < num_timesteps))
+
+    stride = options.get("keyframe_stride", 1)
+    if stride <= 1 or num_timesteps == 0:
+        return None
+
+    indices = list(range(0, num_timesteps, stride))
+    if indices[-1] != num_timesteps - 1:
+        indices.append(num_timesteps - 1)  # Keep the last frame so interpolation has an end point
+    return indices
+
+
+def capture_view(view):
+    """Renders a view through its proxy and returns the image as a NumPy array.
+
+    CaptureImage is a still render of the view proxy: collective under pvbatch
+    with MPI, composited on rank 0, and the only render of the capture (unlike
+    reading the render window, which would render it again outside the proxy).
+
+    Returns:
+        numpy.ndarray: Pixels as (height, width, components), bottom row first (VTK order).
+    """
+    from vtkmodules.util.numpy_support import vtk_to_numpy
+
+    image = view.CaptureImage(1)
+    width, height, _ = image.GetDimensions()
+    pixels = vtk_to_numpy(image.GetPointData().GetScalars())
+    return pixels.reshape(height, width, -1).copy()
+
+
+def write_png(path, pixels):
+    """Writes a (height, width, components) uint8 array in VTK row order to a PNG file."""
+    from vtkmodules.vtkCommonDataModel import vtkImageData
+    from vtkmodules.vtkIOImage import vtkPNGWriter
+    from vtkmodules.util.numpy_support import numpy_to_vtk
+
+    height, width, components = pixels.shape
+    image = vtkImageData()
+    image.SetDimensions(width, height, 1)
+    scalars = numpy_to_vtk(pixels.reshape(-1, components), deep=True)
+    image.GetPointData().SetScalars(scalars)
+
+    writer = vtkPNGWriter()
+    writer.SetFileName(path)
+    writer.SetInputData(image)
+    writer.Write()
+
+
+def refine_samples(view, render, options):
+    """Renders a frame at doubling sample counts until it converges.
+
+    Every level is one explicit render at `SamplesPerPixel = N` with a single
+    progressive pass, so it does not depend on how OSPRay accumulates samples
+    across captures (not verified against pvpython, and reset whenever the
+    camera moves). The mean absolute change from the level at N/2 samples is
+    the noise estimate; refinement stops once it drops below the noise
+    threshold, at the sample cap, or when the next level (about twice the
+    cost of the last) would overrun the frame time cap. Stopping at N samples
+    costs less than 2N.
+
+    Args:
+        view: Render view; its SamplesPerPixel and ProgressivePasses are set here.
+        render (callable): Renders the frame at the current settings and returns its pixels.
+        options (dict): Render options from `parse_render_options`.
+
+    Returns:
+        tuple: (pixels, samples_used, last_change, seconds)
+    """
+    import numpy as np
+
+    start = time.time()
+    view.ProgressivePasses = 1
+    samples, previous, change = options["min_samples"], None, None
+    while True:
+        level_start = time.time()
+        view.SamplesPerPixel = samples
+        pixels = render()
+        level_seconds = time.time() - level_start
+        if previous is not None:
+            change = float(np.mean(np.abs(pixels.astype(np.float32) - previous.astype(np.float32)))) / 255.0
+            if change <= options["noise_threshold"]:
+                break
+        if samples * 2 > options["max_samples"] or \
+                time.time() - start + 2 * level_seconds > options["frame_time_cap"]:
+            break
+        previous, samples = pixels, samples * 2
+    return pixels, samples, change, time.time() - start
+
+
+def render_adaptive(pv_s, view, options):
+    """Renders the current frame with as many samples as it needs (see refine_samples).
+
+    Returns:
+        tuple: (pixels, samples_used, last_change, seconds)
+    """
+    return refine_samples(view, lambda: capture_view(view), options)
+
+
+def plan_tiles(resolution, max_tile_size, memory_mb=0, bytes_per_pixel=TILE_BYTES_PER_PIXEL):
+    """Splits an output image into the fewest near-equal tiles that fit the limits.
+
+    Args:
+        resolution (list): Output [width, height].
+        max_tile_size (list): Largest [width, height] of a single render.
+        memory_mb (float): Framebuffer memory cap per tile; 0 disables it.
+        bytes_per_pixel (int): Estimated framebuffer bytes per pixel.
+
+    Returns:
+        list: (x, y, width, height) tiles in VTK order (y from the bottom), row by row.
+    """
+    width, height = resolution
+    columns = -(-width // max(1, max_tile_size[0]))
+    rows = -(-height // max(1, max_tile_size[1]))
+    max_pixels = memory_mb * 1024 * 1024 / bytes_per_pixel if memory_mb > 0 else float("inf")
+    while (-(-width // columns)) * (-(-height // rows)) > max_pixels and (columns < width or rows < height):
+        # Split the longer tile side first to keep tiles close to square
+        if -(-width // columns) >= -(-height // rows):
+            columns += 1
+        else:
+            rows += 1
+
+    xs = [round(width * c / columns) for c in range(columns + 1)]
+    ys = [round(height * r / rows) for r in range(rows + 1)]
+    return [(xs[c], ys[r], xs[c + 1] - xs[c], ys[r + 1] - ys[r]) for r in range(rows) for c in range(columns)]
+
+
+def tile_camera(resolution, tile, view_angle):
+    """Returns the (view_angle, window_center) that makes a camera see only one tile.
+
+    The vertical view angle shrinks to the tile height and the window center
+    shifts the projection so the tile's part of the full frustum fills the view.
+    """
+    import math
+
+    width, height = resolution
+    x, y, tile_width, tile_height = tile
+    half = math.tan(math.radians(view_angle) / 2.0) * tile_height / height
+    center_x = ((x + tile_width / 2.0) / width * 2.0 - 1.0) * width / tile_width
+    center_y = ((y + tile_height / 2.0) / height * 2.0 - 1.0) * height / tile_height
+    return math.degrees(2.0 * math.atan(half)), (center_x, center_y)
+
+
+def render_tiled(pv_s, view, resolution, tiles, options):
+    """Renders an image larger than one framebuffer tile by tile and stitches it with NumPy.
+
+    Only one tile-sized framebuffer exists at a time; the stitched frame is a
+    plain uint8 array.
+
+    With adaptive sampling the whole frame is refined, not each tile
+    (refine_samples with the stitched frame): every tile is rendered at the
+    same sample count, so neighbouring tiles never end at different noise
+    levels (visible seams), and `frame_time_cap` is one budget for the whole
+    frame.
+
+    Returns:
+        tuple: (pixels, samples_used, last_change, seconds) as for render_adaptive.
+    """
+    import numpy as np
+
+    start = time.time()
+    camera = view.GetActiveCamera()
+    view_angle, window_center = camera.GetViewAngle(), camera.GetWindowCenter()
+
+    def render_level():
+        image = None
+        for tile in tiles:
+            x, y, tile_width, tile_height = tile
+            tile_angle, tile_center = tile_camera(resolution, tile, view_angle)
+            view.ViewSize = [tile_width, tile_height]
+            camera.SetViewAngle(tile_angle)
+            camera.SetWindowCenter(*tile_center)
+            pixels = capture_view(view)
+            if image is None:
+                image = np.zeros((resolution[1], resolution[0], pixels.shape[2]), dtype=pixels.dtype)
+            image[y:y + tile_height, x:x + tile_width] = pixels[:tile_height, :tile_width]
+        return image
+
+    try:
+        if not options.get("adaptive_samples"):
+            return render_level(), None, None, time.time() - start
+
+        return refine_samples(view, render_level, options)
+    finally:
+        camera.SetViewAngle(view_angle)
+        camera.SetWindowCenter(*window_center)
+
+
+def save_frames(pv_s, view, timesteps, frame_pattern, resolution, quality, options, progress=None, before_frame=None):
+    """Renders the selected timesteps of the active animation to numbered PNGs.
+
+    Frames keep the index of their timestep in the file name, so a strided
+    render leaves gaps for frame_interpolation.py to fill. In adaptive mode the
+    samples used for every frame are logged next to the frames. Outputs larger
+    than the tile limits are rendered tile by tile (see render_tiled).
+
+    Args:
+        pv_s: The `paraview.simple` module.
+        view: Render view to capture.
+        timesteps (list): TimestepValues of the animated source.
+        frame_pattern (str): Output pattern such as `.../frame_%04d.png`.
+        resolution (list): Image resolution [width, height]; `--resolution` overrides it.
+        quality (int): Image quality passed to ParaView.
+        options (dict): Render options from `parse_render_options`.
+        progress (callable): Optional `progress(frame_index, done, total)` called after
+            every frame; frames are then rendered one by one.
+        before_frame (callable): Optional `before_frame(frame_index)` called once the
+            scene is at a timestep and before it is rendered, e.g. to advance
+            particles; frames are then rendered one by one.
+    """
+    resolution = options.get("resolution") or resolution
+    tiles = plan_tiles(resolution, options.get("max_tile_size", resolution), options.get("tile_memory_mb", 0))
+    tiled = len(tiles) > 1
+    indices = select_frame_indices(len(timesteps), options)
+    if indices is None and not options.get("adaptive_samples") and not tiled and progress is None and before_frame is None:
+        pv_s.SaveAnimation(frame_pattern, view, ImageResolution=resolution, ImageQuality=quality)
+        return
+
+    if indices is None:
+        indices = list(range(len(timesteps)))
+
+    print(f"🎞️ Rendering {len(indices)} of {len(timesteps)} timesteps")
+    if tiled:
+        print(f"🧱 {resolution[0]}x{resolution[1]} frames in {len(tiles)} tiles of up to "
+              f"{max(t[2] for t in tiles)}x{max(t[3] for t in tiles)}")
+    scene = pv_s.GetAnimationScene()
+    sample_log = []
+    for done, index in enumerate(indices, start=1):
+        scene.AnimationTime = timesteps[index]
+        frame_path = frame_pattern % index
+        if before_frame:
+            before_frame(index)
+
+        if tiled:
+            pixels, samples, change, seconds = render_tiled(pv_s, view, resolution, tiles, options)
+            write_png(frame_path, pixels)
+            print(f"🔹 Frame {index}: {len(tiles)} tiles in {seconds:.1f}s")
+        elif options.get("adaptive_samples"):
+            view.ViewSize = resolution
+            pixels, samples, change, seconds = render_adaptive(pv_s, view, options)
+            write_png(frame_path, pixels)
+            print(f"🔹 Frame {index}: {samples} spp in {seconds:.1f}s")
+        else:
+            pv_s.Render(view)
+            pv_s.SaveScreenshot(frame_path, view, ImageResolution=resolution, ImageQuality=quality)
+
+        if options.get("adaptive_samples"):
+            sample_log.append({
+                "frame": index,
+                "time": timesteps[index],
+                "samples": samples,
+                "change": change,
+                "seconds": round(seconds, 3),
+            })
+
+        if progress:
+            progress(index, done, len(indices))
+
+    if sample_log:
+        # Merge with an earlier log so fallback renders (--frame-indices) keep the keyframe entries
+        log_path = os.path.join(os.path.dirname(frame_pattern), ADAPTIVE_LOG_FILE)
+        entries = {}
+        if os.path.exists(log_path):
+            with open(log_path, "r") as f:
+                entries = {entry["frame"]: entry for entry in json.load(f)}
+        entries.update({entry["frame"]: entry for entry in sample_log})
+        with open(log_path, "w") as f:
+            json.dump([entries[frame] for frame in sorted(entries)], f, indent=2)
+        print(f"✅ Samples per frame written to {log_path}")
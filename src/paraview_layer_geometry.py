@@ -2,6 +2,11 @@
 
 import paraview.simple as pv_s
 import sys, os
+from paraview_frames import parse_render_options, save_frames
+from mesh_cache import parse_mesh_options, open_turbine_model
+from paraview_parallel import parse_parallel_options, configure_parallel_view
+from timeseries_store import open_fluid_series
+from paraview_pipelines import framing_camera, apply_camera, show_turbine
 
 # --- Parse Input Arguments ---
 args = sys.argv
@@ -12,9 +17,13 @@ for i, arg in enumerate(args):
     elif arg == "--output-video": OUT_VIDEO = os.path.abspath(args[i+1])
 
 if not PVD or not MODEL or not OUT_VIDEO:
-    print("Usage: pvpython paraview_layer_geometry.py --pvd-file <.pvd> --turbine-model <.obj/.stl/.vtp> --output-video <.mp4>")
+    print("Usage: pvpython paraview_layer_geometry.py --pvd-file <.pvd> --turbine-model <.obj/.stl/.vtp> --output-video <.mp4> [--keyframe-stride N] [--frame-indices i,j,...] [--adaptive-samples] [--mesh-lod auto|100|25|5|final|preview|draft] [--redistribute auto|on|off]")
     sys.exit(1)
 
+RENDER_OPTIONS = parse_render_options(args)
+MESH_OPTIONS = parse_mesh_options(args)
+PARALLEL_OPTIONS = parse_parallel_options(args)
+
 # --- Output Path Configuration ---
 OUT_DIR = os.path.join(os.path.dirname(OUT_VIDEO), "geometry_layer_frames")
 os.makedirs(OUT_DIR, exist_ok=True)
@@ -24,43 +33,29 @@ print(f"📦 Exporting turbine geometry frames to: {FRAME_PATTERN}")
 
 # --- Load Session & Turbine Model ---
 pv_s.ResetSession()
-fluid = pv_s.PVDReader(FileName=PVD)
-
-ext = MODEL.lower()
-if ext.endswith(".obj"):
-    turbine_reader = pv_s.WavefrontOBJReader(FileName=MODEL)
-elif ext.endswith(".stl"):
-    turbine_reader = pv_s.STLReader(FileName=MODEL)
-elif ext.endswith(".vtp"):
-    turbine_reader = pv_s.XMLPolyDataReader(FileName=MODEL)
-else:
+fluid = open_fluid_series(pv_s, PVD)
+
+if not MODEL.lower().endswith((".obj", ".stl", ".vtp")):
     print("❌ Unsupported geometry format. Use .obj, .stl, or .vtp.")
     sys.exit(1)
 
+# The camera below frames the turbine, so the model fills the frame (auto LOD: full detail)
+image_height = (RENDER_OPTIONS["resolution"] or [1920, 1080])[1]
+turbine_reader = open_turbine_model(pv_s, MODEL, MESH_OPTIONS, camera=framing_camera, image_height=image_height)
+
 # --- Render View Configuration ---
 view = pv_s.GetActiveViewOrCreate('RenderView')
 pv_s.SetActiveView(view)
 view.ViewSize = [1920, 1080]
 view.BackEnd = 'pathtracer'
+configure_parallel_view(view)
 view.Shadows = 1  # AmbientOcclusion is not available in ParaView 5.11.2
 
 # --- Show Turbine Mesh Only ---
-turbine_display = pv_s.Show(turbine_reader, view)
-turbine_display.Representation = 'Surface'
-turbine_display.DiffuseColor = [0.9, 0.9, 0.9]
-turbine_display.AmbientColor = [0.3, 0.3, 0.3]
-turbine_display.Opacity = 1.0
+turbine_display = show_turbine(pv_s, turbine_reader, view, PARALLEL_OPTIONS)
 
 # --- Camera Setup ---
-bounds = turbine_reader.GetDataInformation().GetBounds()
-cx = (bounds[0] + bounds[1]) / 2
-cy = (bounds[2] + bounds[3]) / 2
-cz = (bounds[4] + bounds[5]) / 2
-d = max(bounds[1] - bounds[0], bounds[3] - bounds[2], bounds[5] - bounds[4])
-
-view.CameraPosition = [cx + d, cy + d, cz + d]
-view.CameraFocalPoint = [cx, cy, cz]
-view.CameraViewUp = [0, 0, 1]
+apply_camera(view, framing_camera(turbine_reader.GetDataInformation().GetBounds()))
 
 # --- Animation Setup ---
 scene = pv_s.GetAnimationScene()
@@ -70,7 +65,7 @@ scene.EndTime = fluid.TimestepValues[-1]
 scene.NumberOfFrames = len(fluid.TimestepValues)
 
 pv_s.Render()
-pv_s.SaveAnimation(FRAME_PATTERN, view, ImageResolution=[1920, 1080], ImageQuality=95)
+save_frames(pv_s, view, fluid.TimestepValues, FRAME_PATTERN, [1920, 1080], 95, RENDER_OPTIONS)
 pv_s.Disconnect()
 
 print(f"✅ Turbine geometry pass complete.")
@@ -2,6 +2,12 @@
 
 import paraview.simple as pv_s
 import sys, os
+from paraview_frames import parse_render_options, save_frames
+from particle_advection import parse_particle_options
+from glyph_budget import parse_glyph_options
+from timeseries_store import open_fluid_series
+from paraview_parallel import parse_parallel_options, configure_parallel_view
+from paraview_pipelines import framing_camera, apply_camera, show_particle_layer
 
 # --- Parse Arguments ---
 PVD_PATH, MODEL_PATH, OUTPUT_VIDEO_PATH = None, None, None
@@ -12,9 +18,14 @@ for i, arg in enumerate(args):
     elif arg == "--output-video": OUTPUT_VIDEO_PATH = os.path.abspath(args[i+1])
 
 if not PVD_PATH or not OUTPUT_VIDEO_PATH:
-    print("Usage: pvpython paraview_layer_particles.py --pvd-file path --turbine-model path --output-video path")
+    print("Usage: pvpython paraview_layer_particles.py --pvd-file path --turbine-model path --output-video path [--keyframe-stride N] [--frame-indices i,j,...] [--adaptive-samples] [--particle-mode advect|streamlines] [--inject-rate N] [--max-age N] [--glyph-budget N] [--glyph-sampling stratified|uniform] [--particle-representation glyphs|points|instanced] [--redistribute auto|on|off]")
     sys.exit(1)
 
+RENDER_OPTIONS = parse_render_options(args)
+PARTICLE_OPTIONS = parse_particle_options(args)
+GLYPH_OPTIONS = parse_glyph_options(args)
+PARALLEL_OPTIONS = parse_parallel_options(args)
+
 # --- Frame Output Path ---
 OUTPUT_DIR = os.path.join(os.path.dirname(OUTPUT_VIDEO_PATH), "particles_layer_frames")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -24,45 +35,20 @@ print(f"🎯 Output frames: {OUTPUT_PATTERN}")
 
 # --- Load Data ---
 pv_s.ResetSession()
-fluid = pv_s.PVDReader(FileName=PVD_PATH)
-
-# --- Stream Tracer ---
-bounds = fluid.GetDataInformation().GetBounds()
-tracer = pv_s.StreamTracer(Input=fluid, SeedType='Line')
-tracer.SeedType.Point1 = [bounds[0], bounds[2], bounds[4]]
-tracer.SeedType.Point2 = [bounds[0], bounds[3], bounds[5]]
-tracer.SeedType.Resolution = 100
-tracer.Vectors = ['POINTS', 'Velocity']
-tracer.IntegrationDirection = 'FORWARD'
-tracer.MaximumStepLength = 0.01
-
-# --- Glyphs ---
-glyph = pv_s.Glyph(Input=tracer, GlyphType='Sphere')
-glyph.ScaleArray = ['POINTS', 'Velocity']
-glyph.ScaleFactor = 0.2
-
-glyph_display = pv_s.Show(glyph)
-glyph_display.Representation = 'Surface'
-glyph_display.ColorArrayName = ['POINTS', 'Velocity']
-glyph_display.LookupTable = pv_s.GetLookupTableForArray('Velocity', 3)
-glyph_display.LookupTable.RescaleTransferFunction(0.0, 5.0)
-glyph_display.Opacity = 0.5
+fluid = open_fluid_series(pv_s, PVD_PATH)
 
 # --- Render View ---
 view = pv_s.GetActiveViewOrCreate('RenderView')
+
+# --- Particles: incremental advection or per-timestep stream tracing, within the glyph budget ---
+glyph_display, glyph, advance_particles = show_particle_layer(pv_s, fluid, view, PARTICLE_OPTIONS, GLYPH_OPTIONS, PARALLEL_OPTIONS)
 view.ViewSize = [1920, 1080]
 view.BackEnd = 'pathtracer'
 view.Shadows = 1
+configure_parallel_view(view)
 
 # --- Camera Position ---
-cx = (bounds[0] + bounds[1]) / 2
-cy = (bounds[2] + bounds[3]) / 2
-cz = (bounds[4] + bounds[5]) / 2
-d = max(bounds[1] - bounds[0], bounds[3] - bounds[2], bounds[5] - bounds[4]) * 2
-
-view.CameraPosition = [cx + d, cy + d, cz + d]
-view.CameraFocalPoint = [cx, cy, cz]
-view.CameraViewUp = [0, 0, 1]
+apply_camera(view, framing_camera(fluid.GetDataInformation().GetBounds(), factor=2))
 
 # --- Animate + Save ---
 scene = pv_s.GetAnimationScene()
@@ -72,7 +58,8 @@ scene.EndTime = fluid.TimestepValues[-1]
 scene.NumberOfFrames = len(fluid.TimestepValues)
 
 pv_s.Render()
-pv_s.SaveAnimation(OUTPUT_PATTERN, view, ImageResolution=[1920, 1080], ImageQuality=90)
+save_frames(pv_s, view, fluid.TimestepValues, OUTPUT_PATTERN, [1920, 1080], 90, RENDER_OPTIONS,
+            before_frame=advance_particles)
 pv_s.Disconnect()
 
 print(f"✅ Particle-only pass complete.")
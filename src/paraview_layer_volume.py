@@ -2,6 +2,10 @@
 
 import paraview.simple as pv_s
 import sys, os
+from paraview_frames import parse_render_options, save_frames
+from paraview_parallel import parse_parallel_options, configure_parallel_view
+from timeseries_store import open_fluid_series
+from paraview_pipelines import framing_camera, apply_camera, show_volume
 
 # --- Parse Inputs ---
 args = sys.argv
@@ -11,9 +15,12 @@ for i, arg in enumerate(args):
     elif arg == "--output-video": OUT_PATH = os.path.abspath(args[i+1])
 
 if not PVD_PATH or not OUT_PATH:
-    print("Usage: pvpython paraview_layer_volume.py --pvd-file <.pvd> --output-video <.mp4>")
+    print("Usage: pvpython paraview_layer_volume.py --pvd-file <.pvd> --output-video <.mp4> [--keyframe-stride N] [--frame-indices i,j,...] [--adaptive-samples] [--redistribute auto|on|off]")
     sys.exit(1)
 
+RENDER_OPTIONS = parse_render_options(args)
+PARALLEL_OPTIONS = parse_parallel_options(args)
+
 # --- Frame Output Directory ---
 OUT_DIR = os.path.join(os.path.dirname(OUT_PATH), "volume_layer_frames")
 os.makedirs(OUT_DIR, exist_ok=True)
@@ -23,13 +30,7 @@ print(f"🌫️ Exporting volume frames to: {FRAME_PATTERN}")
 
 # --- Load Data ---
 pv_s.ResetSession()
-fluid = pv_s.PVDReader(FileName=PVD_PATH)
-pv_s.UpdatePipeline()
-
-# --- Compute Velocity Magnitude ---
-calc = pv_s.Calculator(Input=fluid)
-calc.ResultArrayName = 'VelMag'
-calc.Function = 'mag(Velocity)'
+fluid = open_fluid_series(pv_s, PVD_PATH)
 pv_s.UpdatePipeline()
 
 # --- View Setup ---
@@ -38,39 +39,13 @@ pv_s.SetActiveView(view)
 view.ViewSize = [1920, 1080]
 view.BackEnd = 'pathtracer'
 view.Shadows = 1
+configure_parallel_view(view)
 
-# --- Volume Rendering ---
-volume_display = pv_s.Show(calc, view)
-volume_display.Representation = 'Volume'
-volume_display.ColorArrayName = ['POINTS', 'VelMag']
-
-lut = pv_s.GetColorTransferFunction('VelMag')
-lut.ApplyPreset('Cool to Warm', True)
-lut.RescaleTransferFunction(0.0, 10.0)
-
-otf = pv_s.GetOpacityTransferFunction('VelMag')
-otf.Points = [
-    0.0, 0.0, 0.5, 0.0,
-    1.0, 0.05, 0.5, 0.0,
-    5.0, 0.3, 0.5, 0.0,
-    10.0, 0.8, 0.5, 0.0
-]
-
-volume_display.LookupTable = lut
-volume_display.OpacityArray = ['POINTS', 'VelMag']
-volume_display.ScalarOpacityFunction = otf
-volume_display.ScalarOpacityUnitDistance = 1.0
+# --- Volume Rendering: velocity magnitude, computed on every rank's region ---
+volume_display, calc = show_volume(pv_s, fluid, view, PARALLEL_OPTIONS)
 
 # --- Camera ---
-bounds = calc.GetDataInformation().GetBounds()
-cx = (bounds[0] + bounds[1]) / 2
-cy = (bounds[2] + bounds[3]) / 2
-cz = (bounds[4] + bounds[5]) / 2
-d = max(bounds[1] - bounds[0], bounds[3] - bounds[2], bounds[5] - bounds[4])
-
-view.CameraPosition = [cx + d, cy + d, cz + d]
-view.CameraFocalPoint = [cx, cy, cz]
-view.CameraViewUp = [0, 0, 1]
+apply_camera(view, framing_camera(calc.GetDataInformation().GetBounds()))
 
 # --- Animation Setup ---
 scene = pv_s.GetAnimationScene()
@@ -80,7 +55,7 @@ scene.EndTime = fluid.TimestepValues[-1]
 scene.NumberOfFrames = len(fluid.TimestepValues)
 
 pv_s.Render()
-pv_s.SaveAnimation(FRAME_PATTERN, view, ImageResolution=[1920, 1080], ImageQuality=90)
+save_frames(pv_s, view, fluid.TimestepValues, FRAME_PATTERN, [1920, 1080], 90, RENDER_OPTIONS)
 pv_s.Disconnect()
 
 print(f"✅ Volume pass complete.")
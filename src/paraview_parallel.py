@@ -0,0 +1,109 @@
+# src/paraview_parallel.py
+
+# Data-parallel rendering for the ParaView passes. Every pass also runs under
+# pvbatch with MPI, e.g.
+# mpiexec -n 4 pvbatch paraview_layer_volume.py --pvd-file <.pvd> --output-video <.mp4>
+#
+# pvbatch runs the script on rank 0 and the pipeline on every rank. The passes
+# send their data through RedistributeDataSet, so each rank owns one spatial
+# region of the mesh and the calculator, stream tracer and glyphs run on that
+# region only. Nothing is gathered for rendering: every rank renders its own
+# region and IceT composites the images sort-last, so rank 0 saves the
+# finished frame. With OSPRay (pathtracer) shadows only see the local region.
+#
+# Optional flags understood by every pass:
+#   --redistribute M          "auto" (default: only with more than one rank),
+#                             "on" or "off"
+#   --partition-boundary B    how cells on region boundaries are handled:
+#                             "split" (clip them, default), "unique" (each cell
+#                             goes to one region) or "duplicate" (to every region
+#                             it touches)
+
+import os
+
+REDISTRIBUTE = os.getenv("REDISTRIBUTE", "auto")
+PARTITION_BOUNDARY_MODES = {
+    "unique": "Assign cells uniquely",
+    "duplicate": "Duplicate cells",
+    "split": "Split cells",
+}
+
+
+def parse_parallel_options(args):
+    """Parses the redistribution flags shared by the render passes."""
+    options = {"redistribute": REDISTRIBUTE, "boundary": "split"}
+    for i, arg in enumerate(args):
+        if arg == "--redistribute" and i + 1 < len(args):
+            options["redistribute"] = args[i+1].lower()
+        elif arg == "--partition-boundary" and i + 1 < len(args):
+            options["boundary"] = args[i+1].lower()
+    if options["redistribute"] not in ("auto", "on", "off"):
+        raise ValueError(f"Unknown --redistribute mode '{options['redistribute']}' (use auto, on or off)")
+    if options["boundary"] not in PARTITION_BOUNDARY_MODES:
+        raise ValueError(f"Unknown --partition-boundary '{options['boundary']}' "
+                         f"(use {', '.join(PARTITION_BOUNDARY_MODES)})")
+    return options
+
+
+def partition_count():
+    """Returns the number of data-parallel ranks of the active ParaView session (1 outside ParaView)."""
+    try:
+        from paraview import servermanager
+    except ImportError:
+        return 1
+    connection = servermanager.ActiveConnection
+    return max(1, connection.GetNumberOfDataPartitions()) if connection else 1
+
+
+def should_redistribute(mode, partitions):
+    if mode == "on":
+        return True
+    if mode == "off":
+        return False
+    return partitions > 1
+
+
+def distribute(pv_s, source, options, boundary=None):
+    """Spatially partitions a source over the ranks, if redistribution is enabled.
+
+    Args:
+        pv_s: The `paraview.simple` module.
+        source: Pipeline proxy to partition.
+        options (dict): Parallel options from `parse_parallel_options`.
+        boundary (str): Boundary mode overriding the options ("split", "unique", "duplicate").
+
+    Returns:
+        The RedistributeDataSet proxy, or `source` unchanged.
+    """
+    partitions = partition_count()
+    if not should_redistribute(options["redistribute"], partitions):
+        return source
+    redistributed = pv_s.RedistributeDataSet(Input=source)
+    redistributed.BoundaryMode = PARTITION_BOUNDARY_MODES[boundary or options["boundary"]]
+    print(f"🧩 Redistributing data over {partitions} rank(s) ({redistributed.BoundaryMode.lower()})")
+    return redistributed
+
+
+def configure_parallel_view(view):
+    """Keeps rendering on the ranks that own the data, composited sort-last.
+
+    A remote render threshold of 0 means geometry is never gathered to rank 0
+    for local rendering, whatever its size.
+    """
+    partitions = partition_count()
+    if partitions > 1:
+        view.RemoteRenderThreshold = 0
+        print(f"🖥️ Sort-last compositing over {partitions} rank(s)")
+    return partitions
+
+
+def resolve_particle_mode(mode, partitions):
+    """Returns the particle mode to use with this many ranks.
+
+    The advection engine works on the data of the process running the script,
+    so parallel runs switch to stream tracing, which runs on every rank.
+    """
+    if mode == "advect" and partitions > 1:
+        print(f"⚠️ Particle advection is not distributed; using parallel stream tracing on {partitions} ranks")
+        return "streamlines"
+    return mode
@@ -0,0 +1,114 @@
+# src/paraview_pipelines.py
+
+# Pass pipelines shared by the one-shot ParaView passes and the render service
+# (paraview_render_service.py), so both render the same images from the same
+# flags: particles (advection or stream tracing, within the glyph budget), the
+# turbine surface, the velocity-magnitude volume and the default camera.
+#
+# Every builder takes the `paraview.simple` module as its first argument; the
+# camera helpers are plain Python.
+
+from particle_advection import attach_particle_engine
+from glyph_budget import show_particles
+from paraview_parallel import partition_count, distribute, resolve_particle_mode
+
+VOLUME_OPACITY_POINTS = [
+    0.0, 0.0, 0.5, 0.0,
+    1.0, 0.05, 0.5, 0.0,
+    5.0, 0.3, 0.5, 0.0,
+    10.0, 0.8, 0.5, 0.0
+]
+
+
+def framing_camera(bounds, factor=1):
+    """Returns the default camera looking diagonally at the centre of `bounds`.
+
+    Args:
+        bounds (list): (xmin, xmax, ymin, ymax, zmin, zmax).
+        factor (float): Camera distance in multiples of the largest extent.
+
+    Returns:
+        dict: {"position", "focal_point", "view_up"}.
+    """
+    center = [(bounds[0] + bounds[1]) / 2, (bounds[2] + bounds[3]) / 2, (bounds[4] + bounds[5]) / 2]
+    d = max(bounds[1] - bounds[0], bounds[3] - bounds[2], bounds[5] - bounds[4]) * factor
+    return {"position": [c + d for c in center], "focal_point": center, "view_up": [0, 0, 1]}
+
+
+def apply_camera(view, camera):
+    view.CameraPosition = camera["position"]
+    view.CameraFocalPoint = camera["focal_point"]
+    view.CameraViewUp = camera["view_up"]
+
+
+def show_particle_layer(pv_s, fluid, view, particle_options, glyph_options, parallel_options):
+    """Builds the particle source and shows it within the glyph budget.
+
+    Particles are advected incrementally ("advect") or traced from the seed line
+    on every timestep ("streamlines"); parallel runs always trace.
+
+    Returns:
+        tuple: (display proxy, last pipeline proxy, before_frame callable or None);
+            pass `before_frame` on to `paraview_frames.save_frames`.
+    """
+    bounds = fluid.GetDataInformation().GetBounds()
+    advance_particles = None
+    if resolve_particle_mode(particle_options["mode"], partition_count()) == "advect":
+        tracer, advance_particles = attach_particle_engine(pv_s, fluid, particle_options)
+    else:
+        tracer = pv_s.StreamTracer(Input=distribute(pv_s, fluid, parallel_options), SeedType='Line')
+        tracer.SeedType.Point1 = [bounds[0], bounds[2], bounds[4]]
+        tracer.SeedType.Point2 = [bounds[0], bounds[3], bounds[5]]
+        tracer.SeedType.Resolution = 100
+        tracer.Vectors = ['POINTS', 'Velocity']
+        tracer.IntegrationDirection = 'FORWARD'
+        tracer.MaximumStepLength = 0.01
+
+    display, glyph = show_particles(pv_s, tracer, view, glyph_options)
+    display.LookupTable.RescaleTransferFunction(0.0, 5.0)
+    return display, glyph, advance_particles
+
+
+def show_turbine(pv_s, turbine, view, parallel_options, ambient=0.3):
+    """Shows the turbine surface; surface cells stay whole across regions.
+
+    Args:
+        ambient (float): Ambient grey level (0.7 when composited over the particles).
+
+    Returns:
+        The display proxy.
+    """
+    display = pv_s.Show(distribute(pv_s, turbine, parallel_options, boundary="unique"), view)
+    display.Representation = 'Surface'
+    display.DiffuseColor = [0.9, 0.9, 0.9]
+    display.AmbientColor = [ambient, ambient, ambient]
+    display.Opacity = 1.0
+    return display
+
+
+def show_volume(pv_s, fluid, view, parallel_options):
+    """Volume-renders the velocity magnitude, computed on every rank's region.
+
+    Returns:
+        tuple: (display proxy, calculator proxy)
+    """
+    calc = pv_s.Calculator(Input=distribute(pv_s, fluid, parallel_options))
+    calc.ResultArrayName = 'VelMag'
+    calc.Function = 'mag(Velocity)'
+    pv_s.UpdatePipeline(proxy=calc)
+
+    display = pv_s.Show(calc, view)
+    display.Representation = 'Volume'
+    display.ColorArrayName = ['POINTS', 'VelMag']
+
+    lut = pv_s.GetColorTransferFunction('VelMag')
+    lut.ApplyPreset('Cool to Warm', True)
+    lut.RescaleTransferFunction(0.0, 10.0)
+    otf = pv_s.GetOpacityTransferFunction('VelMag')
+    otf.Points = VOLUME_OPACITY_POINTS
+
+    display.LookupTable = lut
+    display.OpacityArray = ['POINTS', 'VelMag']
+    display.ScalarOpacityFunction = otf
+    display.ScalarOpacityUnitDistance = 1.0
+    return display, calc
@@ -0,0 +1,87 @@
+# src/paraview_render_client.py
+
+# Thin client for paraview_render_service.py (plain Python, no ParaView needed).
+# Examples:
+# python3 paraview_render_client.py --ping
+# python3 paraview_render_client.py --pass particles --pvd-file data.pvd --turbine-model model.obj \
+#     --output-dir particles_layer_frames [--resolution 1920x1080] [--quality 90] [-- --keyframe-stride 4]
+# python3 paraview_render_client.py --shutdown
+#
+# Anything after a bare "--" is forwarded to the service as pass flags
+# (the same flags the one-shot pass scripts accept).
+
+import os
+import sys
+import json
+import socket
+
+DEFAULT_HOST = os.getenv("PV_SERVICE_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.getenv("PV_SERVICE_PORT", "8766"))
+
+
+def submit(job, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=None):
+    """Sends one job to the render service and yields its events as they arrive.
+
+    Args:
+        job (dict): Job description (see paraview_render_service.py).
+        host (str): Service host.
+        port (int): Service port.
+        timeout (float): Socket timeout in seconds (None waits indefinitely).
+
+    Yields:
+        dict: Events streamed back by the service.
+    """
+    with socket.create_connection((host, port), timeout=timeout) as connection:
+        connection.sendall((json.dumps(job) + "\n").encode("utf-8"))
+        connection.shutdown(socket.SHUT_WR)
+        with connection.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+
+
+if __name__ == "__main__":
+    args = sys.argv
+    forwarded = args[args.index("--") + 1:] if "--" in args else []
+    own_args = args[:args.index("--")] if "--" in args else args
+
+    job = {"type": "render", "args": forwarded}
+    host, port = DEFAULT_HOST, DEFAULT_PORT
+    for i, arg in enumerate(own_args):
+        if arg == "--ping": job = {"type": "ping"}
+        elif arg == "--shutdown": job = {"type": "shutdown"}
+        elif arg == "--pass" and i + 1 < len(own_args): job["pass"] = own_args[i+1]
+        elif arg == "--pvd-file" and i + 1 < len(own_args): job["pvd"] = os.path.abspath(own_args[i+1])
+        elif arg == "--turbine-model" and i + 1 < len(own_args): job["model"] = os.path.abspath(own_args[i+1])
+        elif arg == "--output-dir" and i + 1 < len(own_args): job["output_dir"] = os.path.abspath(own_args[i+1])
+        elif arg == "--resolution" and i + 1 < len(own_args): job["resolution"] = [int(v) for v in own_args[i+1].lower().split("x")]
+        elif arg == "--quality" and i + 1 < len(own_args): job["quality"] = int(own_args[i+1])
+        elif arg == "--host" and i + 1 < len(own_args): host = own_args[i+1]
+        elif arg == "--port" and i + 1 < len(own_args): port = int(own_args[i+1])
+
+    if job["type"] == "render" and (not job.get("pvd") or not job.get("output_dir")):
+        print("Usage: python3 paraview_render_client.py --pass <combined|particles|geometry|volume> --pvd-file <.pvd> "
+              "[--turbine-model <.obj/.stl/.vtp>] --output-dir <dir> [--resolution WxH] [--quality N] [-- <pass flags>]\n"
+              "       python3 paraview_render_client.py --ping | --shutdown")
+        sys.exit(1)
+
+    try:
+        for event in submit(job, host, port):
+            kind = event.get("event")
+            if kind == "progress":
+                print(f"🔹 Frame {event['frame']} ({event['done']}/{event['total']})")
+            elif kind == "accepted":
+                print(f"🎬 {event['pass']} pass accepted ({event['timesteps']} timesteps, {'warm' if event['warm'] else 'cold'} pipeline)")
+            elif kind == "done":
+                print(f"✅ Done in {event['seconds']}s")
+                print(f"PNG_OUTPUT_DIR={event['output_dir']}")
+            elif kind == "pong":
+                print(f"✅ Render service up: ParaView {event['paraview_version']} ({event['warm_datasets']} warm datasets)")
+            elif kind == "error":
+                print(f"❌ {event['message']}", file=sys.stderr)
+                sys.exit(1)
+            else:
+                print(json.dumps(event))
+    except OSError as e:
+        print(f"❌ Could not reach the render service at {host}:{port}: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,234 @@
+# src/paraview_render_service.py
+
+# Long-lived ParaView render service: pays interpreter startup, the paraview.simple
+# import, the display connection and data loading once, then serves render jobs.
+# Start it with pvpython (under Xvfb like the one-shot passes):
+# pvpython paraview_render_service.py [--port 8766] [--cache-size 4]
+# and submit jobs with paraview_render_client.py.
+#
+# Protocol: one JSON object per line over a local TCP socket.
+#   {"type": "ping"}
+#   {"type": "render", "pass": "combined|particles|geometry|volume", "pvd": ..., "model": ...,
+#    "output_dir": ..., "camera": {"position": [..], "focal_point": [..], "view_up": [..]},
+#    "resolution": [1920, 1080], "quality": 95, "args": ["--keyframe-stride", "4", ...]}
+#   {"type": "shutdown"}
+# The service answers with JSON event lines: accepted, progress, done, pong or error.
+#
+# Readers and per-pass pipelines of recently used datasets stay loaded (LRU keyed
+# on file path and modification time), so back-to-back jobs on the same case skip
+# loading entirely. The pipelines come from paraview_pipelines.py, like the
+# one-shot passes, and take the same particle, glyph and parallel flags in "args".
+#
+# The service is for local, interactive use (many jobs on one warm session). CI
+# renders with the one-shot passes, which also run under MPI (paraview_parallel.py).
+
+import os
+import sys
+import json
+import time
+import socketserver
+
+import paraview.simple as pv_s
+from paraview_frames import parse_render_options, save_frames
+from particle_advection import parse_particle_options
+from glyph_budget import parse_glyph_options
+from mesh_cache import open_turbine_model
+from timeseries_store import open_fluid_series
+from paraview_parallel import parse_parallel_options, configure_parallel_view
+from paraview_pipelines import framing_camera, show_particle_layer, show_turbine, show_volume
+from warm_cache import WarmCache
+
+DEFAULT_PORT = int(os.getenv("PV_SERVICE_PORT", "8766"))
+DEFAULT_CACHE_SIZE = int(os.getenv("PV_SERVICE_CACHE_SIZE", "4"))
+RENDER_PASSES = ("combined", "particles", "geometry", "volume")
+
+
+def file_key(path):
+    path = os.path.abspath(path)
+    return path, os.path.getmtime(path)
+
+
+def created_since(known):
+    """Returns the pipeline proxies registered after the `GetSources()` snapshot `known`, newest first."""
+    created = [(int(key[1]), proxy) for key, proxy in pv_s.GetSources().items() if key not in known]
+    return [proxy for _, proxy in sorted(created, key=lambda item: item[0], reverse=True)]
+
+
+def open_turbine_reader(model_path):
+    if not model_path.lower().endswith((".obj", ".stl", ".vtp")):
+        raise ValueError("Unsupported model format. Use .obj, .stl, or .vtp.")
+    # Full detail: the service renders every pass from the same warm dataset
+    return open_turbine_model(pv_s, model_path, {"lod": os.getenv("MESH_LOD", "100"), "cache_dir": os.getenv("MESH_CACHE_DIR")})
+
+
+class WarmDataset:
+    """Readers for one PVD/model pair plus the pass pipelines built on them."""
+
+    def __init__(self, pvd_path, model_path):
+        self.fluid = open_fluid_series(pv_s, pvd_path)
+        self.fluid.UpdatePipeline()
+        self.turbine = open_turbine_reader(model_path) if model_path else None
+        self.pipelines = {}
+
+    def sources(self):
+        proxies = []
+        for pipeline in self.pipelines.values():
+            proxies.extend(pipeline["filters"])
+        proxies.append(self.fluid)
+        if self.turbine:
+            proxies.append(self.turbine)
+        return proxies
+
+    def delete(self):
+        for proxy in self.sources():
+            pv_s.Delete(proxy)
+
+
+class RenderService:
+    """Owns the render view and the LRU cache of warm datasets."""
+
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE):
+        self.datasets = WarmCache(cache_size, on_evict=lambda dataset: dataset.delete())
+        self.view = pv_s.GetActiveViewOrCreate('RenderView')
+        pv_s.SetActiveView(self.view)
+        self.view.BackEnd = 'pathtracer'
+        self.view.Shadows = 1
+        self.view.OSPRayMaterialLibrary = pv_s.GetMaterialLibrary()
+        configure_parallel_view(self.view)
+        self.scene = pv_s.GetAnimationScene()
+        self.scene.PlayMode = 'Snap To TimeSteps'
+
+    # --- Dataset cache ---
+    def dataset(self, pvd_path, model_path):
+        key = (file_key(pvd_path), file_key(model_path) if model_path else None)
+        return self.datasets.get(key, lambda: WarmDataset(os.path.abspath(pvd_path),
+                                                          os.path.abspath(model_path) if model_path else None))
+
+    # --- Pass pipelines (shared with the one-shot pass scripts) ---
+    def build_pipeline(self, dataset, render_pass, args):
+        fluid, view = dataset.fluid, self.view
+        parallel_options = parse_parallel_options(args)
+        known = set(pv_s.GetSources())
+        displays, before_frame = [], None
+
+        if render_pass in ("combined", "particles"):
+            glyph_display, _, before_frame = show_particle_layer(
+                pv_s, fluid, view, parse_particle_options(args), parse_glyph_options(args), parallel_options)
+            displays.append(glyph_display)
+
+        if render_pass in ("combined", "geometry"):
+            if dataset.turbine is None:
+                raise ValueError(f"The '{render_pass}' pass needs a turbine model.")
+            ambient = 0.7 if render_pass == "combined" else 0.3
+            displays.append(show_turbine(pv_s, dataset.turbine, view, parallel_options, ambient=ambient))
+
+        if render_pass == "volume":
+            volume_display, _ = show_volume(pv_s, fluid, view, parallel_options)
+            displays.append(volume_display)
+
+        # Default camera: like the pass scripts, framed on the data the pass shows
+        if render_pass == "geometry":
+            camera = framing_camera(dataset.turbine.GetDataInformation().GetBounds())
+        else:
+            factor = 2 if render_pass in ("combined", "particles") else 1
+            camera = framing_camera(fluid.GetDataInformation().GetBounds(), factor)
+        return {"filters": created_since(known), "displays": displays, "camera": camera, "before_frame": before_frame}
+
+    # --- Jobs ---
+    def render(self, job, send):
+        start = time.time()
+        render_pass = job.get("pass", "combined")
+        if render_pass not in RENDER_PASSES:
+            raise ValueError(f"Unknown pass '{render_pass}'. Use one of {', '.join(RENDER_PASSES)}.")
+
+        args = job.get("args", [])
+        dataset, warm = self.dataset(job["pvd"], job.get("model"))
+        # Pipelines depend on the particle, glyph and parallel flags, not on the render flags
+        pipeline_key = (render_pass, json.dumps([parse_particle_options(args), parse_glyph_options(args),
+                                                 parse_parallel_options(args)], sort_keys=True))
+        pipeline = dataset.pipelines.get(pipeline_key)
+        if pipeline is None:
+            pipeline = dataset.pipelines[pipeline_key] = self.build_pipeline(dataset, render_pass, args)
+            warm = False
+
+        for representation in self.view.Representations:
+            representation.Visibility = 0
+        for display in pipeline["displays"]:
+            display.Visibility = 1
+
+        camera = dict(pipeline["camera"], **job.get("camera", {}))
+        self.view.CameraPosition = camera["position"]
+        self.view.CameraFocalPoint = camera["focal_point"]
+        self.view.CameraViewUp = camera["view_up"]
+        resolution = job.get("resolution", [1920, 1080])
+        self.view.ViewSize = resolution
+
+        timesteps = dataset.fluid.TimestepValues
+        self.scene.UpdateAnimationUsingDataTimeSteps()
+
+        output_dir = os.path.abspath(job["output_dir"])
+        os.makedirs(output_dir, exist_ok=True)
+        send({"event": "accepted", "pass": render_pass, "warm": warm, "timesteps": len(timesteps)})
+
+        save_frames(
+            pv_s, self.view, timesteps, os.path.join(output_dir, "frame_%04d.png"),
+            resolution, job.get("quality", 95), parse_render_options(args),
+            progress=lambda index, done, total: send({"event": "progress", "frame": index, "done": done, "total": total}),
+            before_frame=pipeline["before_frame"],
+        )
+        send({"event": "done", "output_dir": output_dir, "seconds": round(time.time() - start, 2), "warm": warm})
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    def send(self, message):
+        self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                if job.get("type") == "ping":
+                    self.send({"event": "pong", "paraview_version": str(pv_s.GetParaViewVersion()),
+                               "module_path": pv_s.__file__, "warm_datasets": len(self.server.service.datasets)})
+                elif job.get("type") == "shutdown":
+                    self.send({"event": "bye"})
+                    self.server.stop_requested = True
+                    return
+                elif job.get("type") == "render":
+                    self.server.service.render(job, self.send)
+                else:
+                    self.send({"event": "error", "message": f"Unknown job type '{job.get('type')}'"})
+            except (BrokenPipeError, ConnectionResetError):
+                # The client went away; nobody is left to tell
+                print("⚠️ Client disconnected; dropping the connection", file=sys.stderr)
+                return
+            except Exception as e:
+                print(f"❌ Job failed: {e}", file=sys.stderr)
+                self.send({"event": "error", "message": str(e)})
+
+
+class RenderServer(socketserver.TCPServer):
+    # One job at a time: paraview.simple is not thread-safe
+    allow_reuse_address = True
+    stop_requested = False
+
+
+if __name__ == "__main__":
+    args = sys.argv
+    port, cache_size = DEFAULT_PORT, DEFAULT_CACHE_SIZE
+    for i, arg in enumerate(args):
+        if arg == "--port" and i + 1 < len(args): port = int(args[i+1])
+        elif arg == "--cache-size" and i + 1 < len(args): cache_size = int(args[i+1])
+
+    server = RenderServer(("127.0.0.1", port), JobHandler)
+    server.service = RenderService(cache_size)
+    print(f"✅ ParaView render service listening on 127.0.0.1:{port}")
+    sys.stdout.flush()
+    while not server.stop_requested:
+        server.handle_request()
+    server.server_close()
+    pv_s.Disconnect()
+    print("✅ ParaView render service stopped.")
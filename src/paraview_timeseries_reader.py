@@ -0,0 +1,79 @@
+# src/paraview_timeseries_reader.py
+
+# ParaView reader plugin for time-series stores (timeseries_store.py).
+# Loaded by timeseries_store.open_fluid_series; it can also be loaded by hand
+# in the GUI (Tools > Manage Plugins) to open .tss files.
+#
+# The mesh is decoded and turned into VTK points and cells once per file; every
+# timestep only converts its field arrays and shares the mesh with a shallow copy.
+#
+# The reader ignores piece requests: rank 0 decodes every timestep whole and the
+# other ranks get their share through RedistributeDataSet (paraview_parallel.py),
+# so with MPI the decoding does not scale with the rank count.
+
+import os
+import sys
+
+from paraview.util.vtkAlgorithm import VTKPythonAlgorithmBase, smproxy, smproperty, smdomain, smhint
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from timeseries_store import TimeSeriesStore, mesh_grid, to_unstructured_grid
+
+
+@smproxy.reader(name="TimeSeriesStoreReader", label="Time-Series Store Reader",
+                extensions="tss", file_description="Time-series store files")
+class TimeSeriesStoreReader(VTKPythonAlgorithmBase):
+    def __init__(self):
+        VTKPythonAlgorithmBase.__init__(self, nInputPorts=0, nOutputPorts=1, outputType="vtkUnstructuredGrid")
+        self._filename = None
+        self._store = None
+        self._mesh_grid = None
+
+    def _get_store(self):
+        if self._store is None and self._filename:
+            self._store = TimeSeriesStore(self._filename)
+        return self._store
+
+    @smproperty.stringvector(name="FileName")
+    @smdomain.filelist()
+    @smhint.filechooser(extensions="tss", file_description="Time-series store files")
+    def SetFileName(self, name):
+        if self._filename != name:
+            if self._store is not None:
+                self._store.close()
+            self._filename, self._store, self._mesh_grid = name, None, None
+            self.Modified()
+
+    @smproperty.doublevector(name="TimestepValues", information_only="1", si_class="vtkSITimeStepsProperty")
+    def GetTimestepValues(self):
+        store = self._get_store()
+        return store.times if store else None
+
+    def RequestInformation(self, request, inInfoVec, outInfoVec):
+        executive = self.GetExecutive()
+        info = outInfoVec.GetInformationObject(0)
+        info.Remove(executive.TIME_STEPS())
+        info.Remove(executive.TIME_RANGE())
+        store = self._get_store()
+        if store and len(store):
+            for time in store.times:
+                info.Append(executive.TIME_STEPS(), time)
+            info.Append(executive.TIME_RANGE(), store.times[0])
+            info.Append(executive.TIME_RANGE(), store.times[-1])
+        return 1
+
+    def RequestData(self, request, inInfoVec, outInfoVec):
+        from vtkmodules.vtkCommonDataModel import vtkDataObject, vtkUnstructuredGrid
+
+        executive = self.GetExecutive()
+        info = outInfoVec.GetInformationObject(0)
+        store = self._get_store()
+        time = info.Get(executive.UPDATE_TIME_STEP()) if info.Has(executive.UPDATE_TIME_STEP()) else store.times[0]
+        step = store.step_for_time(time)
+
+        if self._mesh_grid is None:
+            self._mesh_grid = mesh_grid(store.mesh())
+        output = vtkUnstructuredGrid.GetData(outInfoVec, 0)
+        output.ShallowCopy(to_unstructured_grid(store.read_fields(step), base=self._mesh_grid))
+        output.GetInformation().Set(vtkDataObject.DATA_TIME_STEP(), store.times[step])
+        return 1
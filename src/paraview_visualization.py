@@ -3,10 +3,18 @@
 # This script should be run with pvpython (ParaView's Python interpreter)
 # Example:
 # pvpython paraview_visualization.py --pvd-file /path/to/data.pvd --turbine-model /path/to/geometry.obj --output-video /path/to/video.mp4
+# (--pvd-file also takes a time-series store written by timeseries_store.py)
 
 import paraview.simple as pv_s
 import sys
 import os
+from paraview_frames import parse_render_options, save_frames
+from particle_advection import parse_particle_options
+from glyph_budget import parse_glyph_options
+from mesh_cache import parse_mesh_options, open_turbine_model
+from timeseries_store import open_fluid_series
+from paraview_parallel import parse_parallel_options, configure_parallel_view
+from paraview_pipelines import framing_camera, apply_camera, show_particle_layer, show_turbine
 
 OUTPUT_FRAMES_SUBDIR = "turbine_animation_frames"
 PVD_FILE_PATH = None
@@ -24,9 +32,15 @@ if __name__ == "__main__":
             base_output_path = args[i+1]
 
     if not PVD_FILE_PATH or not TURBINE_MODEL_PATH or not base_output_path:
-        print("Usage: pvpython paraview_visualization.py --pvd-file <.pvd> --turbine-model <.obj/.stl/.vtp> --output-video <path>")
+        print("Usage: pvpython paraview_visualization.py --pvd-file <.pvd> --turbine-model <.obj/.stl/.vtp> --output-video <path> [--keyframe-stride N] [--frame-indices i,j,...] [--adaptive-samples] [--particle-mode advect|streamlines] [--inject-rate N] [--max-age N] [--glyph-budget N] [--glyph-sampling stratified|uniform] [--particle-representation glyphs|points|instanced] [--mesh-lod auto|100|25|5|final|preview|draft] [--redistribute auto|on|off]")
         sys.exit(1)
 
+    render_options = parse_render_options(args)
+    particle_options = parse_particle_options(args)
+    glyph_options = parse_glyph_options(args)
+    mesh_options = parse_mesh_options(args)
+    parallel_options = parse_parallel_options(args)
+
     # Normalize paths
     PVD_FILE_PATH = os.path.abspath(PVD_FILE_PATH)
     TURBINE_MODEL_PATH = os.path.abspath(TURBINE_MODEL_PATH)
@@ -40,18 +54,16 @@ if __name__ == "__main__":
 
     # --- Load CFD Data ---
     pv_s.ResetSession()
-    fluid_reader = pv_s.PVDReader(FileName=PVD_FILE_PATH)
-
-    # --- Load Turbine Geometry ---
-    ext = TURBINE_MODEL_PATH.lower()
-    if ext.endswith(".obj"):
-        turbine_reader = pv_s.WavefrontOBJReader(FileName=TURBINE_MODEL_PATH)
-    elif ext.endswith(".stl"):
-        turbine_reader = pv_s.STLReader(FileName=TURBINE_MODEL_PATH)
-    elif ext.endswith(".vtp"):
-        turbine_reader = pv_s.XMLPolyDataReader(FileName=TURBINE_MODEL_PATH)
-    else:
+    fluid_reader = open_fluid_series(pv_s, PVD_FILE_PATH)
+
+    # --- Load Turbine Geometry (mesh cache; auto LOD from the camera set up below) ---
+    if not TURBINE_MODEL_PATH.lower().endswith((".obj", ".stl", ".vtp")):
         raise ValueError("Unsupported model format. Use .obj, .stl, or .vtp.")
+    camera = framing_camera(fluid_reader.GetDataInformation().GetBounds(), factor=2)
+    turbine_reader = open_turbine_model(
+        pv_s, TURBINE_MODEL_PATH, mesh_options, camera=camera,
+        image_height=(render_options["resolution"] or [1920, 1080])[1],
+    )
 
     # --- View & Renderer Setup ---
     render_view = pv_s.GetActiveViewOrCreate('RenderView')
@@ -59,6 +71,7 @@ if __name__ == "__main__":
     render_view.OSPRayMaterialLibrary = pv_s.GetMaterialLibrary()
     render_view.Shadows = 1
     render_view.BackEnd = 'pathtracer'
+    configure_parallel_view(render_view)
 
     # --- Place Lights ---
     render_view.KeyLightWarmth = 0.6
@@ -67,46 +80,17 @@ if __name__ == "__main__":
     render_view.KeyLightIntensity = 0.7
     render_view.FillLightKFRatio = 3.0
 
-    # --- Stream Tracer for Particles ---
-    bounds = fluid_reader.GetDataInformation().GetBounds()
-    tracer = pv_s.StreamTracer(Input=fluid_reader, SeedType='Line')
-    tracer.SeedType.Point1 = [bounds[0], bounds[2], bounds[4]]
-    tracer.SeedType.Point2 = [bounds[0], bounds[3], bounds[5]]
-    tracer.SeedType.Resolution = 100
-    tracer.Vectors = ['POINTS', 'Velocity']
-    tracer.IntegrationDirection = 'FORWARD'
-    tracer.MaximumStepLength = 0.01
-
-    glyph = pv_s.Glyph(Input=tracer, GlyphType='Sphere')
-    glyph.ScaleArray = ['POINTS', 'Velocity']
-    glyph.ScaleFactor = 0.2
-    pv_s.UpdatePipeline()
-
-    # --- Display Particles ---
-    glyph_display = pv_s.Show(glyph, render_view)
-    glyph_display.Representation = 'Surface'
-    glyph_display.ColorArrayName = ['POINTS', 'Velocity']
-    glyph_display.LookupTable = pv_s.GetLookupTableForArray('Velocity', 3)
+    # --- Particles: incremental advection or per-timestep stream tracing, within the glyph budget ---
+    glyph_display, glyph, advance_particles = show_particle_layer(
+        pv_s, fluid_reader, render_view, particle_options, glyph_options, parallel_options)
+    pv_s.UpdatePipeline(proxy=glyph)
     glyph_display.LookupTable.ColorSpace = 'RGB'
-    glyph_display.LookupTable.RescaleTransferFunction(0.0, 5.0)
-    glyph_display.Opacity = 0.5
 
     # --- Turbine Display ---
-    turbine_display = pv_s.Show(turbine_reader, render_view)
-    turbine_display.AmbientColor = [0.7, 0.7, 0.7]
-    turbine_display.DiffuseColor = [0.9, 0.9, 0.9]
-    turbine_display.Opacity = 1.0
-    turbine_display.Representation = 'Surface'
+    turbine_display = show_turbine(pv_s, turbine_reader, render_view, parallel_options, ambient=0.7)
 
     # --- Camera ---
-    cx = (bounds[0] + bounds[1]) / 2
-    cy = (bounds[2] + bounds[3]) / 2
-    cz = (bounds[4] + bounds[5]) / 2
-    dist = max(bounds[1] - bounds[0], bounds[3] - bounds[2], bounds[5] - bounds[4]) * 2
-
-    render_view.CameraPosition = [cx + dist, cy + dist, cz + dist]
-    render_view.CameraFocalPoint = [cx, cy, cz]
-    render_view.CameraViewUp = [0, 0, 1]
+    apply_camera(render_view, camera)
     render_view.ViewSize = [1920, 1080]
 
     # --- Animate Over Timesteps ---
@@ -120,11 +104,15 @@ if __name__ == "__main__":
 
     # --- Save Animation ---
     print(f"🎥 Saving frames to {PARAVIEW_OUTPUT_PATTERN} ...")
-    pv_s.SaveAnimation(
-        PARAVIEW_OUTPUT_PATTERN,
+    save_frames(
+        pv_s,
         render_view,
-        ImageResolution=[1920, 1080],
-        ImageQuality=95
+        fluid_reader.TimestepValues,
+        PARAVIEW_OUTPUT_PATTERN,
+        [1920, 1080],
+        95,
+        render_options,
+        before_frame=advance_particles
     )
 
     print(f"✅ Done. Exported PNGs to: {actual_output_dir}")
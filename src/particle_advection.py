@@ -0,0 +1,317 @@
+# src/particle_advection.py
+
+# Incremental particle advection for the particle layers.
+#
+# Instead of tracing full streamlines from the seed line on every timestep, a set
+# of particles is kept across frames and moved by one timestep per frame with RK4
+# in the (time-interpolated) velocity field. Velocities are looked up on a regular
+# lattice over the flow domain: the nearest mesh point of every lattice node is
+# found once (the point locator), after which each timestep is a single gather of
+# the velocity array plus a trilinear interpolation per particle. The per-frame
+# cost therefore scales with the particle count, not with streamline length.
+#
+# Optional flags understood by the particle passes:
+#   --particle-mode M       "advect" (default) or "streamlines" (the old StreamTracer)
+#   --inject-rate N         particles released along the seed line per timestep
+#   --max-age N             timesteps after which a particle is retired
+#   --max-particles N       cap on live particles (the oldest are retired first)
+#   --lattice-resolution N  lattice nodes along the longest domain axis
+#   --substeps N            RK4 steps per timestep
+#
+# The ParaView glue (attach_particle_engine) imports VTK lazily, so the engine
+# itself only needs NumPy.
+
+import os
+
+import numpy as np
+
+PARTICLE_MODE = os.getenv("PARTICLE_MODE", "advect")
+
+
+def parse_particle_options(args):
+    """Parses the particle engine flags shared by the particle passes.
+
+    Args:
+        args (list): The raw command line (sys.argv).
+
+    Returns:
+        dict: Particle options.
+    """
+    options = {
+        "mode": PARTICLE_MODE,
+        "inject_rate": 101,
+        "max_age": 200,
+        "max_particles": 20000,
+        "lattice_resolution": 64,
+        "substeps": 2,
+    }
+    for i, arg in enumerate(args):
+        if arg == "--particle-mode" and i + 1 < len(args):
+            options["mode"] = args[i+1]
+        elif arg == "--inject-rate" and i + 1 < len(args):
+            options["inject_rate"] = max(0, int(args[i+1]))
+        elif arg == "--max-age" and i + 1 < len(args):
+            options["max_age"] = max(1, int(args[i+1]))
+        elif arg == "--max-particles" and i + 1 < len(args):
+            options["max_particles"] = max(1, int(args[i+1]))
+        elif arg == "--lattice-resolution" and i + 1 < len(args):
+            options["lattice_resolution"] = max(2, int(args[i+1]))
+        elif arg == "--substeps" and i + 1 < len(args):
+            options["substeps"] = max(1, int(args[i+1]))
+    if options["mode"] not in ("advect", "streamlines"):
+        raise ValueError(f"Unknown particle mode '{options['mode']}'. Use advect or streamlines.")
+    return options
+
+
+def seed_line(point1, point2, resolution):
+    """Returns the resolution + 1 points of a line seed, like ParaView's Line source."""
+    t = np.linspace(0.0, 1.0, resolution + 1)[:, None]
+    return (1.0 - t) * np.asarray(point1, dtype=np.float64) + t * np.asarray(point2, dtype=np.float64)
+
+
+def nearest_point_ids(points, nodes, chunk_size=2048):
+    """Brute-force nearest neighbour search in NumPy; fine for small meshes and tests.
+
+    The ParaView passes use VTK's point interpolator instead (see attach_particle_engine).
+    """
+    points = np.asarray(points, dtype=np.float64)
+    ids = np.empty(len(nodes), dtype=np.int64)
+    for start in range(0, len(nodes), chunk_size):
+        block = nodes[start:start + chunk_size]
+        distances = ((block[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+        ids[start:start + chunk_size] = distances.argmin(axis=1)
+    return ids
+
+
+class VelocityLattice:
+    """Regular lattice over the flow domain mapping every node to its nearest mesh point.
+
+    Args:
+        bounds (list): Domain bounds [xmin, xmax, ymin, ymax, zmin, zmax].
+        resolution (int): Nodes along the longest axis; shorter axes get proportionally fewer.
+        node_ids (numpy.ndarray): Nearest mesh point of every node, x varying fastest.
+            Computed with `nearest_point_ids` from `points` when omitted.
+        points (numpy.ndarray): Mesh point coordinates, (n, 3).
+    """
+
+    def __init__(self, bounds, resolution, node_ids=None, points=None):
+        lower = np.array(bounds[0::2], dtype=np.float64)
+        extent = np.array(bounds[1::2], dtype=np.float64) - lower
+        longest = max(float(extent.max()), 1e-12)
+        self.dims = np.maximum(2, np.round(resolution * extent / longest).astype(int) + 1)
+        self.origin = lower
+        self.spacing = np.where(extent > 0, extent / (self.dims - 1), 1.0)
+        if node_ids is None:
+            node_ids = nearest_point_ids(points, self.node_coordinates())
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+
+    def node_coordinates(self):
+        """Returns the (nx*ny*nz, 3) node positions, x varying fastest (VTK image order)."""
+        axes = [self.origin[k] + self.spacing[k] * np.arange(self.dims[k]) for k in range(3)]
+        z, y, x = np.meshgrid(axes[2], axes[1], axes[0], indexing="ij")
+        return np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+
+    def gather(self, point_vectors):
+        """Samples a per-point array onto the lattice; returns an (nz, ny, nx, c) array."""
+        values = np.asarray(point_vectors, dtype=np.float64)
+        values = values.reshape(len(values), -1)
+        return values[self.node_ids].reshape(self.dims[2], self.dims[1], self.dims[0], -1)
+
+    def interpolate(self, grid, positions):
+        """Trilinear interpolation of a gathered lattice array at arbitrary positions.
+
+        Returns:
+            tuple: (values (n, c), inside (n,) bool). Positions outside the domain
+                are clamped to it and flagged in `inside`.
+        """
+        f = (positions - self.origin) / self.spacing
+        upper = self.dims - 1
+        inside = np.all((f >= -1e-9) & (f <= upper + 1e-9), axis=1)
+        f = np.clip(f, 0, upper)
+        i0 = np.minimum(np.floor(f).astype(int), upper - 1)
+        w = f - i0
+        x0, y0, z0 = i0[:, 0], i0[:, 1], i0[:, 2]
+        wx, wy, wz = w[:, 0:1], w[:, 1:2], w[:, 2:3]
+
+        c00 = grid[z0, y0, x0] * (1 - wx) + grid[z0, y0, x0 + 1] * wx
+        c01 = grid[z0, y0 + 1, x0] * (1 - wx) + grid[z0, y0 + 1, x0 + 1] * wx
+        c10 = grid[z0 + 1, y0, x0] * (1 - wx) + grid[z0 + 1, y0, x0 + 1] * wx
+        c11 = grid[z0 + 1, y0 + 1, x0] * (1 - wx) + grid[z0 + 1, y0 + 1, x0 + 1] * wx
+        c0 = c00 * (1 - wy) + c01 * wy
+        c1 = c10 * (1 - wy) + c11 * wy
+        return c0 * (1 - wz) + c1 * wz, inside
+
+
+class ParticleEngine:
+    """Particles advected incrementally through a time-dependent velocity field.
+
+    Args:
+        lattice (VelocityLattice): Velocity lookup structure.
+        seeds (numpy.ndarray): Release points, (m, 3).
+        inject_rate (int): Particles released per timestep, cycling through the seeds.
+        max_age (int): Timesteps a particle lives.
+        max_particles (int): Upper bound on live particles.
+        substeps (int): RK4 steps per timestep.
+        grid (numpy.ndarray): Lattice velocities of the first timestep, so the
+            first particles start with the local flow velocity.
+    """
+
+    def __init__(self, lattice, seeds, inject_rate=101, max_age=200, max_particles=20000, substeps=2, grid=None):
+        self.lattice = lattice
+        self.seeds = np.asarray(seeds, dtype=np.float64)
+        self.inject_rate = inject_rate
+        self.max_age = max_age
+        self.max_particles = max_particles
+        self.substeps = substeps
+        self.reset(grid)
+
+    def reset(self, grid=None):
+        """Drops every particle and releases the first batch again, as at construction."""
+        self.positions = np.empty((0, 3))
+        self.velocities = np.empty((0, 3))
+        self.ages = np.empty(0, dtype=np.int64)
+        self._next_seed = 0
+        self.inject(grid)
+
+    def inject(self, grid=None):
+        """Releases `inject_rate` particles at the next seeds of the seed line.
+
+        Args:
+            grid (numpy.ndarray): Lattice velocities the new particles are sampled
+                from; without one they start at rest.
+        """
+        if self.inject_rate == 0 or len(self.seeds) == 0:
+            return
+        picks = (self._next_seed + np.arange(self.inject_rate)) % len(self.seeds)
+        self._next_seed = int((self._next_seed + self.inject_rate) % len(self.seeds))
+        positions = self.seeds[picks]
+        velocities = self.lattice.interpolate(grid, positions)[0] if grid is not None else np.zeros((len(picks), 3))
+        self.positions = np.concatenate([self.positions, positions])
+        self.velocities = np.concatenate([self.velocities, velocities])
+        self.ages = np.concatenate([self.ages, np.zeros(len(picks), dtype=np.int64)])
+
+    def _keep(self, mask):
+        self.positions, self.velocities, self.ages = self.positions[mask], self.velocities[mask], self.ages[mask]
+
+    def advance(self, grid_start, grid_end, dt):
+        """Moves every particle by one timestep of length `dt`.
+
+        The velocity is interpolated linearly in time between the two lattice
+        samples, so the RK4 substeps see a continuously varying field. Particles
+        that leave the domain or exceed their age are retired, new ones are
+        injected afterwards.
+
+        Args:
+            grid_start (numpy.ndarray): Lattice velocities at the start of the step.
+            grid_end (numpy.ndarray): Lattice velocities at the end of the step.
+            dt (float): Timestep length in simulation time units.
+        """
+        def velocity(positions, alpha):
+            v0, inside = self.lattice.interpolate(grid_start, positions)
+            v1, _ = self.lattice.interpolate(grid_end, positions)
+            return v0 * (1.0 - alpha) + v1 * alpha, inside
+
+        h = dt / self.substeps
+        alive = np.ones(len(self.positions), dtype=bool)
+        positions = self.positions
+        for step in range(self.substeps):
+            a0, a1 = step / self.substeps, (step + 0.5) / self.substeps
+            k1, in1 = velocity(positions, a0)
+            k2, in2 = velocity(positions + 0.5 * h * k1, a1)
+            k3, in3 = velocity(positions + 0.5 * h * k2, a1)
+            k4, in4 = velocity(positions + h * k3, (step + 1) / self.substeps)
+            positions = positions + (h / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
+            alive &= in1 & in2 & in3 & in4
+
+        self.velocities, inside = self.lattice.interpolate(grid_end, positions)
+        self.positions = positions
+        self.ages += 1
+        self._keep(alive & inside & (self.ages <= self.max_age))
+        self.inject(grid_end)
+        if len(self.positions) > self.max_particles:
+            self._keep(np.argsort(self.ages, kind="stable")[:self.max_particles])
+
+
+def attach_particle_engine(pv_s, fluid, options, seed_resolution=100):
+    """Builds the advected particle source for a ParaView particle pass.
+
+    The returned producer holds a vtkPolyData of the live particles with
+    `Velocity` and `Age` point arrays; `before_frame(index)` (see
+    paraview_frames.save_frames) advances the particles up to timestep `index`,
+    starting over from the first timestep when `index` lies behind them.
+
+    Returns:
+        tuple: (producer proxy, before_frame callable)
+    """
+    from vtkmodules.vtkCommonCore import vtkPoints
+    from vtkmodules.vtkCommonDataModel import vtkImageData, vtkPolyData, vtkCellArray
+    from vtkmodules.vtkFiltersPoints import vtkPointInterpolator, vtkVoronoiKernel
+    from vtkmodules.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, vtk_to_numpy
+
+    timesteps = list(fluid.TimestepValues)
+    merged = pv_s.MergeBlocks(Input=fluid)
+
+    def fetch(index):
+        merged.UpdatePipeline(timesteps[index])
+        return merged.GetClientSideObject().GetOutputDataObject(0)
+
+    # --- Point locator: nearest mesh point of every lattice node, built once ---
+    mesh = fetch(0)
+    bounds = mesh.GetBounds()
+    lattice = VelocityLattice(bounds, options["lattice_resolution"], node_ids=np.zeros(0))
+    image = vtkImageData()
+    image.SetDimensions(*[int(n) for n in lattice.dims])
+    image.SetOrigin(*lattice.origin)
+    image.SetSpacing(*lattice.spacing)
+    source = vtkPolyData()
+    source.SetPoints(mesh.GetPoints())
+    point_ids = numpy_to_vtk(np.arange(mesh.GetNumberOfPoints(), dtype=np.float64), deep=True)
+    point_ids.SetName("PointId")
+    source.GetPointData().AddArray(point_ids)
+    interpolator = vtkPointInterpolator()
+    interpolator.SetInputData(image)
+    interpolator.SetSourceData(source)
+    interpolator.SetKernel(vtkVoronoiKernel())
+    interpolator.Update()
+    lattice.node_ids = np.rint(vtk_to_numpy(interpolator.GetOutput().GetPointData().GetArray("PointId"))).astype(np.int64)
+    print(f"🧭 Velocity lattice {lattice.dims[0]}x{lattice.dims[1]}x{lattice.dims[2]} over {mesh.GetNumberOfPoints()} mesh points")
+
+    def velocity_grid(index):
+        return lattice.gather(vtk_to_numpy(fetch(index).GetPointData().GetArray("Velocity")))
+
+    seeds = seed_line([bounds[0], bounds[2], bounds[4]], [bounds[0], bounds[3], bounds[5]], seed_resolution)
+    state = {"step": 0, "grid": velocity_grid(0)}
+    engine = ParticleEngine(lattice, seeds, options["inject_rate"], options["max_age"],
+                            options["max_particles"], options["substeps"], grid=state["grid"])
+    producer = pv_s.TrivialProducer()
+
+    def publish():
+        polydata = vtkPolyData()
+        points = vtkPoints()
+        points.SetData(numpy_to_vtk(engine.positions, deep=True))
+        polydata.SetPoints(points)
+        count = len(engine.positions)
+        vertices = vtkCellArray()
+        cells = np.stack([np.ones(count, dtype=np.int64), np.arange(count, dtype=np.int64)], axis=1).ravel()
+        vertices.SetCells(count, numpy_to_vtkIdTypeArray(cells, deep=True))
+        polydata.SetVerts(vertices)
+        for name, values in (("Velocity", engine.velocities), ("Age", engine.ages.astype(np.float64))):
+            array = numpy_to_vtk(values, deep=True)
+            array.SetName(name)
+            polydata.GetPointData().AddArray(array)
+        producer.GetClientSideObject().SetOutput(polydata)
+        producer.MarkModified(producer)
+
+    def before_frame(index):
+        if index < state["step"]:
+            state.update(step=0, grid=velocity_grid(0))
+            engine.reset(state["grid"])
+        while state["step"] < index:
+            next_grid = velocity_grid(state["step"] + 1)
+            engine.advance(state["grid"], next_grid, timesteps[state["step"] + 1] - timesteps[state["step"]])
+            state["step"] += 1
+            state["grid"] = next_grid
+        publish()
+
+    publish()
+    return producer, before_frame
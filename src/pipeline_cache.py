@@ -0,0 +1,18 @@
+# src/pipeline_cache.py
+
+# Root of every derived cache the pipeline keeps between runs: Blender bakes
+# (fluid_simulation.py), turbine mesh levels (mesh_cache.py) and the sweep
+# queue (render_sweep.py). It lives outside data/testing-input-output on
+# purpose: that folder is zipped and uploaded as the output bundle, and caches
+# must not ride along with the results. CI persists the caches it reuses
+# across runs with actions/cache on the subfolders below this root.
+# Override the root with PIPELINE_CACHE_DIR; each cache also has its own override.
+
+import os
+
+CACHE_ROOT = os.getenv("PIPELINE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "fluid-pipeline"))
+
+
+def cache_path(name):
+    """Returns the default folder of one cache, e.g. cache_path("mesh_cache")."""
+    return os.path.join(CACHE_ROOT, name)
@@ -0,0 +1,344 @@
+# src/preview_renderer.py
+
+# ParaView-free preview renderer: plain CPython + NumPy, no display, no pathtracer.
+# Draws a velocity-magnitude slice, a quiver map of the in-plane velocity and the
+# turbine outline for every timestep of a .pvd collection (or a time-series
+# store from timeseries_store.py), into the same
+# frame_%04d.png layout as the ParaView passes, so quick checks and CI smoke
+# tests take seconds.
+# Example:
+# python3 preview_renderer.py --pvd-file data/testing-input-output/vtk_output/turbine_flow_animation.pvd \
+#     --turbine-model data/testing-input-output/3d_model.obj --output-dir data/testing-input-output/preview_frames \
+#     [--axis z] [--slice-position 0.5] [--resolution 960x540] [--arrows 32] [--max-speed 5]
+
+import os
+import sys
+import zlib
+import struct
+
+import numpy as np
+
+from pvd_index import parse_pvd, timestep_values
+from vtk_xml_reader import read_dataset
+from timeseries_store import STORE_EXTENSION, TimeSeriesStore
+
+PREVIEW_FRAMES_SUBDIR = "preview_frames"
+VELOCITY_ARRAY = os.getenv("VELOCITY_ARRAY", "Velocity")
+BACKGROUND = (32, 32, 36)
+ARROW_COLOR = (255, 255, 255)
+OUTLINE_COLOR = (20, 20, 20)
+# ParaView's "Cool to Warm" preset (the passes' default look)
+COOL_TO_WARM = np.array([[0.230, 0.299, 0.754], [0.865, 0.865, 0.865], [0.706, 0.016, 0.150]])
+PLANE_AXES = {"x": (1, 2), "y": (0, 2), "z": (0, 1)}
+
+
+def write_png(path, pixels):
+    """Writes an (height, width, 3) uint8 array as an 8-bit RGB PNG, top row first."""
+    height, width, _ = pixels.shape
+    rows = np.concatenate([np.zeros((height, 1), dtype=np.uint8), pixels.reshape(height, width * 3)], axis=1)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def colormap(values):
+    """Maps values in [0, 1] to uint8 RGB with the Cool to Warm color ramp."""
+    position = np.clip(values, 0.0, 1.0) * (len(COOL_TO_WARM) - 1)
+    lower = np.minimum(position.astype(int), len(COOL_TO_WARM) - 2)
+    t = (position - lower)[..., None]
+    rgb = COOL_TO_WARM[lower] * (1 - t) + COOL_TO_WARM[lower + 1] * t
+    return (rgb * 255).round().astype(np.uint8)
+
+
+def read_model_triangles(model_path):
+    """Reads the triangles of an .obj, .stl or .vtp model.
+
+    Returns:
+        tuple: (vertices (n, 3) float64, triangles (m, 3) int64)
+    """
+    ext = model_path.lower()
+    if ext.endswith(".obj"):
+        vertices, faces = [], []
+        with open(model_path, "r", errors="ignore") as f:
+            for line in f:
+                if line.startswith("v "):
+                    vertices.append([float(x) for x in line.split()[1:4]])
+                elif line.startswith("f "):
+                    corners = [int(token.split("/")[0]) for token in line.split()[1:]]
+                    corners = [c - 1 if c > 0 else len(vertices) + c for c in corners]
+                    faces.extend([corners[0], corners[k], corners[k + 1]] for k in range(1, len(corners) - 1))
+        return np.array(vertices, dtype=np.float64).reshape(-1, 3), np.array(faces, dtype=np.int64).reshape(-1, 3)
+
+    if ext.endswith(".stl"):
+        with open(model_path, "rb") as f:
+            content = f.read()
+        count = struct.unpack("<I", content[80:84])[0] if len(content) >= 84 else 0
+        if len(content) == 84 + 50 * count:
+            records = np.frombuffer(content[84:], dtype=np.dtype([("normal", "<f4", 3), ("v", "<f4", (3, 3)), ("attr", "<u2")]))
+            corners = records["v"].reshape(-1, 3).astype(np.float64)
+        else:
+            corners = np.array([[float(x) for x in line.split()[1:4]] for line in content.decode("ascii", "ignore").splitlines()
+                                if line.strip().startswith("vertex")], dtype=np.float64).reshape(-1, 3)
+        return corners, np.arange(len(corners), dtype=np.int64).reshape(-1, 3)
+
+    if ext.endswith(".vtp"):
+        dataset = read_dataset(model_path)
+        offsets = dataset.get("offsets", np.zeros(0, dtype=np.int64))
+        starts = np.concatenate([[0], offsets[:-1]])
+        triangles = [dataset["connectivity"][[s, s + k, s + k + 1]] for s, e in zip(starts, offsets) for k in range(1, e - s - 1)]
+        return dataset["points"], np.array(triangles, dtype=np.int64).reshape(-1, 3)
+
+    raise ValueError("Unsupported model format. Use .obj, .stl, or .vtp.")
+
+
+class SliceView:
+    """Maps a slice plane through the domain bounds onto an image of a given size."""
+
+    def __init__(self, bounds, axis="z", position=0.5, resolution=(960, 540), margin=0.04):
+        self.axis = "xyz".index(axis)
+        self.u, self.v = PLANE_AXES[axis]
+        self.plane = bounds[2 * self.axis] + position * (bounds[2 * self.axis + 1] - bounds[2 * self.axis])
+        self.width, self.height = resolution
+
+        u_range = (bounds[2 * self.u], bounds[2 * self.u + 1])
+        v_range = (bounds[2 * self.v], bounds[2 * self.v + 1])
+        extent_u, extent_v = max(u_range[1] - u_range[0], 1e-12), max(v_range[1] - v_range[0], 1e-12)
+        # Same scale on both axes, centered, with a small margin
+        self.scale = min(self.width / extent_u, self.height / extent_v) * (1 - 2 * margin)
+        self.offset_u = (self.width - extent_u * self.scale) / 2 - u_range[0] * self.scale
+        self.offset_v = (self.height - extent_v * self.scale) / 2 - v_range[0] * self.scale
+
+    def to_pixels(self, points):
+        """Returns (columns, rows) float pixel coordinates of 3D points, row 0 at the top."""
+        columns = points[:, self.u] * self.scale + self.offset_u
+        rows = self.height - 1 - (points[:, self.v] * self.scale + self.offset_v)
+        return columns, rows
+
+    def domain_mask(self, bounds):
+        """Returns the image pixels covered by the domain's bounding rectangle in the slice plane."""
+        corners = np.array([[bounds[0], bounds[2], bounds[4]], [bounds[1], bounds[3], bounds[5]]])
+        columns, rows = self.to_pixels(corners)
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        top, bottom = int(np.floor(min(rows))), int(np.ceil(max(rows)))
+        left, right = int(np.floor(min(columns))), int(np.ceil(max(columns)))
+        mask[max(top, 0):bottom + 1, max(left, 0):right + 1] = True
+        return mask
+
+
+def fill_holes(values, filled, domain, iterations=16):
+    """Fills empty pixels inside `domain` from the mean of their filled 4-neighbours, a ring per iteration."""
+    values, filled = values.copy(), filled.copy()
+    for _ in range(iterations):
+        if filled[domain].all():
+            break
+        padded_values = np.pad(np.where(filled, values, 0.0), 1)
+        padded_filled = np.pad(filled, 1).astype(np.float64)
+        total = padded_values[:-2, 1:-1] + padded_values[2:, 1:-1] + padded_values[1:-1, :-2] + padded_values[1:-1, 2:]
+        count = padded_filled[:-2, 1:-1] + padded_filled[2:, 1:-1] + padded_filled[1:-1, :-2] + padded_filled[1:-1, 2:]
+        grow = ~filled & domain & (count > 0)
+        values[grow] = total[grow] / count[grow]
+        filled |= grow
+    return values, filled
+
+
+def slab_mask(points, view, thickness=None):
+    """Selects the points within half a (auto-estimated) point spacing of the slice plane."""
+    coordinate = points[:, view.axis]
+    if thickness is None:
+        extent = np.ptp(points, axis=0)
+        spacing = (np.prod(np.maximum(extent, 1e-12)) / max(len(points), 1)) ** (1.0 / 3.0)
+        thickness = min(spacing, float(extent[view.axis]) or spacing)
+    mask = np.abs(coordinate - view.plane) <= thickness / 2
+    while mask.sum() < min(len(points), 64) and thickness < np.ptp(coordinate) + 1e-12:
+        thickness *= 2
+        mask = np.abs(coordinate - view.plane) <= thickness / 2
+    return mask
+
+
+def rasterize_magnitude(points, velocity, view, max_speed, domain):
+    """Splats the velocity magnitude of slab points into a colored slice image.
+
+    Returns:
+        tuple: (rgb image, coverage mask)
+    """
+    columns, rows = view.to_pixels(points)
+    columns, rows = np.round(columns).astype(int), np.round(rows).astype(int)
+    inside = (columns >= 0) & (columns < view.width) & (rows >= 0) & (rows < view.height)
+    index = rows[inside] * view.width + columns[inside]
+    size = view.width * view.height
+
+    magnitude = np.linalg.norm(velocity[inside], axis=1)
+    total = np.bincount(index, weights=magnitude, minlength=size)
+    count = np.bincount(index, minlength=size)
+    filled = count > 0
+    values = np.where(filled, total / np.maximum(count, 1), 0.0).reshape(view.height, view.width)
+    values, filled = fill_holes(values, filled.reshape(view.height, view.width), domain)
+
+    image = np.empty((view.height, view.width, 3), dtype=np.uint8)
+    image[:] = BACKGROUND
+    image[filled] = colormap(values[filled] / max_speed)
+    return image, filled
+
+
+def draw_segments(image, start, end, color):
+    """Draws many line segments at once by sampling points along each of them."""
+    if len(start) == 0:
+        return
+    steps = int(max(2, np.ceil(np.abs(end - start).max()) + 1))
+    t = np.linspace(0.0, 1.0, steps)[None, :, None]
+    samples = np.round(start[:, None, :] * (1 - t) + end[:, None, :] * t).astype(int).reshape(-1, 2)
+    keep = (samples[:, 0] >= 0) & (samples[:, 0] < image.shape[1]) & (samples[:, 1] >= 0) & (samples[:, 1] < image.shape[0])
+    image[samples[keep, 1], samples[keep, 0]] = color
+
+
+def draw_quiver(image, points, velocity, view, arrows=32, color=ARROW_COLOR):
+    """Overlays arrows of the mean in-plane velocity on a regular grid of cells."""
+    cell = max(4.0, view.width / arrows)
+    columns, rows = view.to_pixels(points)
+    grid_width, grid_height = int(np.ceil(view.width / cell)), int(np.ceil(view.height / cell))
+    gx, gy = (columns // cell).astype(int), (rows // cell).astype(int)
+    inside = (gx >= 0) & (gx < grid_width) & (gy >= 0) & (gy < grid_height)
+    index = gy[inside] * grid_width + gx[inside]
+
+    count = np.bincount(index, minlength=grid_width * grid_height)
+    # Image rows grow downwards, so the v component flips sign
+    vu = np.bincount(index, weights=velocity[inside, view.u], minlength=grid_width * grid_height)
+    vv = -np.bincount(index, weights=velocity[inside, view.v], minlength=grid_width * grid_height)
+    occupied = count > 0
+    direction = np.stack([vu[occupied], vv[occupied]], axis=1) / count[occupied, None]
+    speed = np.linalg.norm(direction, axis=1)
+    if len(speed) == 0 or speed.max() <= 0:
+        return
+
+    cells = np.flatnonzero(occupied)
+    centers = np.stack([(cells % grid_width + 0.5) * cell, (cells // grid_width + 0.5) * cell], axis=1)
+    vectors = direction / speed.max() * cell * 0.9
+    tails, heads = centers - vectors / 2, centers + vectors / 2
+    draw_segments(image, tails, heads, color)
+
+    # Arrow heads: two short strokes rotated +-150 degrees from the shaft
+    for angle in (np.radians(150), np.radians(-150)):
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        draw_segments(image, heads, heads + vectors @ rotation.T * 0.3, color)
+
+
+def outline_mask(vertices, triangles, view, max_samples=256):
+    """Projects the model onto the slice plane and returns the pixels of its silhouette edge."""
+    mask = np.zeros((view.height, view.width), dtype=bool)
+    if len(triangles) == 0:
+        return mask
+
+    # Fill the projected triangles with barycentric point lattices, denser for
+    # larger triangles (grouped by power-of-two sample counts to stay vectorized)
+    columns, rows = view.to_pixels(vertices)
+    corners_u, corners_v = columns[triangles], rows[triangles]
+    edge = np.max(np.hypot(corners_u - np.roll(corners_u, 1, axis=1), corners_v - np.roll(corners_v, 1, axis=1)), axis=1)
+    levels = np.clip(np.ceil(np.log2(np.maximum(edge, 1.0))), 0, np.log2(max_samples)).astype(int)
+    for level in np.unique(levels):
+        samples = 2 ** level
+        a, b = np.meshgrid(np.arange(samples + 1), np.arange(samples + 1), indexing="ij")
+        keep = a + b <= samples
+        weights = np.stack([a[keep], b[keep], samples - a[keep] - b[keep]], axis=1) / samples
+        group = levels == level
+        fill_u = np.round(corners_u[group] @ weights.T).astype(int).ravel()
+        fill_v = np.round(corners_v[group] @ weights.T).astype(int).ravel()
+        inside = (fill_u >= 0) & (fill_u < view.width) & (fill_v >= 0) & (fill_v < view.height)
+        mask[fill_v[inside], fill_u[inside]] = True
+
+    # Close single-pixel gaps, then keep only the boundary
+    padded = np.pad(mask, 1)
+    mask = padded[1:-1, 1:-1] | padded[:-2, 1:-1] | padded[2:, 1:-1] | padded[1:-1, :-2] | padded[1:-1, 2:]
+    padded = np.pad(mask, 1)
+    interior = padded[:-2, 1:-1] & padded[2:, 1:-1] & padded[1:-1, :-2] & padded[1:-1, 2:]
+    return mask & ~interior
+
+
+def load_timestep(pvd_dir, entries):
+    """Reads and concatenates all pieces of one timestep."""
+    points, velocity = [], []
+    for entry in entries:
+        dataset = read_dataset(os.path.join(pvd_dir, entry["file"]))
+        points.append(dataset["points"])
+        velocity.append(dataset["point_data"][VELOCITY_ARRAY].reshape(len(dataset["points"]), -1))
+    return np.concatenate(points), np.concatenate(velocity)
+
+
+def iter_timesteps(path):
+    """Yields (timestep, points, velocity) for a .pvd collection or a time-series store."""
+    if path.lower().endswith(STORE_EXTENSION):
+        with TimeSeriesStore(path) as store:
+            points = store.mesh()["points"]
+            for step, timestep in enumerate(store.times):
+                yield timestep, points, store.array(step, VELOCITY_ARRAY).reshape(len(points), -1)
+        return
+
+    with open(path, "rb") as f:
+        datasets = parse_pvd(f.read())
+    pvd_dir = os.path.dirname(os.path.abspath(path))
+    for timestep in timestep_values(datasets):
+        yield (timestep,) + load_timestep(pvd_dir, [entry for entry in datasets if entry["timestep"] == timestep])
+
+
+def render_preview(pvd_path, output_dir, model_path=None, axis="z", position=0.5,
+                   resolution=(960, 540), arrows=32, max_speed=5.0):
+    """Renders one preview frame per timestep of a .pvd collection or time-series store.
+
+    Returns:
+        int: Number of frames written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    view, outline, domain = None, None, None
+    count = 0
+    for index, (timestep, points, velocity) in enumerate(iter_timesteps(pvd_path)):
+        if view is None:
+            bounds = np.stack([points.min(axis=0), points.max(axis=0)], axis=1).ravel()
+            view = SliceView(bounds, axis, position, resolution)
+            domain = view.domain_mask(bounds)
+            if model_path:
+                outline = outline_mask(*read_model_triangles(model_path), view)
+
+        in_slab = slab_mask(points, view)
+        image, _ = rasterize_magnitude(points[in_slab], velocity[in_slab], view, max_speed, domain)
+        draw_quiver(image, points[in_slab], velocity[in_slab], view, arrows)
+        if outline is not None:
+            image[outline] = OUTLINE_COLOR
+        write_png(os.path.join(output_dir, f"frame_{index:04d}.png"), image)
+        print(f"🔹 Frame {index}: t={timestep:g}, {int(in_slab.sum())} slice points")
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    args = sys.argv
+    pvd_path, model_path, output_dir = None, None, None
+    axis, position, resolution, arrows, max_speed = "z", 0.5, (960, 540), 32, 5.0
+    for i, arg in enumerate(args):
+        if arg == "--pvd-file" and i + 1 < len(args): pvd_path = os.path.abspath(args[i+1])
+        elif arg == "--turbine-model" and i + 1 < len(args): model_path = os.path.abspath(args[i+1])
+        elif arg == "--output-dir" and i + 1 < len(args): output_dir = os.path.abspath(args[i+1])
+        elif arg == "--axis" and i + 1 < len(args): axis = args[i+1].lower()
+        elif arg == "--slice-position" and i + 1 < len(args): position = float(args[i+1])
+        elif arg == "--resolution" and i + 1 < len(args): resolution = tuple(int(x) for x in args[i+1].lower().split("x"))
+        elif arg == "--arrows" and i + 1 < len(args): arrows = int(args[i+1])
+        elif arg == "--max-speed" and i + 1 < len(args): max_speed = float(args[i+1])
+
+    if not pvd_path or axis not in PLANE_AXES:
+        print("Usage: python3 preview_renderer.py --pvd-file <.pvd|.tss> [--turbine-model <.obj/.stl/.vtp>] [--output-dir <dir>] "
+              "[--axis x|y|z] [--slice-position 0-1] [--resolution WxH] [--arrows N] [--max-speed V]")
+        sys.exit(1)
+
+    output_dir = output_dir or os.path.join(os.path.dirname(os.path.dirname(pvd_path)), PREVIEW_FRAMES_SUBDIR)
+    count = render_preview(pvd_path, output_dir, model_path, axis, position, resolution, arrows, max_speed)
+    if count == 0:
+        print(f"❌ No timesteps found in {pvd_path}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"✅ Preview complete: {count} frames.")
+    print(f"PNG_OUTPUT_DIR={output_dir}")
@@ -0,0 +1,61 @@
+# src/pvd_index.py
+
+# Reading, filtering and writing ParaView .pvd collection files.
+
+import os
+import xml.etree.ElementTree as ET
+
+
+def parse_pvd(xml_text):
+    """Parses the <DataSet> entries of a .pvd collection.
+
+    Args:
+        xml_text (str or bytes): Contents of the .pvd file.
+
+    Returns:
+        list: One dict per entry with `timestep` (float), `file` and the
+            optional `part` / `group` attributes, sorted by timestep.
+    """
+    root = ET.fromstring(xml_text)
+    collection = root.find("Collection")
+    if collection is None:
+        raise ValueError("Not a PVD file: <Collection> element missing.")
+
+    datasets = []
+    for element in collection.findall("DataSet"):
+        if "file" not in element.attrib:
+            continue
+        entry = dict(element.attrib)
+        entry["timestep"] = float(element.attrib.get("timestep", 0.0))
+        datasets.append(entry)
+
+    datasets.sort(key=lambda entry: (entry["timestep"], entry.get("part", "0")))
+    return datasets
+
+
+def timestep_values(datasets):
+    """Returns the distinct timesteps of a collection in ascending order."""
+    return sorted(set(entry["timestep"] for entry in datasets))
+
+
+def select_datasets(datasets, time_start=None, time_end=None, stride=1):
+    """Keeps the entries inside a time window, taking every `stride`-th timestep.
+
+    All pieces (`part`) of a selected timestep are kept together.
+    """
+    window = [t for t in timestep_values(datasets)
+              if (time_start is None or t >= time_start) and (time_end is None or t <= time_end)]
+    selected = set(window[::max(1, stride)])
+    return [entry for entry in datasets if entry["timestep"] in selected]
+
+
+def write_pvd(path, datasets):
+    """Writes a .pvd collection referencing the given entries; readers never see a partial file."""
+    root = ET.Element("VTKFile", type="Collection", version="0.1", byte_order="LittleEndian")
+    collection = ET.SubElement(root, "Collection")
+    for entry in datasets:
+        attributes = {key: str(value) for key, value in entry.items() if key != "timestep"}
+        attributes["timestep"] = repr(entry["timestep"])
+        ET.SubElement(collection, "DataSet", attributes)
+    ET.ElementTree(root).write(path + ".tmp", xml_declaration=True, encoding="utf-8")
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,110 @@
+import json
+import math
+import time
+
+# ✅ Quality floor used when a render has to be squeezed into its time budget
+MIN_SAMPLES = 16
+MAX_ADAPTIVE_THRESHOLD = 0.1
+MIN_RESOLUTION_PERCENTAGE = 50
+
+
+def output_size(resolution_x, resolution_y, percentage):
+    """Pixel size Blender renders for a resolution percentage (truncated like Blender does)."""
+    return max(1, resolution_x * percentage // 100), max(1, resolution_y * percentage // 100)
+
+
+class RenderBudgetController:
+    """Adapts Cycles quality per frame so a render job finishes within a wall-clock budget.
+
+    Render time is modelled as proportional to samples x (resolution percentage / 100)^2.
+    The cost of one unit of that work is measured from the frames already rendered,
+    and every remaining frame gets an equal share of the time that is left. When a
+    share is too small for the requested quality, samples are lowered first (with a
+    correspondingly looser adaptive-sampling threshold) and resolution last. Quality
+    never goes above the requested settings. Frames rendered at reduced resolution
+    are scaled back up to `output_size` so the PNG sequence keeps one frame size
+    for ffmpeg.
+
+    Args:
+        total_seconds (float): Time budget for the whole job.
+        num_frames (int): Number of frames to render.
+        base_samples (int): Requested Cycles samples per frame.
+        base_threshold (float): Requested Cycles adaptive-sampling threshold.
+        start_time (float): Job start (time.time()); defaults to now, so pass it in
+            when Blender startup should count against the budget.
+        safety (float): Fraction of the remaining time actually planned for.
+    """
+
+    def __init__(self, total_seconds, num_frames, base_samples, base_threshold=0.01, start_time=None, safety=0.9):
+        self.total_seconds = total_seconds
+        self.num_frames = num_frames
+        self.base_samples = base_samples
+        self.base_threshold = base_threshold
+        self.start_time = start_time if start_time is not None else time.time()
+        self.safety = safety
+        self.seconds_per_work = None
+        self.frames_done = 0
+        self.log = []
+
+    @staticmethod
+    def work(settings):
+        """Relative cost of a frame rendered with the given settings."""
+        return settings["samples"] * (settings["resolution_percentage"] / 100.0) ** 2
+
+    def base_settings(self):
+        return {
+            "samples": self.base_samples,
+            "adaptive_threshold": self.base_threshold,
+            "resolution_percentage": 100,
+        }
+
+    def remaining_seconds(self, now=None):
+        now = now if now is not None else time.time()
+        return self.total_seconds - (now - self.start_time)
+
+    def next_settings(self, now=None):
+        """Returns the samples, adaptive threshold and resolution for the next frame."""
+        settings = self.base_settings()
+        frames_left = self.num_frames - self.frames_done
+        if self.seconds_per_work is None or frames_left <= 0:
+            return settings
+
+        share = max(0.0, self.remaining_seconds(now)) * self.safety / frames_left
+        work_allowed = share / self.seconds_per_work
+        if work_allowed >= self.work(settings):
+            return settings
+
+        min_samples = min(MIN_SAMPLES, self.base_samples)
+        samples = max(min_samples, int(work_allowed))
+        settings["samples"] = samples
+        settings["adaptive_threshold"] = min(MAX_ADAPTIVE_THRESHOLD, self.base_threshold * self.base_samples / samples)
+
+        if samples == min_samples and work_allowed < samples:
+            percentage = 100.0 * math.sqrt(max(work_allowed, 0.0) / samples)
+            settings["resolution_percentage"] = max(MIN_RESOLUTION_PERCENTAGE, int(percentage))
+        return settings
+
+    def record(self, frame, seconds, settings):
+        """Feeds back the measured render time of a finished frame."""
+        self.frames_done += 1
+        measured = seconds / max(self.work(settings), 1e-9)
+        if self.seconds_per_work is None:
+            self.seconds_per_work = measured
+        else:
+            # Exponential moving average: follows scene complexity without jumping on one outlier
+            self.seconds_per_work = 0.6 * self.seconds_per_work + 0.4 * measured
+
+        entry = dict(settings)
+        entry["frame"] = frame
+        entry["seconds"] = round(seconds, 3)
+        entry["remaining_seconds"] = round(self.remaining_seconds(), 3)
+        self.log.append(entry)
+
+    def write_log(self, path):
+        with open(path, "w") as f:
+            json.dump({
+                "total_seconds": self.total_seconds,
+                "num_frames": self.num_frames,
+                "base_samples": self.base_samples,
+                "frames": self.log,
+            }, f, indent=2)
@@ -0,0 +1,252 @@
+# src/render_sweep.py
+
+# Parameter-sweep rendering: many variants of the Blender render from one job
+# queue, with every Blender worker opening the scene once.
+# Example:
+# python3 main.py --sweep sweep.json [--workers 2]
+#
+# Sweep spec (JSON):
+#   {
+#     "base":     {"num_frames": 10},                        # applied to every variant
+#     "grid":     {"scale_factor": [1.0, 1.5], "rotation_z": [0, 45, 90]},
+#     "variants": [{"name": "hero", "cycles_samples": 512, "light_location_z": 12}]
+#   }
+# The grid expands to its cartesian product; explicit variants are added as they
+# are. Parameters are the keys of fluid_dynamics_animation.json (scale_factor,
+# rotation_z, num_frames, light_location_x/y/z, cycles_samples).
+#
+# Queue layout: <queue>/{pending,running,done,failed}/<variant>.json. Workers claim
+# a job by renaming it from pending/ to running/, which is atomic, so any number
+# of workers can share the queue without locks; the claimed job records the
+# worker's pid and host. Starting a sweep again re-queues only running jobs
+# whose worker is gone (dead pid on this host, or older than
+# SWEEP_STALE_SECONDS when claimed elsewhere) and drops pending jobs of
+# variants that are no longer in the spec. The queue and its
+# sweep_summary.json live in <pipeline cache>/sweep_queue/<output folder hash>
+# (see pipeline_cache.py; SWEEP_QUEUE_DIR overrides it), so rerunning a sweep
+# into the same output folder resumes it.
+
+import os
+import sys
+import json
+import time
+import socket
+import hashlib
+import itertools
+import subprocess
+
+from pipeline_cache import cache_path
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "2"))
+SWEEP_QUEUE_ROOT = os.getenv("SWEEP_QUEUE_DIR", cache_path("sweep_queue"))
+# Age after which a job claimed on another host (or with no owner) counts as abandoned
+SWEEP_STALE_SECONDS = float(os.getenv("SWEEP_STALE_SECONDS", str(6 * 3600)))
+QUEUE_STATES = ("pending", "running", "done", "failed")
+SWEEP_PARAMETERS = ("scale_factor", "rotation_z", "num_frames", "light_location_x",
+                    "light_location_y", "light_location_z", "cycles_samples")
+
+
+def sanitize_name(name):
+    """Makes a variant name safe as a file and folder name."""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in str(name))
+
+
+def expand_sweep(spec, base=None):
+    """Expands a sweep spec into named variants.
+
+    Args:
+        spec (dict): Sweep spec with optional "base", "grid" and "variants".
+        base (dict): Parameters every variant starts from (e.g. the simulation JSON).
+
+    Returns:
+        list: {"name", "params"} dicts in a stable order; names are sanitized
+            before they are checked for duplicates.
+    """
+    defaults = {key: value for key, value in (base or {}).items() if key in SWEEP_PARAMETERS}
+    defaults.update(spec.get("base", {}))
+
+    variants = []
+    grid = spec.get("grid", {})
+    if grid:
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[key] for key in keys)):
+            params = dict(defaults, **dict(zip(keys, values)))
+            name = "_".join(f"{key}-{value}" for key, value in zip(keys, values))
+            variants.append({"name": sanitize_name(name), "params": params})
+    for index, variant in enumerate(spec.get("variants", [])):
+        variant = dict(variant)
+        name = variant.pop("name", f"variant_{index:03d}")
+        variants.append({"name": sanitize_name(name), "params": dict(defaults, **variant)})
+
+    names = [variant["name"] for variant in variants]
+    duplicates = sorted(set(name for name in names if names.count(name) > 1))
+    if duplicates:
+        raise ValueError(f"Duplicate variant names in sweep: {', '.join(duplicates)}")
+    for variant in variants:
+        unknown = sorted(set(variant["params"]) - set(SWEEP_PARAMETERS))
+        if unknown:
+            raise ValueError(f"Unknown sweep parameter(s) in '{variant['name']}': {', '.join(unknown)}")
+    return variants
+
+
+def default_queue_dir(output_root):
+    """Returns the queue folder of a sweep rendering into `output_root`, outside the output tree."""
+    digest = hashlib.sha256(os.path.abspath(output_root).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(SWEEP_QUEUE_ROOT, digest)
+
+
+def worker_gone(job_path, now=None):
+    """Tells whether the worker that claimed a running job has stopped.
+
+    On the same host the recorded pid is checked; a job claimed on another host
+    (or without an owner) is considered abandoned after SWEEP_STALE_SECONDS.
+    """
+    now = time.time() if now is None else now
+    try:
+        with open(job_path, "r") as f:
+            owner = json.load(f).get("claimed_by")
+    except (OSError, ValueError):
+        owner = None
+    if owner and owner.get("host") == socket.gethostname():
+        try:
+            os.kill(owner["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass  # Alive, owned by another user
+        return False
+    claimed_at = owner["claimed_at"] if owner else os.path.getmtime(job_path)
+    return now - claimed_at > SWEEP_STALE_SECONDS
+
+
+def create_queue(queue_dir, variants):
+    """Writes one pending job per variant that is neither done nor being rendered.
+
+    Running jobs whose worker is gone (see worker_gone) go back to pending/;
+    jobs of live workers are left alone. Pending jobs of variants that are not
+    in `variants` are removed.
+    """
+    for state in QUEUE_STATES:
+        os.makedirs(os.path.join(queue_dir, state), exist_ok=True)
+    for name in os.listdir(os.path.join(queue_dir, "running")):
+        running = os.path.join(queue_dir, "running", name)
+        if name.endswith(".json") and worker_gone(running):
+            print(f"⚠️ Re-queuing abandoned sweep job: {name[:-5]}")
+            os.replace(running, os.path.join(queue_dir, "pending", name))
+
+    names = set(f"{variant['name']}.json" for variant in variants)
+    for name in os.listdir(os.path.join(queue_dir, "pending")):
+        if name.endswith(".json") and name not in names:
+            os.remove(os.path.join(queue_dir, "pending", name))
+
+    queued = 0
+    for variant in variants:
+        file_name = f"{variant['name']}.json"
+        if os.path.exists(os.path.join(queue_dir, "done", file_name)) or \
+                os.path.exists(os.path.join(queue_dir, "running", file_name)):
+            continue
+        failed = os.path.join(queue_dir, "failed", file_name)
+        if os.path.exists(failed):
+            os.remove(failed)
+        path = os.path.join(queue_dir, "pending", file_name)
+        with open(path + ".tmp", "w") as f:
+            json.dump(variant, f, indent=2)
+        os.replace(path + ".tmp", path)
+        queued += 1
+    return queued
+
+
+def claim_job(queue_dir):
+    """Atomically takes the next pending job and records this process as its worker.
+
+    Returns:
+        dict: The variant, or None when the queue is empty.
+    """
+    pending = os.path.join(queue_dir, "pending")
+    for file_name in sorted(os.listdir(pending)):
+        if not file_name.endswith(".json"):
+            continue
+        running = os.path.join(queue_dir, "running", file_name)
+        try:
+            os.rename(os.path.join(pending, file_name), running)
+        except FileNotFoundError:
+            continue  # Another worker claimed it first
+        with open(running, "r") as f:
+            variant = json.load(f)
+        variant.pop("claimed_by", None)
+        owner = {"pid": os.getpid(), "host": socket.gethostname(), "claimed_at": time.time()}
+        with open(running + ".tmp", "w") as f:
+            json.dump(dict(variant, claimed_by=owner), f, indent=2)
+        os.replace(running + ".tmp", running)
+        return variant
+    return None
+
+
+def finish_job(queue_dir, variant, success, details=None):
+    """Moves a claimed job to done/ or failed/, recording details such as timings."""
+    file_name = f"{variant['name']}.json"
+    running = os.path.join(queue_dir, "running", file_name)
+    target = os.path.join(queue_dir, "done" if success else "failed", file_name)
+    with open(running, "w") as f:
+        json.dump(dict(variant, result=details or {}), f, indent=2)
+    os.replace(running, target)
+
+
+def queue_status(queue_dir):
+    """Returns {state: [variant names]} for every queue state."""
+    return {state: sorted(name[:-5] for name in os.listdir(os.path.join(queue_dir, state)) if name.endswith(".json"))
+            for state in QUEUE_STATES}
+
+
+def run_sweep(blend_file_path, variants, output_root, workers=SWEEP_WORKERS, queue_dir=None):
+    """Renders every variant with a pool of Blender workers sharing one job queue.
+
+    Each worker is one Blender process that opens the scene once and then
+    renders job after job into <output_root>/<variant>/.
+
+    Returns:
+        dict: Queue status after the sweep (variant names per state).
+    """
+    output_root = os.path.abspath(output_root)
+    queue_dir = os.path.abspath(queue_dir or default_queue_dir(output_root))
+    queued = create_queue(queue_dir, variants)
+    workers = max(1, min(workers, queued))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"🧪 Sweep: {len(variants)} variants, {queued} to render with {workers} Blender worker(s)")
+
+    processes = []
+    for worker_id in range(workers if queued else 0):
+        command = [
+            "blender", "-b", blend_file_path, "-t", str(threads),
+            "--python", os.path.join(SRC_DIR, "blender_sweep_worker.py"), "--",
+            "--queue", queue_dir, "--output-root", output_root, "--worker-id", str(worker_id),
+        ]
+        processes.append(subprocess.Popen(command))
+    for process in processes:
+        process.wait()
+
+    status = queue_status(queue_dir)
+    summary_path = os.path.join(queue_dir, "sweep_summary.json")
+    with open(summary_path, "w") as f:
+        json.dump(status, f, indent=2)
+    print(f"📋 Sweep summary: {summary_path}")
+    print(f"✅ Sweep finished: {len(status['done'])} done, {len(status['failed'])} failed, "
+          f"{len(status['pending']) + len(status['running'])} not rendered")
+    return status
+
+
+def load_sweep_spec(path):
+    with open(path, "r") as f:
+        spec = json.load(f)
+    if isinstance(spec, list):
+        spec = {"variants": spec}  # A plain list of parameter sets
+    return spec
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python3 render_sweep.py <sweep.json>   (prints the expanded variants)")
+        sys.exit(1)
+    for variant in expand_sweep(load_sweep_spec(sys.argv[1])):
+        print(f"🔹 {variant['name']}: {json.dumps(variant['params'])}")
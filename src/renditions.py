@@ -0,0 +1,205 @@
+# src/renditions.py
+
+# Every delivery size from a single render: the frames are rendered once at the
+# largest requested resolution (paraview passes: --resolution WxH) and all smaller
+# video renditions come out of the same ffmpeg decode (split + area scale), plus a
+# contact sheet and an animated GIF preview.
+# Example:
+# python3 renditions.py --frames-dir data/testing-input-output/turbine_animation_frames \
+#     --output-dir data/testing-input-output/renditions --rendition master:1920x1080 --rendition review:1280x720
+#
+# When the videos were already encoded (encode_video.py --base-dir ... --rendition
+# review:1280x720 encodes the renditions together with the layer videos), only the
+# previews are built, from the smallest video:
+# python3 renditions.py --frames-dir data/testing-input-output/turbine_animation_frames \
+#     --output-dir data/testing-input-output/renditions \
+#     --preview-from data/testing-input-output/renditions/turbine_animation_frames_review.mp4
+
+import os
+import sys
+import shutil
+import subprocess
+
+import cv2
+import numpy as np
+
+from encode_video import encode_jobs, list_frame_numbers, parse_rendition, rendition_outputs, FRAME_RATE, GOP_SIZE
+
+# ✅ Defaults (overridable from the environment, e.g. GitHub Actions)
+DEFAULT_RENDITIONS = os.getenv("RENDITIONS", "master:1920x1080,review:1280x720")
+CONTACT_SHEET_COLUMNS = int(os.getenv("CONTACT_SHEET_COLUMNS", "6"))
+CONTACT_SHEET_FRAMES = int(os.getenv("CONTACT_SHEET_FRAMES", "24"))
+PREVIEW_WIDTH = int(os.getenv("PREVIEW_WIDTH", "480"))
+PREVIEW_FPS = int(os.getenv("PREVIEW_FPS", "12"))
+
+
+def area_weights(source_size, target_size):
+    """Builds the (target, source) matrix of an area-average resample along one axis.
+
+    Row i holds the fraction of every source pixel that overlaps target pixel i,
+    normalized so each row sums to one. Works for non-integer scale factors.
+    """
+    scale = source_size / target_size
+    edges = np.arange(target_size + 1) * scale
+    lower, upper = edges[:-1, None], edges[1:, None]
+    pixels = np.arange(source_size)[None, :]
+    overlap = np.clip(np.minimum(upper, pixels + 1) - np.maximum(lower, pixels), 0.0, None)
+    return overlap / scale
+
+
+def downscale_area(image, size):
+    """Area-average downscale of an (height, width[, channels]) image to (width, height).
+
+    Both axes are resampled with one weight-matrix product each, so the whole
+    frame is handled in two vectorized operations.
+    """
+    width, height = size
+    rows = area_weights(image.shape[0], height)
+    cols = area_weights(image.shape[1], width)
+    pixels = image.astype(np.float32)
+    if pixels.ndim == 2:
+        result = rows @ pixels @ cols.T
+    else:
+        result = np.einsum("yh,hwc,xw->yxc", rows, pixels, cols, optimize=True)
+    if np.issubdtype(image.dtype, np.integer):
+        result = np.clip(np.rint(result), np.iinfo(image.dtype).min, np.iinfo(image.dtype).max)
+    return result.astype(image.dtype)
+
+
+def contact_sheet(frames_dir, output_path, columns=CONTACT_SHEET_COLUMNS, num_frames=CONTACT_SHEET_FRAMES, thumb_width=320):
+    """Tiles evenly spaced frames of a sequence into one overview image.
+
+    Unreadable frames are skipped with a warning.
+
+    Returns:
+        str: The written image path, or None if the folder holds no readable frames.
+    """
+    numbers = list_frame_numbers(frames_dir)
+    if not numbers:
+        return None
+
+    picks = [numbers[int(i)] for i in np.linspace(0, len(numbers) - 1, min(num_frames, len(numbers)))]
+    thumbs = []
+    for number in picks:
+        frame_path = os.path.join(frames_dir, f"frame_{number:04d}.png")
+        frame = cv2.imread(frame_path, cv2.IMREAD_COLOR)
+        if frame is None:
+            print(f"⚠️ Skipping unreadable frame in contact sheet: {frame_path}")
+            continue
+        thumb_height = max(1, round(frame.shape[0] * thumb_width / frame.shape[1]))
+        thumbs.append(downscale_area(frame, (thumb_width, thumb_height)))
+    if not thumbs:
+        return None
+
+    columns = max(1, min(columns, len(thumbs)))
+    rows = -(-len(thumbs) // columns)
+    thumb_height = thumbs[0].shape[0]
+    sheet = np.zeros((rows * thumb_height, columns * thumb_width, 3), dtype=np.uint8)
+    for index, thumb in enumerate(thumbs):
+        y, x = (index // columns) * thumb_height, (index % columns) * thumb_width
+        sheet[y:y + thumb_height, x:x + thumb_width] = thumb[:thumb_height]
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    cv2.imwrite(output_path, sheet)
+    return output_path
+
+
+def animated_preview(video_path, output_path, width=PREVIEW_WIDTH, fps=PREVIEW_FPS):
+    """Turns a (small) rendition into a palette-optimized animated GIF."""
+    graph = (f"fps={fps},scale={width}:-2:flags=area,split[a][b];"
+             f"[a]palettegen=stats_mode=diff[p];[b][p]paletteuse=dither=bayer")
+    command = ["ffmpeg", "-y", "-loglevel", "error", "-i", video_path, "-filter_complex", graph, "-loop", "0", output_path]
+    subprocess.run(command, check=True)
+    return output_path
+
+
+def produce_renditions(frames_dir, output_dir, renditions, name=None, num_workers=None,
+                       gop_size=GOP_SIZE, framerate=FRAME_RATE, preview_width=PREVIEW_WIDTH,
+                       sheet_columns=CONTACT_SHEET_COLUMNS, sheet_frames=CONTACT_SHEET_FRAMES):
+    """Encodes every rendition of a frame sequence in one pass and adds the previews.
+
+    Args:
+        frames_dir (str): Folder with `frame_NNNN.png` files, rendered at the largest size.
+        output_dir (str): Destination folder.
+        renditions (list): (name, (width, height)) tuples.
+        name (str): Base name of the outputs; defaults to the frames folder name.
+
+    Returns:
+        dict: Rendition name -> video path, plus "contact_sheet" and "preview", or
+            None if encoding failed.
+    """
+    numbers = list_frame_numbers(frames_dir)
+    if not numbers:
+        print(f"⚠️ No frames found in {frames_dir}")
+        return None
+
+    first = cv2.imread(os.path.join(frames_dir, f"frame_{numbers[0]:04d}.png"), cv2.IMREAD_UNCHANGED)
+    source_size = (first.shape[1], first.shape[0])
+    name = name or os.path.basename(os.path.normpath(frames_dir))
+    os.makedirs(output_dir, exist_ok=True)
+
+    outputs, results = rendition_outputs(source_size, None, renditions, output_dir, name)
+    if not outputs:
+        return None
+    if not encode_jobs([(frames_dir, outputs)], num_workers=num_workers, gop_size=gop_size, framerate=framerate):
+        return None
+
+    results.update(build_previews(frames_dir, output_dir, outputs[-1][0], name, preview_width, sheet_columns, sheet_frames))
+    print(f"✅ Renditions written to {output_dir}: {', '.join(sorted(results))}")
+    return results
+
+
+def build_previews(frames_dir, output_dir, video_path, name=None, preview_width=PREVIEW_WIDTH,
+                   sheet_columns=CONTACT_SHEET_COLUMNS, sheet_frames=CONTACT_SHEET_FRAMES):
+    """Builds the contact sheet from the frames and the animated GIF from an encoded video.
+
+    Returns:
+        dict: "contact_sheet" and, if it could be made, "preview" paths.
+    """
+    name = name or os.path.basename(os.path.normpath(frames_dir))
+    os.makedirs(output_dir, exist_ok=True)
+    results = {"contact_sheet": contact_sheet(frames_dir, os.path.join(output_dir, f"{name}_contact_sheet.png"),
+                                              sheet_columns, sheet_frames)}
+    try:
+        results["preview"] = animated_preview(video_path, os.path.join(output_dir, f"{name}_preview.gif"), preview_width)
+    except subprocess.CalledProcessError as e:
+        print(f"⚠️ Animated preview failed: {e}", file=sys.stderr)
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv
+    frames_dir, output_dir, specs, num_workers, preview_from = None, None, [], None, None
+    preview_width, sheet_columns, sheet_frames = PREVIEW_WIDTH, CONTACT_SHEET_COLUMNS, CONTACT_SHEET_FRAMES
+    for i, arg in enumerate(args):
+        if arg == "--frames-dir" and i + 1 < len(args): frames_dir = os.path.abspath(args[i+1])
+        elif arg == "--output-dir" and i + 1 < len(args): output_dir = os.path.abspath(args[i+1])
+        elif arg == "--rendition" and i + 1 < len(args): specs.append(args[i+1])
+        elif arg == "--workers" and i + 1 < len(args): num_workers = int(args[i+1])
+        elif arg == "--preview-from" and i + 1 < len(args): preview_from = os.path.abspath(args[i+1])
+        elif arg == "--preview-width" and i + 1 < len(args): preview_width = int(args[i+1])
+        elif arg == "--contact-sheet-columns" and i + 1 < len(args): sheet_columns = int(args[i+1])
+        elif arg == "--contact-sheet-frames" and i + 1 < len(args): sheet_frames = int(args[i+1])
+
+    if not frames_dir or not os.path.isdir(frames_dir):
+        print("Usage: python3 renditions.py --frames-dir <dir> [--output-dir <dir>] [--rendition name:WxH]... [--preview-from <.mp4>] "
+              "[--workers N] [--preview-width N] [--contact-sheet-columns N] [--contact-sheet-frames N]")
+        sys.exit(1)
+
+    if not shutil.which("ffmpeg"):
+        print("❌ Error: FFmpeg is not installed!", file=sys.stderr)
+        sys.exit(1)
+
+    if preview_from:
+        if not os.path.isfile(preview_from):
+            print(f"❌ Error: {preview_from} does not exist!", file=sys.stderr)
+            sys.exit(1)
+        results = build_previews(frames_dir, output_dir or os.path.dirname(frames_dir), preview_from, preview_width=preview_width,
+                                 sheet_columns=sheet_columns, sheet_frames=sheet_frames)
+        print(f"✅ Previews written: {', '.join(path for path in results.values() if path)}")
+        sys.exit(0 if results["contact_sheet"] else 1)
+
+    renditions = [parse_rendition(spec) for spec in (specs or DEFAULT_RENDITIONS.split(","))]
+    if not produce_renditions(frames_dir, output_dir or os.path.dirname(frames_dir), renditions, num_workers=num_workers,
+                              preview_width=preview_width, sheet_columns=sheet_columns, sheet_frames=sheet_frames):
+        sys.exit(1)
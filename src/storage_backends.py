@@ -0,0 +1,279 @@
+# src/storage_backends.py
+
+# Storage backends used by the transfer scripts.
+#
+#   DropboxBackend      the live Dropbox API (dropbox SDK)
+#   LocalBackend        a plain directory standing in for the remote store
+#   HttpEmulatorBackend a Dropbox-like HTTP service, e.g. dropbox_emulator.py
+#
+# The backend is chosen with STORAGE_BACKEND (dropbox | local | http);
+# LOCAL_STORAGE_ROOT and STORAGE_EMULATOR_URL configure the non-Dropbox ones.
+# Third-party clients are imported by the backends that need them, so the local
+# backend works with the standard library only.
+
+import os
+import abc
+import json
+import shutil
+import posixpath
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_EMULATOR_URL = "http://127.0.0.1:8765"
+
+
+class StorageBackend(abc.ABC):
+    """Interface of a remote file store. Remote paths are POSIX style and start with '/'."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def list_files(self, folder):
+        """Lists every file below a folder, recursively.
+
+        Returns:
+            list: (path, size) tuples; `path` is the full remote path.
+        """
+
+    def list_folders(self, folder):
+        """Lists every subfolder below a folder, recursively, so empty ones can be mirrored too.
+
+        Returns:
+            list: Full remote paths; none for stores without real folders.
+        """
+        return []
+
+    @abc.abstractmethod
+    def exists(self, path):
+        """Tells whether a remote file exists."""
+
+    @abc.abstractmethod
+    def download(self, path):
+        """Returns the content of a remote file as bytes."""
+
+    def download_to_file(self, path, local_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Streams a remote file to a local path."""
+        with open(local_path, "wb") as f:
+            f.write(self.download(path))
+
+    @abc.abstractmethod
+    def upload(self, data, path):
+        """Stores bytes at a remote path, overwriting any existing file."""
+
+    def upload_file(self, local_path, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Uploads a local file, in chunks when it is larger than `chunk_size`."""
+        with open(local_path, "rb") as f:
+            self.upload(f.read(), path)
+
+
+class DropboxBackend(StorageBackend):
+    """Dropbox through the official SDK."""
+
+    name = "dropbox"
+
+    def __init__(self, access_token):
+        import dropbox
+        self._dropbox = dropbox
+        self.dbx = dropbox.Dropbox(access_token)
+
+    def list_files(self, folder):
+        files = []
+        result = self.dbx.files_list_folder(folder, recursive=True)
+        while True:
+            for entry in result.entries:
+                if isinstance(entry, self._dropbox.files.FileMetadata):
+                    files.append((entry.path_lower, entry.size))
+            if not result.has_more:
+                return files
+            result = self.dbx.files_list_folder_continue(result.cursor)
+
+    def list_folders(self, folder):
+        folders = []
+        result = self.dbx.files_list_folder(folder, recursive=True)
+        while True:
+            for entry in result.entries:
+                if isinstance(entry, self._dropbox.files.FolderMetadata) and entry.path_lower != folder.lower().rstrip("/"):
+                    folders.append(entry.path_lower)
+            if not result.has_more:
+                return folders
+            result = self.dbx.files_list_folder_continue(result.cursor)
+
+    def exists(self, path):
+        try:
+            self.dbx.files_get_metadata(path)
+            return True
+        except self._dropbox.exceptions.ApiError:
+            return False
+
+    def download(self, path):
+        metadata, res = self.dbx.files_download(path=path)
+        return res.content
+
+    def download_to_file(self, path, local_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        metadata, res = self.dbx.files_download(path=path)
+        with open(local_path, "wb") as f:
+            for block in res.iter_content(chunk_size=chunk_size):
+                f.write(block)
+
+    def upload(self, data, path):
+        self.dbx.files_upload(data, path, mode=self._dropbox.files.WriteMode.overwrite)
+
+    def upload_file(self, local_path, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        size = os.path.getsize(local_path)
+        with open(local_path, "rb") as f:
+            if size <= chunk_size:
+                self.upload(f.read(), path)
+                return
+
+            # Upload session for large files (single requests are capped at 150 MB)
+            session = self.dbx.files_upload_session_start(f.read(chunk_size))
+            cursor = self._dropbox.files.UploadSessionCursor(session_id=session.session_id, offset=f.tell())
+            commit = self._dropbox.files.CommitInfo(path=path, mode=self._dropbox.files.WriteMode.overwrite)
+            while size - f.tell() > chunk_size:
+                self.dbx.files_upload_session_append_v2(f.read(chunk_size), cursor)
+                cursor.offset = f.tell()
+            self.dbx.files_upload_session_finish(f.read(), cursor, commit)
+
+
+class LocalBackend(StorageBackend):
+    """A local directory used as the remote store."""
+
+    name = "local"
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def _local(self, path):
+        relative = posixpath.normpath("/" + path).lstrip("/")
+        return os.path.join(self.root, *relative.split("/")) if relative else self.root
+
+    def list_files(self, folder):
+        base = self._local(folder)
+        files = []
+        for directory, _, names in os.walk(base):
+            for name in names:
+                local_path = os.path.join(directory, name)
+                relative = os.path.relpath(local_path, self.root).replace(os.sep, "/")
+                files.append(("/" + relative, os.path.getsize(local_path)))
+        return sorted(files)
+
+    def list_folders(self, folder):
+        folders = []
+        for directory, names, _ in os.walk(self._local(folder)):
+            folders.extend("/" + os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, "/") for name in names)
+        return sorted(folders)
+
+    def exists(self, path):
+        return os.path.isfile(self._local(path))
+
+    def download(self, path):
+        with open(self._local(path), "rb") as f:
+            return f.read()
+
+    def download_to_file(self, path, local_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        with open(self._local(path), "rb") as source, open(local_path, "wb") as target:
+            shutil.copyfileobj(source, target, chunk_size)
+
+    def upload(self, data, path):
+        target = self._local(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(data)
+
+    def upload_file(self, local_path, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        target = self._local(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(local_path, "rb") as source, open(target, "wb") as destination:
+            shutil.copyfileobj(source, destination, chunk_size)
+
+
+class HttpEmulatorBackend(StorageBackend):
+    """Client for a service speaking the Dropbox v2 file endpoints (see dropbox_emulator.py)."""
+
+    name = "http"
+
+    def __init__(self, base_url=DEFAULT_EMULATOR_URL):
+        import requests
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+
+    def _rpc(self, endpoint, payload):
+        response = self.session.post(f"{self.base_url}/2/{endpoint}", json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    def _content(self, endpoint, arg, data=None, stream=False):
+        headers = {"Dropbox-API-Arg": json.dumps(arg), "Content-Type": "application/octet-stream"}
+        response = self.session.post(f"{self.base_url}/2/{endpoint}", headers=headers, data=data, stream=stream)
+        response.raise_for_status()
+        return response
+
+    def list_files(self, folder):
+        files = []
+        result = self._rpc("files/list_folder", {"path": folder, "recursive": True})
+        while True:
+            files.extend((entry["path_display"], entry["size"]) for entry in result["entries"] if entry[".tag"] == "file")
+            if not result["has_more"]:
+                return files
+            result = self._rpc("files/list_folder/continue", {"cursor": result["cursor"]})
+
+    def list_folders(self, folder):
+        folders = []
+        result = self._rpc("files/list_folder", {"path": folder, "recursive": True})
+        while True:
+            folders.extend(entry["path_display"] for entry in result["entries"] if entry[".tag"] == "folder")
+            if not result["has_more"]:
+                return folders
+            result = self._rpc("files/list_folder/continue", {"cursor": result["cursor"]})
+
+    def exists(self, path):
+        response = self.session.post(f"{self.base_url}/2/files/get_metadata", json={"path": path})
+        return response.status_code == 200
+
+    def download(self, path):
+        return self._content("files/download", {"path": path}).content
+
+    def download_to_file(self, path, local_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        response = self._content("files/download", {"path": path}, stream=True)
+        with open(local_path, "wb") as f:
+            for block in response.iter_content(chunk_size=chunk_size):
+                f.write(block)
+
+    def upload(self, data, path):
+        self._content("files/upload", {"path": path, "mode": "overwrite"}, data=data)
+
+    def upload_file(self, local_path, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        size = os.path.getsize(local_path)
+        with open(local_path, "rb") as f:
+            if size <= chunk_size:
+                self.upload(f.read(), path)
+                return
+
+            session_id = self._content("files/upload_session/start", {}, data=f.read(chunk_size)).json()["session_id"]
+            while size - f.tell() > chunk_size:
+                cursor = {"session_id": session_id, "offset": f.tell()}
+                self._content("files/upload_session/append_v2", {"cursor": cursor}, data=f.read(chunk_size))
+            cursor = {"session_id": session_id, "offset": f.tell()}
+            commit = {"path": path, "mode": "overwrite"}
+            self._content("files/upload_session/finish", {"cursor": cursor, "commit": commit}, data=f.read())
+
+
+def create_backend(kind=None, token_provider=None):
+    """Builds the storage backend selected by `kind` or STORAGE_BACKEND.
+
+    Args:
+        kind (str): "dropbox", "local" or "http"; defaults to STORAGE_BACKEND or "dropbox".
+        token_provider (callable): Returns a Dropbox access token; only called for Dropbox.
+
+    Returns:
+        StorageBackend: The configured backend.
+    """
+    kind = (kind or os.getenv("STORAGE_BACKEND", "dropbox")).lower()
+    if kind == "dropbox":
+        if token_provider is None:
+            raise ValueError("The Dropbox backend needs a token provider.")
+        return DropboxBackend(token_provider())
+    if kind == "local":
+        return LocalBackend(os.getenv("LOCAL_STORAGE_ROOT", os.path.join("data", "local_storage")))
+    if kind == "http":
+        return HttpEmulatorBackend(os.getenv("STORAGE_EMULATOR_URL", DEFAULT_EMULATOR_URL))
+    raise ValueError(f"Unknown storage backend '{kind}'. Use dropbox, local or http.")
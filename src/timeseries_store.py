@@ -0,0 +1,377 @@
+# src/timeseries_store.py
+
+# Compact time-series store for the simulation output: the mesh of a .pvd/.vtu
+# series is stored once and every timestep only adds its field arrays, split
+# into byte-shuffled, zlib-compressed chunks.
+# Example (plain Python + NumPy, no VTK needed):
+# python3 timeseries_store.py data/testing-input-output/vtk_output/turbine_flow_animation.pvd \
+#     data/testing-input-output/vtk_output/turbine_flow_animation.tss [--compression zlib|none] [--level 6] \
+#     [--no-delta] [--keyframe-interval 10]
+#
+# Every render pass takes the store in place of the .pvd (--pvd-file flow.tss);
+# see open_fluid_series. The preview renderer reads it with TimeSeriesStore.
+# The store is a derived file; like the caches in pipeline_cache.py it stays
+# out of the output bundle (CI writes it to $RUNNER_TEMP).
+#
+# Delta encoding XORs each array's bits with the same array of the previous
+# timestep, which is lossless and leaves mostly zero bytes where the flow
+# changes slowly. Every --keyframe-interval timesteps an array is stored whole,
+# so reading any timestep decodes at most that many steps of one array.
+#
+# File layout: 24-byte header (magic, index offset, index size), 64-byte aligned
+# chunks, then a JSON index with the byte range of every chunk. The file is
+# memory-mapped, so reading a timestep only touches its own chunks; with
+# --compression none and --no-delta arrays are zero-copy views of the file.
+
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+
+import numpy as np
+
+from pvd_index import parse_pvd, timestep_values
+from vtk_xml_reader import read_dataset
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_EXTENSION = ".tss"
+STORE_MAGIC = b"VTKTSS01"
+STORE_HEADER = struct.Struct("<8sQQ")
+STORE_ALIGNMENT = 64
+STORE_CHUNK_BYTES = int(os.getenv("STORE_CHUNK_BYTES", str(4 << 20)))
+KEYFRAME_INTERVAL = 10
+FIELD_SECTIONS = ("point_data", "cell_data")
+MESH_ARRAYS = ("points", "connectivity", "offsets", "types")
+
+
+def shuffle_bytes(data, itemsize):
+    """Groups the n-th byte of every value together, which compresses far better."""
+    if itemsize == 1:
+        return data
+    return np.frombuffer(data, np.uint8).reshape(-1, itemsize).T.tobytes()
+
+
+def unshuffle_bytes(data, itemsize):
+    if itemsize == 1:
+        return data
+    return np.frombuffer(data, np.uint8).reshape(itemsize, -1).T.tobytes()
+
+
+def xor_delta(values, previous):
+    """XORs the bit patterns of two arrays of the same dtype and shape (its own inverse)."""
+    bits = np.dtype(f"u{values.dtype.itemsize}")
+    return (np.ascontiguousarray(values).view(bits) ^ np.ascontiguousarray(previous).view(bits)).view(values.dtype)
+
+
+def merge_pieces(pieces):
+    """Concatenates the pieces of one timestep (read_dataset dicts) into a single dataset."""
+    if len(pieces) == 1:
+        return pieces[0]
+    merged = {"points": np.concatenate([piece["points"] for piece in pieces])}
+    for section in FIELD_SECTIONS:
+        merged[section] = {name: np.concatenate([piece[section][name] for piece in pieces])
+                           for name in pieces[0][section]}
+    point_base, connectivity_base = 0, 0
+    connectivity, offsets = [], []
+    for piece in pieces:
+        connectivity.append(piece["connectivity"] + point_base)
+        offsets.append(piece["offsets"] + connectivity_base)
+        point_base += len(piece["points"])
+        connectivity_base += len(piece["connectivity"])
+    merged["connectivity"] = np.concatenate(connectivity)
+    merged["offsets"] = np.concatenate(offsets)
+    merged["types"] = np.concatenate([piece["types"] for piece in pieces])
+    return merged
+
+
+class _StoreWriter:
+    """Appends aligned, optionally compressed chunks to an open store file."""
+
+    def __init__(self, f, compression, level):
+        self.f, self.compression, self.level = f, compression, level
+
+    def _align(self):
+        padding = -self.f.tell() % STORE_ALIGNMENT
+        if padding:
+            self.f.write(b"\0" * padding)
+
+    def write_array(self, values, encoding="raw"):
+        values = np.ascontiguousarray(values)
+        data = values.tobytes()
+        itemsize = values.dtype.itemsize
+        chunks = []
+        if self.compression == "none":
+            # One contiguous range, so the reader can map it without copying
+            self._align()
+            chunks.append([self.f.tell(), len(data), len(data)])
+            self.f.write(data)
+        else:
+            row_bytes = itemsize * (values.shape[1] if values.ndim > 1 else 1)
+            step = max(row_bytes, STORE_CHUNK_BYTES // row_bytes * row_bytes)
+            for start in range(0, max(len(data), 1), step):
+                raw = data[start:start + step]
+                packed = zlib.compress(shuffle_bytes(raw, itemsize), self.level)
+                self._align()
+                chunks.append([self.f.tell(), len(packed), len(raw)])
+                self.f.write(packed)
+        return {"dtype": values.dtype.str, "shape": list(values.shape), "encoding": encoding, "chunks": chunks}
+
+
+def convert_pvd(pvd_path, store_path, compression="zlib", level=6, delta=True, keyframe_interval=KEYFRAME_INTERVAL):
+    """Converts a .pvd series of unstructured grids into a time-series store.
+
+    Args:
+        pvd_path (str): The .pvd collection; all its timesteps must share one mesh.
+        store_path (str): Output store (written to a temporary file, then renamed).
+        compression (str): "zlib" or "none".
+        level (int): zlib compression level.
+        delta (bool): XOR-encode field arrays against the previous timestep.
+        keyframe_interval (int): Timesteps between whole (non-delta) copies of an array.
+
+    Returns:
+        dict: The store index.
+    """
+    if compression not in ("zlib", "none"):
+        raise ValueError(f"Unknown compression '{compression}' (use zlib or none)")
+    with open(pvd_path, "rb") as f:
+        datasets = parse_pvd(f.read())
+    pvd_dir = os.path.dirname(os.path.abspath(pvd_path))
+
+    index = {"version": 1, "compression": compression, "delta": bool(delta),
+             "keyframe_interval": max(1, keyframe_interval), "mesh": None, "timesteps": []}
+    os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+    tmp_path = store_path + ".tmp"
+    try:
+        _write_store(tmp_path, pvd_dir, datasets, index, compression, level, delta)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, store_path)
+    return index
+
+
+def _write_store(path, pvd_dir, datasets, index, compression, level, delta):
+    mesh, previous = None, {}
+    with open(path, "wb") as f:
+        f.write(STORE_HEADER.pack(STORE_MAGIC, 0, 0))
+        writer = _StoreWriter(f, compression, level)
+        for step, timestep in enumerate(timestep_values(datasets)):
+            entries = [entry for entry in datasets if entry["timestep"] == timestep]
+            dataset = merge_pieces([read_dataset(os.path.join(pvd_dir, entry["file"])) for entry in entries])
+            if "types" not in dataset:
+                raise ValueError(f"{entries[0]['file']} is not an unstructured grid (.vtu)")
+
+            if mesh is None:
+                mesh = {name: dataset[name] for name in MESH_ARRAYS}
+                index["mesh"] = {name: writer.write_array(values) for name, values in mesh.items()}
+            elif any(not np.array_equal(mesh[name], dataset[name]) for name in MESH_ARRAYS):
+                raise ValueError(f"Mesh of timestep {timestep:g} differs from the first timestep; "
+                                 "the store only holds series on a fixed mesh")
+
+            record = {"time": timestep, "files": [entry["file"] for entry in entries]}
+            keyframe = step % index["keyframe_interval"] == 0
+            for section in FIELD_SECTIONS:
+                record[section] = {}
+                for name, values in dataset[section].items():
+                    values = np.ascontiguousarray(values)
+                    before = previous.get((section, name))
+                    if delta and not keyframe and before is not None \
+                            and before.dtype == values.dtype and before.shape == values.shape:
+                        record[section][name] = writer.write_array(xor_delta(values, before), "delta")
+                    else:
+                        record[section][name] = writer.write_array(values)
+                    previous[(section, name)] = values
+            index["timesteps"].append(record)
+
+        if mesh is None:
+            raise ValueError("No timesteps found in the collection")
+        index_offset = f.tell()
+        index_bytes = json.dumps(index).encode("utf-8")
+        f.write(index_bytes)
+        f.seek(0)
+        f.write(STORE_HEADER.pack(STORE_MAGIC, index_offset, len(index_bytes)))
+
+
+class TimeSeriesStore:
+    """Read access to a time-series store; arrays are decoded from the mapped file on demand."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_size = STORE_HEADER.unpack_from(self._map, 0)
+        if magic != STORE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a time-series store")
+        self.index = json.loads(self._map[index_offset:index_offset + index_size])
+        self.times = [record["time"] for record in self.index["timesteps"]]
+        # Last decoded value of every field, so playing forward decodes one delta per step
+        self._decoded = {}
+        self._mesh = None
+
+    def __len__(self):
+        return len(self.times)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Zero-copy arrays still reference the mapping; it is released with them
+        self._file.close()
+
+    def step_for_time(self, time):
+        """Returns the index of the last timestep at or before `time` (ParaView's snap-to-timestep)."""
+        return max(0, int(np.searchsorted(self.times, time, side="right")) - 1)
+
+    def _read(self, blob):
+        dtype = np.dtype(blob["dtype"])
+        if self.index["compression"] == "none":
+            offset, size, _ = blob["chunks"][0]
+            values = np.frombuffer(self._map, dtype, size // dtype.itemsize, offset)
+        else:
+            data = b"".join(unshuffle_bytes(zlib.decompress(self._map[offset:offset + size]), dtype.itemsize)
+                            for offset, size, _ in blob["chunks"])
+            values = np.frombuffer(data, dtype)
+        return values.reshape(blob["shape"])
+
+    def mesh(self):
+        """Returns the shared mesh: points, connectivity, offsets and types (read_dataset layout).
+
+        The mesh is decoded on the first call only; later calls return the same arrays.
+        """
+        if self._mesh is None:
+            self._mesh = {name: self._read(blob) for name, blob in self.index["mesh"].items()}
+        return self._mesh
+
+    def array_names(self, section="point_data"):
+        return list(self.index["timesteps"][0][section]) if self.times else []
+
+    def array(self, step, name, section="point_data"):
+        """Decodes one field array of one timestep.
+
+        Delta-encoded arrays are rebuilt from the closest earlier keyframe, or
+        from the previous timestep when that was the last one read.
+        """
+        records = self.index["timesteps"]
+        start = step
+        while records[start][section][name]["encoding"] == "delta":
+            cached = self._decoded.get((section, name))
+            if cached is not None and cached[0] == start - 1:
+                break
+            start -= 1
+
+        cached = self._decoded.get((section, name))
+        values = cached[1] if cached is not None and cached[0] == start - 1 else None
+        for current in range(start, step + 1):
+            blob = records[current][section][name]
+            stored = self._read(blob)
+            values = xor_delta(stored, values) if blob["encoding"] == "delta" else stored
+        self._decoded[(section, name)] = (step, values)
+        return values
+
+    def read_fields(self, step):
+        """Returns the point and cell data of one timestep, without the mesh."""
+        return {section: {name: self.array(step, name, section) for name in self.array_names(section)}
+                for section in FIELD_SECTIONS}
+
+    def read_timestep(self, step):
+        """Returns one timestep in the read_dataset layout (mesh plus its point and cell data)."""
+        dataset = dict(self.mesh())
+        dataset.update(self.read_fields(step))
+        return dataset
+
+
+def mesh_grid(mesh):
+    """Builds the points and cells of a vtkUnstructuredGrid once, for `to_unstructured_grid(..., base=)`."""
+    return to_unstructured_grid({name: mesh[name] for name in MESH_ARRAYS})
+
+
+def to_unstructured_grid(dataset, base=None):
+    """Builds a vtkUnstructuredGrid from a read_dataset/read_timestep dict (needs VTK).
+
+    Args:
+        dataset (dict): Mesh and field arrays, or only the field arrays when `base` is given.
+        base: Grid from `mesh_grid`; its points and cells are shared (shallow copy),
+            so only the field arrays are converted.
+    """
+    from vtkmodules.vtkCommonCore import vtkPoints
+    from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkUnstructuredGrid
+    from vtkmodules.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray
+
+    grid = vtkUnstructuredGrid()
+    if base is not None:
+        grid.ShallowCopy(base)
+        return _add_fields(grid, dataset)
+
+    points = vtkPoints()
+    points.SetData(numpy_to_vtk(np.ascontiguousarray(dataset["points"]), deep=True))
+    grid.SetPoints(points)
+
+    cells = vtkCellArray()
+    offsets = np.concatenate([[0], dataset["offsets"]]).astype(np.int64)
+    cells.SetData(numpy_to_vtkIdTypeArray(offsets, deep=True),
+                  numpy_to_vtkIdTypeArray(dataset["connectivity"].astype(np.int64), deep=True))
+    grid.SetCells(numpy_to_vtk(dataset["types"].astype(np.uint8), deep=True), cells)
+    return _add_fields(grid, dataset)
+
+
+def _add_fields(grid, dataset):
+    from vtkmodules.util.numpy_support import numpy_to_vtk
+
+    for section, data in (("point_data", grid.GetPointData()), ("cell_data", grid.GetCellData())):
+        for name, values in dataset.get(section, {}).items():
+            array = numpy_to_vtk(np.ascontiguousarray(values), deep=True)
+            array.SetName(name)
+            data.AddArray(array)
+    return grid
+
+
+def open_fluid_series(pv_s, path):
+    """Opens the simulation series for a render pass: a .pvd collection or a time-series store.
+
+    Args:
+        pv_s: The `paraview.simple` module.
+        path (str): .pvd or .tss file.
+
+    Returns:
+        The reader proxy (with TimestepValues either way).
+    """
+    if not path.lower().endswith(STORE_EXTENSION):
+        return pv_s.PVDReader(FileName=path)
+    if not hasattr(pv_s, "TimeSeriesStoreReader"):
+        pv_s.LoadPlugin(os.path.join(SRC_DIR, "paraview_timeseries_reader.py"), remote=True)
+    print(f"🗃️ Reading time-series store: {path}")
+    return pv_s.TimeSeriesStoreReader(FileName=path)
+
+
+if __name__ == "__main__":
+    args = sys.argv
+    if len(args) < 3 or not os.path.isfile(args[1]):
+        print("Usage: python3 timeseries_store.py <input.pvd> <output.tss> [--compression zlib|none] [--level N] "
+              "[--no-delta] [--keyframe-interval N]")
+        sys.exit(1)
+
+    compression, level, delta, keyframe_interval = "zlib", 6, True, KEYFRAME_INTERVAL
+    for i, arg in enumerate(args):
+        if arg == "--compression" and i + 1 < len(args): compression = args[i+1].lower()
+        elif arg == "--level" and i + 1 < len(args): level = int(args[i+1])
+        elif arg == "--no-delta": delta = False
+        elif arg == "--keyframe-interval" and i + 1 < len(args): keyframe_interval = int(args[i+1])
+
+    index = convert_pvd(args[1], args[2], compression, level, delta, keyframe_interval)
+    pvd_dir = os.path.dirname(os.path.abspath(args[1]))
+    source_bytes = os.path.getsize(args[1]) + sum(os.path.getsize(os.path.join(pvd_dir, name))
+                                                  for record in index["timesteps"] for name in record["files"])
+    store_bytes = os.path.getsize(args[2])
+    print(f"✅ {len(index['timesteps'])} timesteps: {source_bytes / 1e6:.1f} MB of XML -> "
+          f"{store_bytes / 1e6:.1f} MB store ({100.0 * store_bytes / max(source_bytes, 1):.0f}%)")
+    print(f"STORE_FILE={os.path.abspath(args[2])}")
@@ -0,0 +1,125 @@
+# src/transfer_benchmark.py
+
+# Measures upload/download throughput of the transfer engine for different
+# concurrency and chunk-size settings, offline by default.
+# Example:
+# python3 transfer_benchmark.py --backend http --files 40 --file-size-mb 2 \
+#     --concurrency 1,4,8 --chunk-size-mb 1,4 --latency 0.05 --bandwidth-mbps 100
+#
+# Backends: "http" starts dropbox_emulator.py in-process (latency/bandwidth apply),
+# "local" uses a scratch directory, "dropbox" uses the live service
+# (STORAGE_BACKEND credentials via APP_KEY / APP_SECRET / REFRESH_TOKEN).
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+import storage_backends
+from dropbox_emulator import start_emulator
+from download_dropbox_files import download_folder, refresh_access_token
+from upload_to_dropbox import upload_files
+
+BENCHMARK_REMOTE_FOLDER = os.getenv("BENCHMARK_REMOTE_FOLDER", "/transfer_benchmark")
+
+
+def create_test_files(folder, num_files, file_size):
+    """Writes incompressible test files and returns their paths."""
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for index in range(num_files):
+        path = os.path.join(folder, f"frame_{index:04d}.bin")
+        with open(path, "wb") as f:
+            f.write(os.urandom(file_size))
+        paths.append(path)
+    return paths
+
+
+def measure(label, action, num_files, total_bytes):
+    start = time.time()
+    failures = action()
+    seconds = max(time.time() - start, 1e-9)
+    return {
+        "direction": label,
+        "seconds": round(seconds, 3),
+        "files_per_second": round(num_files / seconds, 2),
+        "mb_per_second": round(total_bytes / seconds / (1024 * 1024), 2),
+        "failures": failures,
+    }
+
+
+def run_benchmark(backend, work_dir, num_files, file_size, concurrency_levels, chunk_sizes):
+    """Uploads and downloads the same file set for every setting combination.
+
+    Returns:
+        list: One result dict per (direction, concurrency, chunk size).
+    """
+    source_files = create_test_files(os.path.join(work_dir, "source"), num_files, file_size)
+    total_bytes = num_files * file_size
+    results = []
+
+    for concurrency in concurrency_levels:
+        for chunk_size in chunk_sizes:
+            remote_folder = f"{BENCHMARK_REMOTE_FOLDER}/c{concurrency}_k{chunk_size}"
+            uploads = [(path, f"{remote_folder}/{os.path.basename(path)}") for path in source_files]
+            target = os.path.join(work_dir, f"download_c{concurrency}_k{chunk_size}")
+
+            upload = measure("upload", lambda: len(upload_files(backend, uploads, concurrency, chunk_size)),
+                             num_files, total_bytes)
+
+            with open(os.devnull, "w") as log_file:
+                download = measure("download",
+                                   lambda: num_files - len(download_folder(backend, remote_folder, target, log_file,
+                                                                            concurrency, chunk_size, verbose=False)),
+                                   num_files, total_bytes)
+            shutil.rmtree(target, ignore_errors=True)
+
+            for result in (upload, download):
+                result.update({"concurrency": concurrency, "chunk_size_mb": round(chunk_size / (1024 * 1024), 3)})
+                results.append(result)
+                print(f"🔹 {result['direction']:8s} concurrency={concurrency:<3d} chunk={result['chunk_size_mb']:>6} MB  "
+                      f"{result['files_per_second']:>8} files/s  {result['mb_per_second']:>8} MB/s  failures={result['failures']}")
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv
+    backend_kind, num_files, file_size_mb = "http", 20, 1.0
+    concurrency_levels, chunk_sizes_mb = [1, 4, 8], [4.0]
+    latency, bandwidth_mbps, output_path = 0.02, 0.0, None
+    for i, arg in enumerate(args):
+        if arg == "--backend" and i + 1 < len(args): backend_kind = args[i+1]
+        elif arg == "--files" and i + 1 < len(args): num_files = int(args[i+1])
+        elif arg == "--file-size-mb" and i + 1 < len(args): file_size_mb = float(args[i+1])
+        elif arg == "--concurrency" and i + 1 < len(args): concurrency_levels = [int(x) for x in args[i+1].split(",")]
+        elif arg == "--chunk-size-mb" and i + 1 < len(args): chunk_sizes_mb = [float(x) for x in args[i+1].split(",")]
+        elif arg == "--latency" and i + 1 < len(args): latency = float(args[i+1])
+        elif arg == "--bandwidth-mbps" and i + 1 < len(args): bandwidth_mbps = float(args[i+1])
+        elif arg == "--output" and i + 1 < len(args): output_path = args[i+1]
+
+    work_dir = tempfile.mkdtemp(prefix="transfer_benchmark_")
+    server = None
+    try:
+        if backend_kind == "http":
+            server, url = start_emulator(os.path.join(work_dir, "remote"), latency=latency, bandwidth_mbps=bandwidth_mbps)
+            backend = storage_backends.HttpEmulatorBackend(url)
+            print(f"✅ Emulator at {url} (latency {latency}s, bandwidth {bandwidth_mbps or 'unlimited'} Mbit/s)")
+        elif backend_kind == "local":
+            backend = storage_backends.LocalBackend(os.path.join(work_dir, "remote"))
+        else:
+            backend = storage_backends.create_backend(backend_kind, token_provider=lambda: refresh_access_token(
+                os.getenv("REFRESH_TOKEN"), os.getenv("APP_KEY"), os.getenv("APP_SECRET")))
+
+        results = run_benchmark(backend, work_dir, num_files, int(file_size_mb * 1024 * 1024),
+                                concurrency_levels, [int(mb * 1024 * 1024) for mb in chunk_sizes_mb])
+    finally:
+        if server:
+            server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump({"backend": backend_kind, "files": num_files, "file_size_mb": file_size_mb, "results": results}, f, indent=2)
+        print(f"✅ Benchmark results written to {output_path}")
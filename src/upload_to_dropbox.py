@@ -1,7 +1,13 @@
-import dropbox
 import os
 import requests
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import storage_backends
+from storage_backends import DEFAULT_CHUNK_SIZE
+
+# Upload tuning (files larger than the chunk size go through an upload session)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(DEFAULT_CHUNK_SIZE)))
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
 
 # Function to refresh the access token
 def refresh_access_token(refresh_token, client_id, client_secret):
@@ -22,6 +28,30 @@ def refresh_access_token(refresh_token, client_id, client_secret):
         print(f"❌ {error_msg}", file=sys.stderr) # Print to stderr for GitHub Actions error visibility
         raise Exception(error_msg)
 
+# Function to upload many files through a pool of concurrent uploads
+def upload_files(backend, uploads, concurrency=UPLOAD_CONCURRENCY, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Uploads (local_path, remote_path) pairs concurrently.
+
+    Args:
+        backend (StorageBackend): Destination store.
+        uploads (list): (local_path, remote_path) tuples.
+        concurrency (int): Number of parallel uploads.
+        chunk_size (int): Files larger than this use chunked upload sessions.
+
+    Returns:
+        list: Remote paths that failed to upload (empty on success).
+    """
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(backend.upload_file, local, remote, chunk_size): remote for local, remote in uploads}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ Failed to upload '{futures[future]}': {e}", file=sys.stderr)
+                failed.append(futures[future])
+    return failed
+
 # Function to upload a file to Dropbox
 def upload_file_to_dropbox(local_file_path, dropbox_destination_path, refresh_token, client_id, client_secret):
     """Uploads a local file to a specified full path on Dropbox, including subfolders.
@@ -37,14 +67,14 @@ def upload_file_to_dropbox(local_file_path, dropbox_destination_path, refresh_to
         bool: True if upload was successful, False otherwise.
     """
     try:
-        access_token = refresh_access_token(refresh_token, client_id, client_secret)
-        dbx = dropbox.Dropbox(access_token)
+        # Backend from STORAGE_BACKEND (Dropbox by default); the token is only refreshed for Dropbox
+        backend = storage_backends.create_backend(
+            token_provider=lambda: refresh_access_token(refresh_token, client_id, client_secret)
+        )
 
-        # Open the local file in binary read mode
-        with open(local_file_path, "rb") as f:
-            # Upload the file, overwriting if it already exists (mode=dropbox.files.WriteMode.overwrite)
-            # The files_upload method will automatically create necessary parent folders on Dropbox.
-            dbx.files_upload(f.read(), dropbox_destination_path, mode=dropbox.files.WriteMode.overwrite)
+        # Upload the file, overwriting if it already exists; parent folders are created as needed.
+        # Files larger than UPLOAD_CHUNK_SIZE are sent through an upload session.
+        backend.upload_file(local_file_path, dropbox_destination_path, UPLOAD_CHUNK_SIZE)
         print(f"✅ Successfully uploaded file to Dropbox: {dropbox_destination_path}")
         return True # Indicate success
     except Exception as e:
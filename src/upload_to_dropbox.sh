@@ -5,6 +5,22 @@ APP_KEY="${APP_KEY}"
 APP_SECRET="${APP_SECRET}"
 REFRESH_TOKEN="${REFRESH_TOKEN}"
 DROPBOX_BASE_FOLDER="/engineering_simulations_pipeline"
+UPLOAD_MODE="${UPLOAD_MODE:-zip}"  # zip | delta
+
+# Delta mode: upload only new file contents plus a manifest for this run
+if [ "$UPLOAD_MODE" = "delta" ]; then
+    OUTPUT_DIR="$GITHUB_WORKSPACE/data/testing-input-output"
+    RUN_ID="${GITHUB_RUN_ID:-$(date +%Y%m%d%H%M%S)}"
+    echo "📤 Delta upload of $OUTPUT_DIR as run $RUN_ID"
+    export APP_KEY APP_SECRET REFRESH_TOKEN
+    if python3 src/delta_upload.py upload "$OUTPUT_DIR" "${DROPBOX_BASE_FOLDER}/delta" "$RUN_ID"; then
+        echo "✅ Delta upload complete. Restore with: python3 src/delta_upload.py restore ${DROPBOX_BASE_FOLDER}/delta $RUN_ID <dir>"
+        exit 0
+    else
+        echo "❌ Delta upload failed"
+        exit 1
+    fi
+fi
 
 # Path to the zipped archive
 ZIP_FILE="$GITHUB_WORKSPACE/data/testing-output-bundle.zip"
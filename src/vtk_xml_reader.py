@@ -0,0 +1,174 @@
+# src/vtk_xml_reader.py
+
+# Minimal reader for VTK XML datasets (.vtu, .vtp, .vts) into NumPy, for tools
+# that must run without ParaView or VTK installed.
+#
+# Supported: ascii, binary (base64) and appended (raw or base64) data arrays,
+# UInt32/UInt64 block headers, zlib compression and both byte orders. Not
+# supported: lz4/lzma compression and ImageData/RectilinearGrid layouts.
+
+import zlib
+import base64
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+VTK_TYPES = {
+    "Int8": "i1", "UInt8": "u1", "Int16": "i2", "UInt16": "u2",
+    "Int32": "i4", "UInt32": "u4", "Int64": "i8", "UInt64": "u8",
+    "Float32": "f4", "Float64": "f8",
+}
+PIECE_TYPES = ("UnstructuredGrid", "PolyData", "StructuredGrid")
+
+
+def _dtype(vtk_type, byte_order):
+    if vtk_type not in VTK_TYPES:
+        raise ValueError(f"Unsupported data array type '{vtk_type}'")
+    return np.dtype(VTK_TYPES[vtk_type]).newbyteorder("<" if byte_order == "LittleEndian" else ">")
+
+
+def _decode_blocks(raw, header_dtype, compressed, decode_base64):
+    """Decodes one binary data array (header + payload) to its uncompressed bytes.
+
+    Args:
+        raw (bytes): The encoded array, starting at its header.
+        decode_base64 (bool): Whether header and payload are base64 text.
+
+    Returns:
+        tuple: (payload bytes, number of encoded bytes consumed)
+    """
+    size = header_dtype.itemsize
+    if not compressed:
+        if decode_base64:
+            # Header and data were encoded together, so decode the whole text at once
+            data = base64.b64decode(raw)
+            length = int(np.frombuffer(data[:size], header_dtype)[0])
+            return data[size:size + length], len(raw)
+        length = int(np.frombuffer(raw[:size], header_dtype)[0])
+        return raw[size:size + length], size + length
+
+    # Compressed header: [blocks, block size, last block size, compressed sizes...]
+    if decode_base64:
+        header_chars = lambda count: 4 * -(-count * size // 3)
+        first = base64.b64decode(raw[:header_chars(3)])
+        blocks = int(np.frombuffer(first[:size], header_dtype)[0])
+        header_length = header_chars((3 + blocks))
+        header = np.frombuffer(base64.b64decode(raw[:header_length])[:(3 + blocks) * size], header_dtype)
+        payload = base64.b64decode(raw[header_length:header_length + 4 * -(-int(header[3:].sum()) // 3)])
+        consumed = header_length + 4 * -(-int(header[3:].sum()) // 3)
+    else:
+        blocks = int(np.frombuffer(raw[:size], header_dtype)[0])
+        header = np.frombuffer(raw[:(3 + blocks) * size], header_dtype)
+        payload = raw[(3 + blocks) * size:(3 + blocks) * size + int(header[3:].sum())]
+        consumed = (3 + blocks) * size + int(header[3:].sum())
+
+    chunks, offset = [], 0
+    for compressed_size in header[3:]:
+        chunks.append(zlib.decompress(payload[offset:offset + int(compressed_size)]))
+        offset += int(compressed_size)
+    return b"".join(chunks), consumed
+
+
+class VTKXMLFile:
+    """Parsed VTK XML file; `array(element)` decodes any of its DataArray elements."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            content = f.read()
+
+        # Raw appended data is not valid XML, so split it off before parsing
+        self.appended, self.appended_base64 = None, False
+        marker = content.find(b"<AppendedData")
+        if marker >= 0:
+            start = content.index(b"_", content.index(b">", marker)) + 1
+            end = content.rindex(b"</AppendedData>")
+            self.appended = content[start:end]
+            encoding = content[marker:start].split(b'encoding="')[1].split(b'"')[0] if b'encoding="' in content[marker:start] else b"raw"
+            self.appended_base64 = encoding == b"base64"
+            content = content[:marker] + b"</VTKFile>"
+            if self.appended_base64:
+                self.appended = self.appended.strip()
+
+        self.root = ET.fromstring(content)
+        self.type = self.root.get("type")
+        self.byte_order = self.root.get("byte_order", "LittleEndian")
+        self.header_dtype = _dtype(self.root.get("header_type", "UInt32"), self.byte_order)
+        compressor = self.root.get("compressor")
+        if compressor and compressor != "vtkZLibDataCompressor":
+            raise ValueError(f"Unsupported compressor '{compressor}' (only zlib is supported)")
+        self.compressed = bool(compressor)
+
+    def array(self, element):
+        """Returns a DataArray element as a NumPy array of shape (tuples, components) or (tuples,)."""
+        dtype = _dtype(element.get("type"), self.byte_order)
+        components = int(element.get("NumberOfComponents", "1"))
+        data_format = element.get("format", "ascii")
+
+        if data_format == "ascii":
+            values = np.array((element.text or "").split(), dtype=dtype.newbyteorder("="))
+        elif data_format == "binary":
+            payload, _ = _decode_blocks("".join((element.text or "").split()).encode("ascii"),
+                                        self.header_dtype, self.compressed, True)
+            values = np.frombuffer(payload, dtype)
+        elif data_format == "appended":
+            offset = int(element.get("offset", "0"))
+            payload, _ = _decode_blocks(self.appended[offset:], self.header_dtype, self.compressed, self.appended_base64)
+            values = np.frombuffer(payload, dtype)
+        else:
+            raise ValueError(f"Unknown DataArray format '{data_format}'")
+
+        values = values.astype(dtype.newbyteorder("="), copy=False)
+        return values.reshape(-1, components) if components > 1 else values
+
+    def pieces(self):
+        dataset = self.root.find(self.type)
+        if self.type not in PIECE_TYPES or dataset is None:
+            raise ValueError(f"Unsupported VTK XML dataset type '{self.type}'")
+        return dataset.findall("Piece")
+
+
+def read_dataset(path):
+    """Reads a .vtu/.vtp/.vts file.
+
+    Returns:
+        dict: "points" (n, 3) float64, "point_data" {name: array}, "cell_data" {name: array}
+            and, for polygonal and unstructured data, "connectivity"/"offsets" (and "types"
+            for unstructured grids). Multiple pieces are concatenated.
+    """
+    vtk_file = VTKXMLFile(path)
+    points, point_data, cell_data = [], {}, {}
+    connectivity, offsets, types = [], [], []
+    point_base, offset_base = 0, 0
+
+    for piece in vtk_file.pieces():
+        piece_points = vtk_file.array(piece.find("Points/DataArray")).astype(np.float64).reshape(-1, 3)
+        for section, target in (("PointData", point_data), ("CellData", cell_data)):
+            element = piece.find(section)
+            for array_element in (element.findall("DataArray") if element is not None else []):
+                target.setdefault(array_element.get("Name"), []).append(vtk_file.array(array_element))
+
+        cells = piece.find("Cells") if vtk_file.type == "UnstructuredGrid" else piece.find("Polys")
+        if cells is not None:
+            arrays = {element.get("Name"): element for element in cells.findall("DataArray")}
+            piece_connectivity = vtk_file.array(arrays["connectivity"]).astype(np.int64)
+            piece_offsets = vtk_file.array(arrays["offsets"]).astype(np.int64)
+            connectivity.append(piece_connectivity + point_base)
+            offsets.append(piece_offsets + offset_base)
+            offset_base += len(piece_connectivity)
+            if "types" in arrays:
+                types.append(vtk_file.array(arrays["types"]).astype(np.uint8))
+
+        points.append(piece_points)
+        point_base += len(piece_points)
+
+    dataset = {
+        "points": np.concatenate(points) if points else np.zeros((0, 3)),
+        "point_data": {name: np.concatenate(parts) for name, parts in point_data.items()},
+        "cell_data": {name: np.concatenate(parts) for name, parts in cell_data.items()},
+    }
+    if connectivity:
+        dataset["connectivity"] = np.concatenate(connectivity)
+        dataset["offsets"] = np.concatenate(offsets)
+    if types:
+        dataset["types"] = np.concatenate(types)
+    return dataset
@@ -0,0 +1,44 @@
+# src/warm_cache.py
+
+# Least-recently-used cache for the render service (paraview_render_service.py):
+# keeps the datasets of the last few jobs loaded and releases the oldest one
+# when a new dataset does not fit. Plain Python, no ParaView needed.
+
+from collections import OrderedDict
+
+
+class WarmCache:
+    """Keeps the `capacity` most recently used values.
+
+    Args:
+        capacity (int): Number of values kept.
+        on_evict (callable): Called with every value that is dropped.
+    """
+
+    def __init__(self, capacity, on_evict=None):
+        self.capacity = max(1, capacity)
+        self.on_evict = on_evict
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def get(self, key, create):
+        """Returns the value for `key`, creating it with `create()` when it is not cached.
+
+        Returns:
+            tuple: (value, warm); `warm` is True when the value came from the cache.
+        """
+        if key in self._values:
+            self._values.move_to_end(key)
+            return self._values[key], True
+
+        value = self._values[key] = create()
+        while len(self._values) > self.capacity:
+            _, evicted = self._values.popitem(last=False)
+            if self.on_evict:
+                self.on_evict(evicted)
+        return value, False
@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from paraview_frames import parse_render_options, render_adaptive
+
+try:
+    from vtkmodules.vtkCommonDataModel import vtkImageData
+    HAS_VTK = True
+except ImportError:
+    HAS_VTK = False
+
+class FakeRenderView:
+    """Stands in for a pathtracer render view: every capture is a fresh render at SamplesPerPixel."""
+
+    def __init__(self, noise_scale=20.0, size=(32, 24)):
+        self.SamplesPerPixel, self.ProgressivePasses = 1, 4
+        self.rendered, self.captures = 0, 0
+        self.noise_scale, self.size = noise_scale, size
+
+    def CaptureImage(self, magnification):
+        from vtkmodules.util.numpy_support import numpy_to_vtk
+        self.captures += 1
+        samples = self.SamplesPerPixel * self.ProgressivePasses
+        self.rendered += samples
+        noise = np.random.RandomState(self.captures).standard_normal((self.size[1], self.size[0], 3))
+        pixels = np.clip(128 + self.noise_scale * noise / np.sqrt(samples), 0, 255).astype(np.uint8)
+        image = vtkImageData()
+        image.SetDimensions(self.size[0], self.size[1], 1)
+        image.GetPointData().SetScalars(numpy_to_vtk(pixels.reshape(-1, 3), deep=True))
+        return image
+
+class FakeParaView:
+    def Render(self, view):
+        raise AssertionError("render_adaptive must render through the capture only")
+
+@unittest.skipUnless(HAS_VTK, "VTK is required for the image conversion")
+class TestAdaptiveSampling(unittest.TestCase):
+    def test_levels_are_explicit_renders(self):
+        """Ensure each level is one single-pass render and a frame stopping at N samples cost under 2N"""
+        view = FakeRenderView()
+        options = parse_render_options(["script.py", "--adaptive-samples", "--noise-threshold", "0.02"])
+        pixels, samples, change, _ = render_adaptive(FakeParaView(), view, options)
+        assert view.ProgressivePasses == 1, "Levels rely on progressive accumulation!"
+        assert view.rendered < 2 * samples, f"Rendered {view.rendered} samples for a {samples} spp frame!"
+        assert change is not None and change <= 0.02, "Stopped before converging!"
+        assert 1 < samples < options["max_samples"], "Noise estimate did not stop refinement early!"
+        assert pixels.shape == (24, 32, 3), "Captured image has the wrong shape!"
+
+    def test_sample_cap_is_respected(self):
+        """Ensure a frame that never converges stops at the sample cap"""
+        view = FakeRenderView(noise_scale=5000.0)
+        options = parse_render_options(["script.py", "--adaptive-samples", "--max-samples", "16",
+                                        "--noise-threshold", "0"])
+        _, samples, _, _ = render_adaptive(FakeParaView(), view, options)
+        assert samples == 16 and view.SamplesPerPixel == 16, "Sample cap exceeded or not reached!"
+        assert view.captures == 5, f"Expected one capture per level (1-16 spp), got {view.captures}!"
+
+if __name__ == "__main__":
+    unittest.main()
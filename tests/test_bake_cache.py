@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import bake_cache
+
+class TestBakeCache(unittest.TestCase):
+    def setUp(self):
+        """Create a throwaway simulation JSON and cache directory"""
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.json_file = os.path.join(self.work_dir.name, "fluid_dynamics_animation.json")
+        with open(self.json_file, "w") as f:
+            json.dump({"data_points": [{"velocity": {"components": [1, 0, 0]}}]}, f)
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def test_key_tracks_inputs(self):
+        """Ensure the cache key changes with the JSON and the domain parameters"""
+        key = bake_cache.bake_cache_key(self.json_file, gravity=(0, 0, 0), domain_resolution=64)
+        assert key == bake_cache.bake_cache_key(self.json_file, domain_resolution=64, gravity=(0, 0, 0))
+        assert key != bake_cache.bake_cache_key(self.json_file, gravity=(0, -9.81, 0), domain_resolution=64)
+
+        with open(self.json_file, "a") as f:
+            f.write(" ")
+        assert key != bake_cache.bake_cache_key(self.json_file, gravity=(0, 0, 0), domain_resolution=64)
+
+    def test_resume_skips_baked_chunks(self):
+        """Ensure an interrupted bake resumes after its last finished chunk"""
+        cache_dir = self.work_dir.name
+        assert bake_cache.load_baked_until(cache_dir, "abc") is None
+        bake_cache.save_baked_until(cache_dir, "abc", 20)
+
+        chunks = bake_cache.plan_bake_chunks(1, 35, 10, bake_cache.load_baked_until(cache_dir, "abc"))
+        assert chunks == [(21, 30), (31, 35)], "Baked chunks not skipped!"
+        assert bake_cache.load_baked_until(cache_dir, "other") is None, "Progress of another bake reused!"
+
+    def test_complete_marker(self):
+        """Ensure a finished bake is only a hit for its own key"""
+        cache_dir = self.work_dir.name
+        bake_cache.mark_bake_complete(cache_dir, "abc", {"domain_resolution": 64})
+        assert bake_cache.is_bake_complete(cache_dir, "abc")
+        assert not bake_cache.is_bake_complete(cache_dir, "def")
+
+    def test_chunks_resume_instead_of_restarting(self):
+        """Ensure only the first chunk starts a fresh bake and later chunks resume from the last baked frame"""
+        chunks = bake_cache.plan_bake_chunks(1, 25, 10)
+        pauses = [bake_cache.resume_pause_frame(start, 1) for start, _ in chunks]
+        assert pauses == [0, 10, 20], "Chunks do not continue the simulation!"
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import storage_backends
+from delta_upload import delta_upload, restore_run
+
+class TestDeltaUpload(unittest.TestCase):
+    def setUp(self):
+        """Create an output tree and a local stand-in for the remote store"""
+        self.work_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.work_dir, "output")
+        os.makedirs(os.path.join(self.output_dir, "frames"))
+        for index in range(3):
+            with open(os.path.join(self.output_dir, "frames", f"frame_{index:04d}.png"), "wb") as f:
+                f.write(bytes([index]) * 1000)
+        with open(os.path.join(self.output_dir, "frames", "frame_0003.png"), "wb") as f:
+            f.write(bytes([0]) * 1000)  # Same content as frame_0000.png
+        self.backend = storage_backends.LocalBackend(os.path.join(self.work_dir, "remote"))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_unchanged_files_are_not_uploaded_again(self):
+        """Ensure only new contents are uploaded on a second run"""
+        first = delta_upload(self.backend, self.output_dir, "/delta", "run_1", concurrency=2)
+        assert first["files"] == 4 and first["uploaded_objects"] == 3, "Duplicate content uploaded twice!"
+
+        with open(os.path.join(self.output_dir, "frames", "frame_0002.png"), "wb") as f:
+            f.write(b"changed")
+        second = delta_upload(self.backend, self.output_dir, "/delta", "run_2", concurrency=2)
+        assert second["uploaded_objects"] == 1 and second["uploaded_bytes"] == 7, "Unchanged files re-uploaded!"
+
+    def test_restore_rebuilds_tree(self):
+        """Ensure a run can be restored byte for byte from its manifest"""
+        delta_upload(self.backend, self.output_dir, "/delta", "run_1", concurrency=2)
+        restored_dir = os.path.join(self.work_dir, "restored")
+        assert restore_run(self.backend, "/delta", "run_1", restored_dir), "Restore reported failures!"
+
+        for name in sorted(os.listdir(os.path.join(self.output_dir, "frames"))):
+            with open(os.path.join(self.output_dir, "frames", name), "rb") as original, \
+                 open(os.path.join(restored_dir, "frames", name), "rb") as copy:
+                assert original.read() == copy.read(), f"{name} restored incorrectly!"
+
+if __name__ == "__main__":
+    unittest.main()
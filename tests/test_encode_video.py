@@ -0,0 +1,117 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from encode_video import plan_segments, segment_command, rendition_outputs, base_dir_jobs, encode_jobs
+
+try:
+    import cv2
+    import numpy as np
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+def write_frames(frames_dir, count, size=(64, 48)):
+    os.makedirs(frames_dir, exist_ok=True)
+    for number in range(count):
+        frame = np.full((size[1], size[0], 3), number * 10 % 255, dtype=np.uint8)
+        cv2.imwrite(os.path.join(frames_dir, f"frame_{number:04d}.png"), frame)
+
+class TestEncodeSegmentPlan(unittest.TestCase):
+    def test_segments_are_gop_aligned(self):
+        """Ensure every segment but the last starts on a GOP boundary"""
+        segments = plan_segments(list(range(0, 250)), gop_size=24, num_workers=4)
+        assert sum(count for _, count in segments) == 250, "Frames lost while planning segments!"
+        for start, count in segments[:-1]:
+            assert count % 24 == 0, "Segment length is not a multiple of the GOP size!"
+            assert start % 24 == 0, "Segment does not start on a keyframe!"
+
+    def test_segments_cover_sequence_in_order(self):
+        """Ensure segments are contiguous and in playback order"""
+        segments = plan_segments(list(range(1, 101)), gop_size=10, num_workers=3)
+        expected_start = 1
+        for start, count in segments:
+            assert start == expected_start, "Segments are not contiguous!"
+            expected_start += count
+        assert len(segments) <= 4, "Too many segments for the worker count!"
+
+    def test_gaps_split_segments(self):
+        """Ensure no segment spans a gap in the frame numbering"""
+        segments = plan_segments([0, 1, 2, 3, 10, 11, 12], gop_size=48, num_workers=8)
+        assert segments == [(0, 4), (10, 3)], "Gap in frame numbering not respected!"
+
+    def test_empty_sequence(self):
+        """Ensure an empty folder produces no segments"""
+        assert plan_segments([], gop_size=24, num_workers=2) == []
+
+class TestMultiOutputEncode(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def task(self, sizes):
+        return {
+            "frames_dir": "frames", "start": 48, "count": 24, "framerate": 24, "gop": 24, "threads": 2,
+            "outputs": [{"segment_path": f"out{i}.mp4", "size": size} for i, size in enumerate(sizes)],
+        }
+
+    def test_single_output_has_no_filter_graph(self):
+        """Ensure a plain encode writes straight to its output without split/scale"""
+        command = segment_command(self.task([None]))
+        assert "-filter_complex" not in command and "-map" not in command, "Unneeded filter graph for one output!"
+        assert command[command.index("-start_number") + 1] == "48" and command[-1] == "out0.mp4"
+
+    def test_renditions_share_one_decode(self):
+        """Ensure several outputs are split from one input and each is mapped to its own file"""
+        command = segment_command(self.task([None, (1280, 720), (640, 360)]))
+        assert command.count("-i") == 1, "Frames are decoded more than once!"
+        graph = command[command.index("-filter_complex") + 1]
+        assert graph == ("[0:v]split=3[s0][s1][s2];[s0]null[o0];"
+                         "[s1]scale=1280:720:flags=area[o1];[s2]scale=640:360:flags=area[o2]"), f"Unexpected graph: {graph}"
+        for i in range(3):
+            position = command.index(f"[o{i}]", command.index("-filter_complex") + 2)
+            assert command[position - 1] == "-map", f"Branch {i} is not mapped!"
+            assert command.index(f"out{i}.mp4") > position, f"Output {i} written before its map!"
+            assert command[position:command.index(f"out{i}.mp4")].count("-frames:v") == 1, f"Output {i} has no encoder options!"
+
+    def test_rendition_outputs(self):
+        """Ensure the full-size video stays first, smaller renditions follow and oversized ones are skipped"""
+        renditions = [("review", (1280, 720)), ("master", (1920, 1080)), ("cinema", (3840, 2160))]
+        outputs, paths = rendition_outputs((1920, 1080), "/out/full.mp4", renditions, "/out/renditions", "frames")
+        assert outputs == [("/out/full.mp4", None), ("/out/renditions/frames_review.mp4", (1280, 720))], f"Unexpected outputs: {outputs}"
+        assert paths == {"master": "/out/full.mp4", "review": "/out/renditions/frames_review.mp4"}, f"Unexpected paths: {paths}"
+
+    @unittest.skipUnless(HAS_CV2, "OpenCV not installed")
+    def test_base_dir_adds_renditions_to_the_combined_job(self):
+        """Ensure renditions ride along with the combined animation instead of a second encode"""
+        write_frames(os.path.join(self.work_dir, "turbine_animation_frames"), 3)
+        write_frames(os.path.join(self.work_dir, "volume_layer_frames"), 3)
+        jobs = dict(base_dir_jobs(self.work_dir, [("review", (32, 24))]))
+        assert len(jobs) == 2, f"Unexpected jobs: {jobs}"
+        combined = jobs[os.path.join(self.work_dir, "turbine_animation_frames")]
+        assert combined == [(os.path.join(self.work_dir, "turbine_flow_animation.mp4"), None),
+                            (os.path.join(self.work_dir, "renditions", "turbine_animation_frames_review.mp4"), (32, 24))], \
+            f"Renditions not folded into the combined job: {combined}"
+        assert jobs[os.path.join(self.work_dir, "volume_layer_frames")] == os.path.join(self.work_dir, "volume_pass.mp4")
+
+    @unittest.skipUnless(HAS_CV2 and shutil.which("ffmpeg"), "FFmpeg or OpenCV not installed")
+    def test_encode_writes_every_rendition(self):
+        """Ensure one encode job writes each output at its own size"""
+        frames_dir = os.path.join(self.work_dir, "frames")
+        write_frames(frames_dir, 30)
+        outputs = [(os.path.join(self.work_dir, "full.mp4"), None), (os.path.join(self.work_dir, "small.mp4"), (32, 24))]
+        assert encode_jobs([(frames_dir, outputs)], num_workers=2, gop_size=12), "Encoding failed!"
+        for path, size in zip((p for p, _ in outputs), [(64, 48), (32, 24)]):
+            video = cv2.VideoCapture(path)
+            found = (int(video.get(cv2.CAP_PROP_FRAME_WIDTH)), int(video.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+            video.release()
+            assert found == size and frames == 30, f"{path}: {found} with {frames} frames"
+
+if __name__ == "__main__":
+    unittest.main()
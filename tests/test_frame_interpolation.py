@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from frame_interpolation import fill_frame_gaps, interpolate, compute_flow, reconstruction_error
+
+def blob_frame(shift, size=96):
+    """Smooth Gaussian blobs translated horizontally by `shift` pixels."""
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32)
+    image = np.zeros((size, size), np.float32)
+    for cx, cy, sigma in ((30, 40, 8.0), (55, 60, 6.0), (45, 25, 5.0)):
+        image += np.exp(-((x - cx - shift) ** 2 + (y - cy) ** 2) / (2 * sigma ** 2))
+    gray = np.clip(image * 200 + 20, 0, 255).astype(np.uint8)
+    return cv2.merge([gray, gray, gray // 2 + 100])
+
+class TestFrameInterpolation(unittest.TestCase):
+    def test_translation_is_interpolated(self):
+        """Ensure frames between two shifted keyframes match the true in-between frames"""
+        frame_a, frame_b = blob_frame(0), blob_frame(8)
+        gray_a, gray_b = cv2.cvtColor(frame_a, cv2.COLOR_BGR2GRAY), cv2.cvtColor(frame_b, cv2.COLOR_BGR2GRAY)
+        flow_ab, flow_ba = compute_flow(gray_a, gray_b), compute_flow(gray_b, gray_a)
+        assert reconstruction_error(frame_a, frame_b, flow_ab, flow_ba) < 3.0, "Plain translation rejected!"
+
+        middle = interpolate(frame_a, frame_b, flow_ab, flow_ba, 0.5).astype(np.float32)
+        truth, cross_fade = blob_frame(4).astype(np.float32), (frame_a.astype(np.float32) + frame_b) / 2
+        error = np.mean(np.abs(middle - truth))
+        assert error < 2.0, f"Interpolated frame too far from the truth ({error:.2f})!"
+        assert error < np.mean(np.abs(cross_fade - truth)) / 2, "Interpolation no better than a cross-fade!"
+
+    def test_gaps_filled_and_fallbacks_reported(self):
+        """Ensure good keyframe pairs are filled and unexplainable ones are sent back for rendering"""
+        noise = np.random.RandomState(5).randint(0, 256, (96, 96, 3)).astype(np.uint8)
+        with tempfile.TemporaryDirectory() as tmp:
+            for index, frame in ((0, blob_frame(0)), (4, blob_frame(8)), (7, noise)):
+                cv2.imwrite(os.path.join(tmp, f"frame_{index:04d}.png"), frame)
+
+            fallback = fill_frame_gaps(tmp, max_error=6.0)
+            assert fallback == [5, 6], f"Wrong frames reported for re-render: {fallback}"
+            for index in (1, 2, 3):
+                assert os.path.exists(os.path.join(tmp, f"frame_{index:04d}.png")), f"Frame {index} not interpolated!"
+            assert not os.path.exists(os.path.join(tmp, "frame_0005.png")), "Rejected gap was interpolated!"
+
+    def test_corrupt_keyframe_is_reported(self):
+        """Ensure an unreadable keyframe is reported by index instead of crashing"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cv2.imwrite(os.path.join(tmp, "frame_0000.png"), blob_frame(0))
+            with open(os.path.join(tmp, "frame_0003.png"), "wb") as f:
+                f.write(b"not a png")
+            assert fill_frame_gaps(tmp) == [1, 2, 3], "Corrupt keyframe not reported for re-render!"
+
+if __name__ == "__main__":
+    unittest.main()
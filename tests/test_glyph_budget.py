@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from glyph_budget import allocate_budget, select_glyph_indices, parse_glyph_options, show_particles
+
+class FakeProxy:
+    """Records the properties a pipeline builder sets; unknown attributes are nested proxies."""
+
+    def __init__(self, kind, **properties):
+        self.kind = kind
+        self.__dict__.update(properties)
+
+    def __getattr__(self, name):
+        child = FakeProxy(name)
+        setattr(self, name, child)
+        return child
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+class FakeParaView:
+    """Stands in for `paraview.simple`: every filter call returns a FakeProxy and is logged."""
+
+    def __init__(self):
+        self.created = []
+
+    def __getattr__(self, name):
+        def create(*args, **kwargs):
+            proxy = FakeProxy(name, **kwargs)
+            self.created.append(proxy)
+            return proxy
+        return create
+
+class TestGlyphBudget(unittest.TestCase):
+    def test_small_sets_are_not_masked(self):
+        """Ensure every point is kept when the budget is not exceeded"""
+        assert select_glyph_indices(np.ones(10), 50).tolist() == list(range(10)), "Points dropped below budget!"
+        assert len(select_glyph_indices(np.ones(10), 0)) == 10, "Zero budget should mean no cap!"
+
+    def test_budget_is_respected(self):
+        """Ensure both sampling methods return exactly the budget, without duplicates"""
+        magnitudes = np.random.RandomState(1).rand(5000)
+        for method in ("uniform", "stratified"):
+            keep = select_glyph_indices(magnitudes, 300, method)
+            assert len(keep) == 300 and len(np.unique(keep)) == 300, f"{method} sampling broke the budget!"
+
+    def test_fast_particles_are_favoured(self):
+        """Ensure sampling weights follow the velocity magnitude"""
+        magnitudes = np.concatenate([np.full(1000, 0.1), np.full(1000, 5.0)])
+        for method in ("uniform", "stratified"):
+            keep = select_glyph_indices(magnitudes, 200, method)
+            assert (keep >= 1000).sum() > (keep < 1000).sum(), f"{method} sampling ignores velocity magnitude!"
+            assert (keep < 1000).sum() > 0, f"{method} sampling hides slow regions entirely!"
+
+    def test_allocation_caps_strata(self):
+        """Ensure a stratum never receives more glyphs than it has points"""
+        allocation = allocate_budget([100.0, 1.0, 1.0], [5, 50, 50], 40)
+        assert allocation.sum() == 40 and allocation[0] == 5, "Budget not redistributed from a full stratum!"
+
+    def test_glyph_flags(self):
+        """Ensure glyph budget options are read from the command line"""
+        options = parse_glyph_options(["script.py", "--glyph-budget", "5000", "--particle-representation", "points"])
+        assert options["budget"] == 5000 and options["representation"] == "points", "Glyph flags not parsed!"
+
+    def test_budgeted_glyphs_use_every_selected_point(self):
+        """Ensure the Glyph filter does not resample the budgeted points again"""
+        pv_s = FakeParaView()
+        options = parse_glyph_options(["script.py", "--glyph-budget", "20000"])
+        _, glyph = show_particles(pv_s, FakeProxy("tracer"), FakeProxy("view"), options)
+        assert glyph.kind == "Glyph" and glyph.Input.kind == "ProgrammableFilter", "Budget mask not in front of the glyphs!"
+        assert glyph.GlyphMode == "All Points", "Glyph filter still samples the masked points!"
+
+if __name__ == "__main__":
+    unittest.main()
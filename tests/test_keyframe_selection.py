@@ -0,0 +1,33 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from paraview_frames import parse_render_options, select_frame_indices
+
+class TestKeyframeSelection(unittest.TestCase):
+    def test_full_render_by_default(self):
+        """Ensure no flags means every timestep is rendered"""
+        options = parse_render_options(["pvpython", "script.py"])
+        assert select_frame_indices(20, options) is None, "Default run should render all timesteps!"
+
+    def test_stride_keeps_last_timestep(self):
+        """Ensure a keyframe stride always includes the final timestep"""
+        options = parse_render_options(["script.py", "--keyframe-stride", "4"])
+        assert select_frame_indices(10, options) == [0, 4, 8, 9], "Wrong keyframes selected!"
+
+    def test_explicit_indices_are_clamped(self):
+        """Ensure fallback indices outside the timestep range are ignored"""
+        options = parse_render_options(["script.py", "--frame-indices", "5,2,2,40"])
+        assert select_frame_indices(10, options) == [2, 5], "Explicit indices not filtered!"
+
+    def test_adaptive_sampling_flags(self):
+        """Ensure adaptive sampling limits are read from the command line"""
+        options = parse_render_options(["script.py", "--adaptive-samples", "--max-samples", "32",
+                                        "--noise-threshold", "0.01", "--frame-time-cap", "5"])
+        assert options["adaptive_samples"], "Adaptive sampling flag ignored!"
+        assert options["max_samples"] == 32 and options["frame_time_cap"] == 5.0, "Sampling limits not parsed!"
+        assert options["noise_threshold"] == 0.01, "Noise threshold not parsed!"
+
+if __name__ == "__main__":
+    unittest.main()
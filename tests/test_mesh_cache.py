@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from mesh_cache import choose_lod, projected_size_pixels, prepare_mesh_cache, mesh_cache_key, default_cache_dir
+
+try:
+    import vtkmodules.vtkFiltersSources
+    HAS_VTK = True
+except ImportError:
+    HAS_VTK = False
+
+def write_sphere_obj(path, resolution=64):
+    from vtkmodules.vtkFiltersSources import vtkSphereSource
+    from vtkmodules.vtkIOGeometry import vtkOBJWriter
+    sphere = vtkSphereSource()
+    sphere.SetThetaResolution(resolution)
+    sphere.SetPhiResolution(resolution)
+    writer = vtkOBJWriter()
+    writer.SetFileName(path)
+    writer.SetInputConnection(sphere.GetOutputPort())
+    writer.Write()
+
+class TestMeshCache(unittest.TestCase):
+    def test_lod_selection(self):
+        """Ensure LOD choice follows explicit levels, quality profiles and screen size"""
+        levels = [5, 25, 100]
+        assert choose_lod("25", levels) == 25, "Explicit LOD not honoured!"
+        assert choose_lod("draft", levels) == 5 and choose_lod("final", levels) == 100, "Quality profile not mapped!"
+        assert choose_lod("auto", levels, screen_pixels=1000) == 100, "Large on-screen model should use full detail!"
+        assert choose_lod("auto", levels, screen_pixels=50) == 5, "Tiny on-screen model should use the coarsest LOD!"
+        assert choose_lod("10", levels) == 25, "Requested detail must not be undercut!"
+
+    def test_projected_size_shrinks_with_distance(self):
+        """Ensure the projected model size falls as the camera moves away"""
+        bounds = [-1, 1, -1, 1, -1, 1]
+        near = projected_size_pixels(bounds, [0, 0, 5], [0, 0, 0], 30.0, 1080)
+        far = projected_size_pixels(bounds, [0, 0, 50], [0, 0, 0], 30.0, 1080)
+        assert near > far * 5, "Projected size does not depend on distance!"
+
+    def test_default_cache_is_outside_the_data_bundle(self):
+        """Ensure the cache does not default into the data bundle (see pipeline_cache.py)"""
+        previous = os.environ.pop("MESH_CACHE_DIR", None)
+        try:
+            bundle = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+            assert not os.path.abspath(default_cache_dir()).startswith(bundle), "Mesh cache defaults into the data bundle!"
+            os.environ["MESH_CACHE_DIR"] = "/tmp/meshes"
+            assert default_cache_dir() == "/tmp/meshes", "MESH_CACHE_DIR not honoured!"
+        finally:
+            os.environ.pop("MESH_CACHE_DIR", None)
+            if previous is not None:
+                os.environ["MESH_CACHE_DIR"] = previous
+
+    @unittest.skipUnless(HAS_VTK, "VTK is not installed")
+    def test_cache_builds_once_with_decimated_levels(self):
+        """Ensure the cache holds smaller LODs and is reused on the second call"""
+        with tempfile.TemporaryDirectory() as tmp:
+            model = os.path.join(tmp, "model.obj")
+            write_sphere_obj(model)
+            manifest = prepare_mesh_cache(model, os.path.join(tmp, "cache"))
+            triangles = {percent: level["triangles"] for percent, level in manifest["levels"].items()}
+            assert triangles[100] > triangles[25] > triangles[5] > 0, "LOD levels not decimated!"
+            assert abs(triangles[25] / triangles[100] - 0.25) < 0.05, "LOD 25% has the wrong triangle count!"
+
+            mtime = os.path.getmtime(manifest["levels"][100]["path"])
+            again = prepare_mesh_cache(model, os.path.join(tmp, "cache"))
+            assert again["key"] == mesh_cache_key(model), "Cache key changed for the same model!"
+            assert os.path.getmtime(again["levels"][100]["path"]) == mtime, "Cache rebuilt for an unchanged model!"
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import paraview_parallel
+import paraview_pipelines
+from paraview_parallel import parse_parallel_options, should_redistribute, resolve_particle_mode, partition_count, \
+    configure_parallel_view
+from particle_advection import parse_particle_options
+from glyph_budget import parse_glyph_options
+
+class FakeProxy:
+    """Records the properties a pipeline builder sets; unknown attributes are nested proxies."""
+
+    def __init__(self, kind, **properties):
+        self.kind = kind
+        self.__dict__.update(properties)
+
+    def __getattr__(self, name):
+        child = FakeProxy(name)
+        setattr(self, name, child)
+        return child
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+class FakeParaView:
+    """Stands in for `paraview.simple`: every filter call returns a FakeProxy and is logged.
+
+    String properties such as SeedType='Line' select a sub-proxy, as in ParaView.
+    """
+
+    def __init__(self):
+        self.created = []
+
+    def __getattr__(self, name):
+        def create(*args, **kwargs):
+            kwargs = {key: FakeProxy(value) if isinstance(value, str) else value for key, value in kwargs.items()}
+            proxy = FakeProxy(name, **kwargs)
+            self.created.append(proxy)
+            return proxy
+        return create
+
+    def kinds(self):
+        return [proxy.kind for proxy in self.created]
+
+def fake_fluid():
+    bounds = [0.0, 1.0, 0.0, 1.0, 0.0, 1.0]
+    return FakeProxy("fluid", GetDataInformation=lambda: FakeProxy("info", GetBounds=lambda: bounds))
+
+def with_ranks(ranks):
+    """Patches the rank count seen by every pipeline builder."""
+    return mock.patch.multiple(paraview_parallel, partition_count=lambda: ranks), \
+        mock.patch.object(paraview_pipelines, "partition_count", lambda: ranks)
+
+class TestParaViewParallel(unittest.TestCase):
+    def test_parallel_flags(self):
+        """Ensure redistribution flags are read from the command line and validated"""
+        options = parse_parallel_options(["script.py", "--redistribute", "ON", "--partition-boundary", "unique"])
+        assert options == {"redistribute": "on", "boundary": "unique"}, "Parallel flags not parsed!"
+        with self.assertRaises(ValueError):
+            parse_parallel_options(["script.py", "--partition-boundary", "ghost"])
+
+    def test_auto_redistribution(self):
+        """Ensure auto mode only redistributes when there is more than one rank"""
+        assert not should_redistribute("auto", 1), "Serial runs should not redistribute!"
+        assert should_redistribute("auto", 4), "Parallel runs should redistribute!"
+        assert not should_redistribute("off", 4) and should_redistribute("on", 1), "Explicit modes ignored!"
+
+    def test_particle_mode_fallback(self):
+        """Ensure parallel runs use stream tracing instead of the serial advection engine"""
+        assert resolve_particle_mode("advect", 1) == "advect", "Serial advection should be kept!"
+        assert resolve_particle_mode("advect", 2) == "streamlines", "Advection must not run on partitioned data!"
+        assert resolve_particle_mode("streamlines", 2) == "streamlines", "Stream tracing should be kept!"
+
+    def test_serial_outside_paraview(self):
+        """Ensure plain Python counts as a single rank"""
+        assert partition_count() >= 1, "Invalid partition count!"
+
+    def build_particle_layer(self, ranks, mode):
+        pv_s, fluid = FakeParaView(), fake_fluid()
+        patch_parallel, patch_pipelines = with_ranks(ranks)
+        engine = mock.Mock(side_effect=AssertionError("advection engine built on partitioned data"))
+        with patch_parallel, patch_pipelines, mock.patch.object(paraview_pipelines, "attach_particle_engine", engine):
+            _, _, before_frame = paraview_pipelines.show_particle_layer(
+                pv_s, fluid, FakeProxy("view"), parse_particle_options(["script.py", "--particle-mode", mode]),
+                parse_glyph_options(["script.py"]), parse_parallel_options(["script.py"]))
+        return pv_s, fluid, before_frame
+
+    def test_parallel_particles_trace_redistributed_data(self):
+        """Ensure MPI runs force stream tracing on a RedistributeDataSet in front of the tracer"""
+        pv_s, fluid, before_frame = self.build_particle_layer(4, "advect")
+        tracer = next(proxy for proxy in pv_s.created if proxy.kind == "StreamTracer")
+        assert before_frame is None, "Advection engine used with several ranks!"
+        assert tracer.Input.kind == "RedistributeDataSet" and tracer.Input.Input is fluid, "Tracer not fed redistributed data!"
+        assert pv_s.kinds().index("RedistributeDataSet") < pv_s.kinds().index("StreamTracer"), "Redistribution after the tracer!"
+
+    def test_serial_particles_are_not_redistributed(self):
+        """Ensure a single rank traces the data as it is read"""
+        pv_s, fluid, _ = self.build_particle_layer(1, "streamlines")
+        tracer = next(proxy for proxy in pv_s.created if proxy.kind == "StreamTracer")
+        assert "RedistributeDataSet" not in pv_s.kinds() and tracer.Input is fluid, "Serial run redistributed!"
+
+    def test_parallel_volume_calculates_on_redistributed_data(self):
+        """Ensure the volume calculator runs on every rank's region and the view composites sort-last"""
+        pv_s, fluid, view = FakeParaView(), fake_fluid(), FakeProxy("view")
+        patch_parallel, patch_pipelines = with_ranks(4)
+        with patch_parallel, patch_pipelines:
+            _, calc = paraview_pipelines.show_volume(pv_s, fluid, view, parse_parallel_options(["script.py"]))
+            assert configure_parallel_view(view) == 4, "Rank count not reported!"
+        assert calc.Input.kind == "RedistributeDataSet" and calc.Input.Input is fluid, "Calculator not fed redistributed data!"
+        assert calc.Input.BoundaryMode == "Split cells", "Default boundary mode not applied!"
+        assert view.RemoteRenderThreshold == 0, "Geometry may still be gathered to rank 0!"
+
+if __name__ == "__main__":
+    unittest.main()
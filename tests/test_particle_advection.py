@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from particle_advection import VelocityLattice, ParticleEngine, parse_particle_options, seed_line
+
+BOUNDS = [0.0, 1.0, 0.0, 1.0, 0.0, 1.0]
+
+def mesh_points(n=6):
+    axis = np.linspace(0.0, 1.0, n)
+    z, y, x = np.meshgrid(axis, axis, axis, indexing="ij")
+    return np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+
+class TestParticleAdvection(unittest.TestCase):
+    def test_trilinear_is_exact_for_linear_fields(self):
+        """Ensure lattice interpolation reproduces a linear velocity field"""
+        lattice = VelocityLattice(BOUNDS, 5, points=mesh_points())
+        nodes = lattice.node_coordinates()
+        grid = np.stack([nodes[:, 0], 2 * nodes[:, 1], np.zeros(len(nodes))], axis=1)
+        grid = grid.reshape(lattice.dims[2], lattice.dims[1], lattice.dims[0], 3)
+        query = np.array([[0.33, 0.71, 0.5], [0.9, 0.1, 0.2]])
+        values, inside = lattice.interpolate(grid, query)
+        assert inside.all(), "Points inside the domain flagged as outside!"
+        assert np.allclose(values[:, 0], query[:, 0]) and np.allclose(values[:, 1], 2 * query[:, 1]), "Trilinear interpolation wrong!"
+
+    def test_uniform_flow_moves_particles_one_step(self):
+        """Ensure particles advance by velocity * dt per timestep"""
+        points = mesh_points()
+        lattice = VelocityLattice(BOUNDS, 5, points=points)
+        grid = lattice.gather(np.tile([0.1, 0.0, 0.0], (len(points), 1)))
+        engine = ParticleEngine(lattice, seed_line([0, 0.5, 0.5], [0, 0.5, 0.5], 0), inject_rate=1)
+        engine.advance(grid, grid, 2.0)
+        assert np.allclose(engine.positions[0], [0.2, 0.5, 0.5]), "Particle not advected by one timestep!"
+        assert engine.ages.tolist() == [1, 0], "New particle not injected after the step!"
+
+    def test_injected_particles_carry_the_local_velocity(self):
+        """Ensure new particles are sampled from the lattice instead of starting at rest"""
+        points = mesh_points()
+        lattice = VelocityLattice(BOUNDS, 5, points=points)
+        grid = lattice.gather(np.tile([0.1, 0.0, 0.0], (len(points), 1)))
+        engine = ParticleEngine(lattice, [[0.0, 0.5, 0.5]], inject_rate=1, grid=grid)
+        assert np.allclose(engine.velocities, [[0.1, 0.0, 0.0]]), "First particle injected at rest!"
+        engine.advance(grid, grid, 1.0)
+        assert np.allclose(engine.velocities, [[0.1, 0.0, 0.0]] * 2), f"Injected velocities wrong: {engine.velocities}"
+
+    def test_reset_restarts_from_the_seed_line(self):
+        """Ensure a reset engine matches a freshly constructed one"""
+        points = mesh_points()
+        lattice = VelocityLattice(BOUNDS, 5, points=points)
+        grid = lattice.gather(np.tile([0.1, 0.0, 0.0], (len(points), 1)))
+        seeds = seed_line([0, 0.2, 0.5], [0, 0.8, 0.5], 4)
+        engine = ParticleEngine(lattice, seeds, inject_rate=2)
+        engine.advance(grid, grid, 1.0)
+        engine.reset()
+        fresh = ParticleEngine(lattice, seeds, inject_rate=2)
+        assert np.allclose(engine.positions, fresh.positions) and engine.ages.tolist() == fresh.ages.tolist(), \
+            "Reset engine differs from a new one!"
+
+    def test_particles_retire_outside_domain_and_with_age(self):
+        """Ensure particles leaving the domain or exceeding max age are removed"""
+        points = mesh_points()
+        lattice = VelocityLattice(BOUNDS, 5, points=points)
+        grid = lattice.gather(np.tile([0.3, 0.0, 0.0], (len(points), 1)))
+        engine = ParticleEngine(lattice, [[0.0, 0.5, 0.5]], inject_rate=1, max_age=2, max_particles=10)
+        for _ in range(5):
+            engine.advance(grid, grid, 1.0)
+        assert engine.ages.max() <= 2 and (engine.positions[:, 0] <= 1.0).all(), "Old or escaped particles kept!"
+
+    def test_particle_flags(self):
+        """Ensure the particle engine options are read from the command line"""
+        options = parse_particle_options(["script.py", "--particle-mode", "streamlines", "--inject-rate", "50"])
+        assert options["mode"] == "streamlines" and options["inject_rate"] == 50, "Particle flags not parsed!"
+
+if __name__ == "__main__":
+    unittest.main()
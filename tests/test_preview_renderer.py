@@ -0,0 +1,86 @@
+import os
+import sys
+import zlib
+import base64
+import tempfile
+import unittest
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from vtk_xml_reader import read_dataset
+from preview_renderer import write_png, render_preview
+from pvd_index import write_pvd
+
+def compressed_binary(values):
+    """Encodes an array like VTK's zlib-compressed inline binary format (UInt32 header)."""
+    payload = zlib.compress(values.tobytes())
+    header = np.array([1, values.nbytes, values.nbytes, len(payload)], dtype="<u4").tobytes()
+    return (base64.b64encode(header) + base64.b64encode(payload)).decode("ascii")
+
+def write_grid_vtu(path, points, velocity, compressed):
+    if compressed:
+        attributes = 'format="binary"'
+        point_text, velocity_text = compressed_binary(points.astype("<f4")), compressed_binary(velocity.astype("<f4"))
+        header = ' header_type="UInt32" compressor="vtkZLibDataCompressor"'
+    else:
+        attributes = 'format="ascii"'
+        point_text, velocity_text = " ".join(map(str, points.ravel())), " ".join(map(str, velocity.ravel()))
+        header = ""
+    with open(path, "w") as f:
+        f.write(f'''<?xml version="1.0"?>
+<VTKFile type="UnstructuredGrid" version="1.0" byte_order="LittleEndian"{header}>
+  <UnstructuredGrid>
+    <Piece NumberOfPoints="{len(points)}" NumberOfCells="0">
+      <PointData><DataArray type="Float32" Name="Velocity" NumberOfComponents="3" {attributes}>{velocity_text}</DataArray></PointData>
+      <Points><DataArray type="Float32" NumberOfComponents="3" {attributes}>{point_text}</DataArray></Points>
+    </Piece>
+  </UnstructuredGrid>
+</VTKFile>''')
+
+def grid(n=12):
+    axis = np.linspace(-1.0, 1.0, n)
+    z, y, x = np.meshgrid(axis, axis, axis, indexing="ij")
+    points = np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+    velocity = np.stack([np.ones(len(points)), points[:, 0], np.zeros(len(points))], axis=1)
+    return points, velocity
+
+class TestPreviewRenderer(unittest.TestCase):
+    def test_reader_ascii_and_compressed_binary(self):
+        """Ensure both inline encodings decode to the same arrays"""
+        points, velocity = grid(4)
+        with tempfile.TemporaryDirectory() as tmp:
+            for compressed in (False, True):
+                path = os.path.join(tmp, f"grid_{compressed}.vtu")
+                write_grid_vtu(path, points, velocity, compressed)
+                dataset = read_dataset(path)
+                assert np.allclose(dataset["points"], points), "Points decoded incorrectly!"
+                assert np.allclose(dataset["point_data"]["Velocity"], velocity), "Velocity decoded incorrectly!"
+
+    def test_png_writer_round_trip(self):
+        """Ensure the pure-Python PNG writer produces a valid image"""
+        pixels = np.random.RandomState(3).randint(0, 256, (20, 30, 3)).astype(np.uint8)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "frame.png")
+            write_png(path, pixels)
+            assert np.array_equal(cv2.imread(path)[:, :, ::-1], pixels), "PNG content changed on disk!"
+
+    def test_preview_frames_layout(self):
+        """Ensure one frame_NNNN.png per timestep is written at the requested size"""
+        points, velocity = grid()
+        with tempfile.TemporaryDirectory() as tmp:
+            entries = []
+            for step in range(3):
+                write_grid_vtu(os.path.join(tmp, f"step_{step}.vtu"), points, velocity * (step + 1), compressed=True)
+                entries.append({"timestep": float(step), "file": f"step_{step}.vtu"})
+            write_pvd(os.path.join(tmp, "flow.pvd"), entries)
+
+            frames_dir = os.path.join(tmp, "preview_frames")
+            assert render_preview(os.path.join(tmp, "flow.pvd"), frames_dir, resolution=(160, 90)) == 3, "Wrong frame count!"
+            assert sorted(os.listdir(frames_dir)) == ["frame_0000.png", "frame_0001.png", "frame_0002.png"], "Wrong frame names!"
+            frame = cv2.imread(os.path.join(frames_dir, "frame_0002.png"))
+            assert frame.shape == (90, 160, 3), "Preview frame has the wrong size!"
+            assert frame.std() > 5, "Preview frame is blank!"
+
+if __name__ == "__main__":
+    unittest.main()
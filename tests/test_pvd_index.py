@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import pvd_index
+
+PVD_TEXT = """<?xml version="1.0"?>
+<VTKFile type="Collection" version="0.1" byte_order="LittleEndian">
+  <Collection>
+    <DataSet timestep="0.2" group="" part="0" file="turbine_flow_animation_0002.vtu"/>
+    <DataSet timestep="0.0" group="" part="0" file="turbine_flow_animation_0000.vtu"/>
+    <DataSet timestep="0.1" group="" part="0" file="turbine_flow_animation_0001.vtu"/>
+    <DataSet timestep="0.3" group="" part="0" file="turbine_flow_animation_0003.vtu"/>
+    <DataSet timestep="0.4" group="" part="0" file="turbine_flow_animation_0004.vtu"/>
+  </Collection>
+</VTKFile>
+"""
+
+class TestPvdIndex(unittest.TestCase):
+    def test_entries_sorted_by_timestep(self):
+        """Ensure datasets come back in render order"""
+        datasets = pvd_index.parse_pvd(PVD_TEXT)
+        assert [d["timestep"] for d in datasets] == [0.0, 0.1, 0.2, 0.3, 0.4]
+        assert datasets[0]["file"] == "turbine_flow_animation_0000.vtu"
+
+    def test_time_window_and_stride(self):
+        """Ensure only timesteps inside the window at the requested stride are kept"""
+        datasets = pvd_index.parse_pvd(PVD_TEXT)
+        selected = pvd_index.select_datasets(datasets, time_start=0.1, time_end=0.4, stride=2)
+        assert [d["timestep"] for d in selected] == [0.1, 0.3], "Wrong timesteps selected!"
+
+    def test_round_trip(self):
+        """Ensure a filtered collection can be written and read back"""
+        datasets = pvd_index.select_datasets(pvd_index.parse_pvd(PVD_TEXT), stride=2)
+        with tempfile.TemporaryDirectory() as work_dir:
+            path = os.path.join(work_dir, "subset.pvd")
+            pvd_index.write_pvd(path, datasets)
+            with open(path, "rb") as f:
+                assert pvd_index.parse_pvd(f.read()) == datasets, "PVD round trip changed the entries!"
+
+    def test_selective_download_lists_only_arrived_datasets(self):
+        """Ensure the local .pvd never references a dataset that has not been downloaded yet"""
+        import download_dropbox_files
+        with tempfile.TemporaryDirectory() as work_dir:
+            remote, local = os.path.join(work_dir, "remote"), os.path.join(work_dir, "local")
+            os.makedirs(os.path.join(remote, "run", "vtk_output"))
+            with open(os.path.join(remote, "run", "vtk_output", "flow.pvd"), "w") as f:
+                f.write(PVD_TEXT)
+            for i in range(5):
+                with open(os.path.join(remote, "run", "vtk_output", f"turbine_flow_animation_000{i}.vtu"), "w") as f:
+                    f.write("vtu")
+
+            local_pvd = os.path.join(local, "vtk_output", "flow.pvd")
+            listed = []
+            download = download_dropbox_files.download_file_atomically
+
+            def checked_download(backend, remote_path, local_path, chunk_size=None):
+                if os.path.exists(local_pvd):
+                    with open(local_pvd, "rb") as f:
+                        entries = pvd_index.parse_pvd(f.read())
+                    missing = [e["file"] for e in entries if not os.path.exists(os.path.join(local, "vtk_output", e["file"]))]
+                    assert not missing, f"PVD lists datasets that have not arrived: {missing}"
+                    listed.append(len(entries))
+                download(backend, remote_path, local_path)
+
+            environment = {"STORAGE_BACKEND": "local", "LOCAL_STORAGE_ROOT": remote}
+            with mock.patch.dict(os.environ, environment), \
+                    mock.patch.object(download_dropbox_files, "download_file_atomically", checked_download):
+                ok = download_dropbox_files.download_selected_timesteps(
+                    "/run", local, None, None, None, os.path.join(work_dir, "download.log"),
+                    "vtk_output/flow.pvd", stride=2)
+            assert ok, "Selective download failed!"
+            assert listed == [1, 2], f"PVD not extended as datasets arrived: {listed}"
+            with open(local_pvd, "rb") as f:
+                assert [e["timestep"] for e in pvd_index.parse_pvd(f.read())] == [0.0, 0.2, 0.4], "Final PVD incomplete!"
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from render_budget import RenderBudgetController, MIN_SAMPLES, MIN_RESOLUTION_PERCENTAGE, output_size
+
+class TestRenderBudgetController(unittest.TestCase):
+    def test_first_frame_uses_requested_quality(self):
+        """Ensure the first frame renders with the requested settings"""
+        controller = RenderBudgetController(600, 10, 128, start_time=0.0)
+        settings = controller.next_settings(now=0.0)
+        assert settings["samples"] == 128 and settings["resolution_percentage"] == 100
+
+    def test_generous_budget_keeps_quality(self):
+        """Ensure quality is untouched when frames fit comfortably in the budget"""
+        controller = RenderBudgetController(1000, 10, 128, start_time=0.0)
+        controller.record(1, 10.0, controller.next_settings(now=0.0))
+        assert controller.next_settings(now=10.0)["samples"] == 128, "Quality lowered without need!"
+
+    def test_tight_budget_lowers_samples(self):
+        """Ensure slow frames reduce samples for the remaining frames"""
+        controller = RenderBudgetController(200, 10, 128, start_time=0.0)
+        controller.record(1, 60.0, controller.next_settings(now=0.0))
+        settings = controller.next_settings(now=60.0)
+        assert MIN_SAMPLES <= settings["samples"] < 128, "Samples not reduced under a tight budget!"
+        assert settings["adaptive_threshold"] > 0.01, "Adaptive threshold not loosened!"
+
+    def test_exhausted_budget_lowers_resolution(self):
+        """Ensure resolution drops to its floor once samples are at their minimum"""
+        controller = RenderBudgetController(100, 10, 128, start_time=0.0)
+        controller.record(1, 90.0, controller.next_settings(now=0.0))
+        settings = controller.next_settings(now=95.0)
+        assert settings["samples"] == MIN_SAMPLES
+        assert settings["resolution_percentage"] == MIN_RESOLUTION_PERCENTAGE
+
+    def test_output_size_matches_blender(self):
+        """Ensure the full frame size used to rescale reduced frames follows Blender's rounding"""
+        assert output_size(1920, 1080, 100) == (1920, 1080), "Full size changed!"
+        assert output_size(1920, 1080, 50) == (960, 540), "Half size wrong!"
+        assert output_size(1001, 999, 75) == (750, 749), "Percentage not truncated like Blender!"
+
+if __name__ == "__main__":
+    unittest.main()
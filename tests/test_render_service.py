@@ -0,0 +1,53 @@
+import os
+import sys
+import json
+import threading
+import socketserver
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from warm_cache import WarmCache
+from paraview_render_client import submit
+
+class StubJobHandler(socketserver.StreamRequestHandler):
+    """Answers a render job like the service: accepted, one progress event per frame, done."""
+
+    def handle(self):
+        job = json.loads(self.rfile.readline())
+        self.server.jobs.append(job)
+        events = [{"event": "accepted", "pass": job["pass"], "warm": False, "timesteps": 2}]
+        events += [{"event": "progress", "frame": i, "done": i + 1, "total": 2} for i in range(2)]
+        events.append({"event": "done", "output_dir": job["output_dir"], "seconds": 0.1, "warm": False})
+        for event in events:
+            self.wfile.write((json.dumps(event) + "\n\n").encode("utf-8"))
+
+class TestRenderService(unittest.TestCase):
+    def test_cache_evicts_least_recently_used(self):
+        """Ensure the dataset used longest ago is released first"""
+        evicted = []
+        cache = WarmCache(2, on_evict=evicted.append)
+        assert cache.get("a", lambda: "A") == ("A", False), "New dataset reported as warm!"
+        cache.get("b", lambda: "B")
+        assert cache.get("a", lambda: "A2") == ("A", True), "Cached dataset not reused!"
+        cache.get("c", lambda: "C")
+        assert evicted == ["B"] and "a" in cache and "b" not in cache, f"Wrong dataset evicted: {evicted}"
+        assert len(cache) == 2, "Cache grew past its capacity!"
+
+    def test_client_streams_job_events(self):
+        """Ensure submit() sends one JSON line and yields every event line the service streams back"""
+        server = socketserver.TCPServer(("127.0.0.1", 0), StubJobHandler)
+        server.jobs = []
+        thread = threading.Thread(target=server.handle_request, daemon=True)
+        thread.start()
+        try:
+            job = {"type": "render", "pass": "volume", "pvd": "/data/flow.pvd", "output_dir": "/out", "args": ["--keyframe-stride", "2"]}
+            events = list(submit(job, port=server.server_address[1], timeout=10))
+        finally:
+            thread.join(10)
+            server.server_close()
+        assert server.jobs == [job], f"Job not received intact: {server.jobs}"
+        assert [event["event"] for event in events] == ["accepted", "progress", "progress", "done"], f"Events lost: {events}"
+        assert events[-1]["output_dir"] == "/out", "Done event garbled!"
+
+if __name__ == "__main__":
+    unittest.main()
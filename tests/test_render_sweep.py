@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from render_sweep import expand_sweep, create_queue, claim_job, finish_job, queue_status, default_queue_dir
+
+class TestRenderSweep(unittest.TestCase):
+    def test_grid_and_list_expansion(self):
+        """Ensure grids expand to their cartesian product and explicit variants are appended"""
+        spec = {"base": {"num_frames": 5},
+                "grid": {"scale_factor": [1.0, 2.0], "rotation_z": [0, 90]},
+                "variants": [{"name": "hero", "cycles_samples": 512}]}
+        variants = expand_sweep(spec, base={"cycles_samples": 128, "blender_scene_file": "scene.blend"})
+        assert len(variants) == 5, "Wrong number of variants!"
+        assert all(v["params"]["num_frames"] == 5 for v in variants), "Base parameters not applied!"
+        assert variants[-1]["name"] == "hero" and variants[-1]["params"]["cycles_samples"] == 512, "Explicit variant lost!"
+        assert variants[0]["params"]["cycles_samples"] == 128, "Simulation defaults not inherited!"
+        assert "blender_scene_file" not in variants[0]["params"], "Non-sweep keys leaked into variants!"
+
+    def test_unknown_parameters_are_rejected(self):
+        """Ensure typos in parameter names fail before any render starts"""
+        with self.assertRaises(ValueError):
+            expand_sweep({"variants": [{"scale_facter": 2.0}]})
+
+    def test_names_collide_after_sanitizing(self):
+        """Ensure names that map to the same file name are rejected as duplicates"""
+        with self.assertRaises(ValueError):
+            expand_sweep({"variants": [{"name": "hero a"}, {"name": "hero_a"}]})
+
+    def test_queue_is_outside_the_output_tree(self):
+        """Ensure the queue is not written where the renders get uploaded from"""
+        with tempfile.TemporaryDirectory() as output_root:
+            queue = default_queue_dir(output_root)
+            assert not os.path.abspath(queue).startswith(os.path.abspath(output_root)), "Queue inside the output folder!"
+            assert queue == default_queue_dir(os.path.join(output_root, ".")), "Queue not stable for the same output folder!"
+
+    def test_queue_claims_each_job_once(self):
+        """Ensure every job is handed out exactly once and done jobs are not re-queued"""
+        variants = expand_sweep({"grid": {"rotation_z": [0, 45, 90]}})
+        with tempfile.TemporaryDirectory() as queue:
+            assert create_queue(queue, variants) == 3, "Jobs not queued!"
+            claimed = []
+            while True:
+                job = claim_job(queue)
+                if job is None:
+                    break
+                claimed.append(job["name"])
+                finish_job(queue, job, job["name"] != "rotation_z-90")
+            assert sorted(claimed) == sorted(v["name"] for v in variants), "Jobs claimed twice or lost!"
+            status = queue_status(queue)
+            assert len(status["done"]) == 2 and status["failed"] == ["rotation_z-90"], "Wrong final job states!"
+            assert create_queue(queue, variants) == 1, "Only the failed variant should be queued again!"
+
+    def test_live_jobs_stay_running_and_dead_ones_are_requeued(self):
+        """Ensure a second sweep leaves jobs of live workers alone and recovers jobs of dead ones"""
+        variants = expand_sweep({"grid": {"rotation_z": [0, 90]}})
+        with tempfile.TemporaryDirectory() as queue:
+            create_queue(queue, variants)
+            live, dead = claim_job(queue), claim_job(queue)
+            finished = subprocess.Popen([sys.executable, "-c", "pass"])
+            finished.wait()
+            dead_path = os.path.join(queue, "running", f"{dead['name']}.json")
+            with open(dead_path, "r") as f:
+                job = json.load(f)
+            job["claimed_by"]["pid"] = finished.pid
+            with open(dead_path, "w") as f:
+                json.dump(job, f)
+
+            assert create_queue(queue, variants) == 1, "Live job queued a second time!"
+            status = queue_status(queue)
+            assert status["running"] == [live["name"]], "Job of a live worker taken away!"
+            assert status["pending"] == [dead["name"]], "Job of a dead worker not recovered!"
+
+    def test_removed_variants_are_dropped_from_pending(self):
+        """Ensure pending jobs of variants no longer in the spec are not rendered"""
+        variants = expand_sweep({"grid": {"rotation_z": [0, 45, 90]}})
+        with tempfile.TemporaryDirectory() as queue:
+            create_queue(queue, variants)
+            assert create_queue(queue, variants[:1]) == 1, "Wrong number of jobs queued!"
+            assert queue_status(queue)["pending"] == [variants[0]["name"]], "Stale pending jobs kept!"
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from renditions import area_weights, downscale_area, parse_rendition, contact_sheet
+
+class TestRenditions(unittest.TestCase):
+    def test_rendition_spec(self):
+        """Ensure rendition specs are parsed into name and size"""
+        assert parse_rendition("review:1280x720") == ("review", (1280, 720)), "Rendition spec not parsed!"
+
+    def test_odd_rendition_size_is_rejected(self):
+        """Ensure sizes libx264 cannot encode as yuv420p fail before the encode starts"""
+        with self.assertRaises(ValueError):
+            parse_rendition("review:1279x719")
+
+    def test_contact_sheet_skips_unreadable_frames(self):
+        """Ensure a corrupt frame is left out of the contact sheet instead of crashing it"""
+        import cv2
+        work_dir = tempfile.mkdtemp()
+        try:
+            for number in range(3):
+                cv2.imwrite(os.path.join(work_dir, f"frame_{number:04d}.png"), np.full((48, 64, 3), 90, dtype=np.uint8))
+            with open(os.path.join(work_dir, "frame_0001.png"), "wb") as f:
+                f.write(b"not a png")
+            sheet_path = contact_sheet(work_dir, os.path.join(work_dir, "sheet", "contact_sheet.png"), columns=3, thumb_width=32)
+            sheet = cv2.imread(sheet_path)
+            assert sheet is not None and sheet.shape == (24, 64, 3), "Unreadable frame not skipped!"
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def test_area_weights_preserve_mass(self):
+        """Ensure every output pixel averages exactly one output-pixel area of input"""
+        weights = area_weights(1920, 1280)
+        assert np.allclose(weights.sum(axis=1), 1.0), "Area weights do not sum to one!"
+
+    def test_integer_factor_matches_block_mean(self):
+        """Ensure a 2x downscale equals the mean of each 2x2 block"""
+        image = np.random.RandomState(0).randint(0, 256, (8, 12, 3)).astype(np.float32)
+        expected = image.reshape(4, 2, 6, 2, 3).mean(axis=(1, 3))
+        assert np.allclose(downscale_area(image, (6, 4)), expected, atol=1e-4), "Area downscale differs from block mean!"
+
+    def test_constant_image_stays_constant(self):
+        """Ensure a non-integer downscale keeps flat colors exact"""
+        image = np.full((1080, 1920, 3), 137, dtype=np.uint8)
+        small = downscale_area(image, (1280, 720))
+        assert small.shape == (720, 1280, 3) and small.dtype == np.uint8, "Wrong output shape or type!"
+        assert (small == 137).all(), "Flat color changed by the downscale!"
+
+if __name__ == "__main__":
+    unittest.main()
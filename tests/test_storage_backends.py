@@ -0,0 +1,87 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import storage_backends
+from dropbox_emulator import start_emulator
+
+class TestStorageBackends(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch folder with one small and one multi-chunk file"""
+        self.work_dir = tempfile.mkdtemp()
+        self.small_file = os.path.join(self.work_dir, "small.txt")
+        self.large_file = os.path.join(self.work_dir, "large.bin")
+        with open(self.small_file, "wb") as f:
+            f.write(b"turbine")
+        with open(self.large_file, "wb") as f:
+            f.write(os.urandom(300 * 1024))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def round_trip(self, backend):
+        backend.upload_file(self.small_file, "/run/small.txt", chunk_size=64 * 1024)
+        backend.upload_file(self.large_file, "/run/frames/large.bin", chunk_size=64 * 1024)
+
+        listed = dict(backend.list_files("/run"))
+        assert listed == {"/run/small.txt": 7, "/run/frames/large.bin": 300 * 1024}, f"Unexpected listing: {listed}"
+        assert backend.exists("/run/small.txt") and not backend.exists("/run/missing.txt")
+
+        target = os.path.join(self.work_dir, "copy.bin")
+        backend.download_to_file("/run/frames/large.bin", target, chunk_size=16 * 1024)
+        with open(target, "rb") as copy, open(self.large_file, "rb") as original:
+            assert copy.read() == original.read(), "Downloaded content differs from upload!"
+        assert backend.download("/run/small.txt") == b"turbine"
+
+    def test_local_backend(self):
+        """Ensure the local filesystem backend stores and lists files"""
+        self.round_trip(storage_backends.LocalBackend(os.path.join(self.work_dir, "remote")))
+
+    def test_http_emulator_backend(self):
+        """Ensure the emulator handles listing, downloads and chunked upload sessions"""
+        server, url = start_emulator(os.path.join(self.work_dir, "emulated"))
+        try:
+            self.round_trip(storage_backends.HttpEmulatorBackend(url))
+        finally:
+            server.shutdown()
+
+    def test_incomplete_backend_fails_on_construction(self):
+        """Ensure a backend missing part of the interface cannot be instantiated"""
+        class ListOnlyBackend(storage_backends.StorageBackend):
+            def list_files(self, folder):
+                return []
+
+        with self.assertRaises(TypeError):
+            ListOnlyBackend()
+
+    def test_download_folder_recreates_empty_folders(self):
+        """Ensure mirroring a folder also creates its empty remote subfolders"""
+        from download_dropbox_files import download_folder
+        remote_root = os.path.join(self.work_dir, "emulated")
+        os.makedirs(os.path.join(remote_root, "run", "frames", "empty"))
+        with open(os.path.join(remote_root, "run", "frames", "frame_0000.png"), "wb") as f:
+            f.write(b"png")
+        server, url = start_emulator(remote_root)
+        try:
+            for backend in (storage_backends.LocalBackend(remote_root), storage_backends.HttpEmulatorBackend(url)):
+                target = os.path.join(self.work_dir, f"mirror_{backend.name}")
+                with open(os.devnull, "w") as log_file:
+                    downloaded = download_folder(backend, "/run", target, log_file, verbose=False)
+                assert downloaded == [os.path.join(target, "frames", "frame_0000.png")], f"{backend.name}: wrong files: {downloaded}"
+                assert os.path.isdir(os.path.join(target, "frames", "empty")), f"{backend.name}: empty folder not recreated!"
+        finally:
+            server.shutdown()
+
+    def test_emulator_removes_sessions_on_shutdown(self):
+        """Ensure the emulator deletes its upload session folder when stopped"""
+        server, _ = start_emulator(os.path.join(self.work_dir, "emulated"))
+        session_dir = server.state.session_dir
+        assert os.path.isdir(session_dir), "Session folder was not created!"
+        server.shutdown()
+        assert not os.path.exists(session_dir), f"Session folder leaked: {session_dir}"
+
+if __name__ == "__main__":
+    unittest.main()
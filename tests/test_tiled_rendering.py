@@ -0,0 +1,142 @@
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import paraview_frames
+from paraview_frames import parse_render_options, plan_tiles, tile_camera, render_tiled
+
+try:
+    from vtkmodules.vtkRenderingCore import vtkCamera
+    HAS_VTK = True
+except ImportError:
+    HAS_VTK = False
+
+def project(camera, aspect, point):
+    """Returns normalized device coordinates of a world point."""
+    matrix = camera.GetCompositeProjectionTransformMatrix(aspect, -1, 1)
+    x, y, z, w = matrix.MultiplyPoint(list(point) + [1.0])
+    return x / w, y / w
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+class FakeCamera:
+    def __init__(self):
+        self.angle, self.center = 30.0, (0.0, 0.0)
+
+    def GetViewAngle(self):
+        return self.angle
+
+    def SetViewAngle(self, angle):
+        self.angle = angle
+
+    def GetWindowCenter(self):
+        return self.center
+
+    def SetWindowCenter(self, x, y):
+        self.center = (x, y)
+
+class FakeTileView:
+    """Stands in for a pathtracer view: noise falls with 1/sqrt(spp) and every sample costs a second."""
+
+    def __init__(self, clock, noise_scales):
+        self.clock, self.noise_scales = clock, noise_scales
+        self.camera = FakeCamera()
+        self.ViewSize, self.SamplesPerPixel, self.ProgressivePasses = [0, 0], 1, 1
+        self.captures = []
+
+    def GetActiveCamera(self):
+        return self.camera
+
+    def CaptureImage(self, magnification):
+        from vtkmodules.util.numpy_support import numpy_to_vtk
+        from vtkmodules.vtkCommonDataModel import vtkImageData
+        tile = len(self.captures) % len(self.noise_scales)
+        self.captures.append((self.camera.center, self.SamplesPerPixel))
+        self.clock.now += self.SamplesPerPixel
+        width, height = self.ViewSize
+        noise = np.random.RandomState(len(self.captures)).standard_normal((height, width, 3))
+        pixels = np.clip(128 + self.noise_scales[tile] * noise / np.sqrt(self.SamplesPerPixel), 0, 255).astype(np.uint8)
+        image = vtkImageData()
+        image.SetDimensions(width, height, 1)
+        image.GetPointData().SetScalars(numpy_to_vtk(pixels.reshape(-1, 3), deep=True))
+        return image
+
+class TestTiledRendering(unittest.TestCase):
+    def test_tiles_cover_the_image_exactly(self):
+        """Ensure tiles partition the output without gaps or overlaps"""
+        tiles = plan_tiles([7680, 4320], [1920, 1080])
+        assert len(tiles) == 16, "8K should need 4x4 HD tiles!"
+        assert sum(w * h for _, _, w, h in tiles) == 7680 * 4320, "Tiles do not cover the image!"
+        assert plan_tiles([1920, 1080], [1920, 1080], 512) == [(0, 0, 1920, 1080)], "HD output should not be tiled!"
+
+    def test_memory_cap_shrinks_tiles(self):
+        """Ensure the per-tile framebuffer stays under the memory cap"""
+        tiles = plan_tiles([3840, 2160], [3840, 2160], memory_mb=64, bytes_per_pixel=64)
+        assert all(w * h * 64 <= 64 * 1024 * 1024 for _, _, w, h in tiles), "Tile exceeds the memory cap!"
+
+    def test_tiling_flags(self):
+        """Ensure tiling limits are read from the command line"""
+        options = parse_render_options(["script.py", "--resolution", "7680x4320", "--max-tile-size", "1280x720"])
+        assert options["resolution"] == [7680, 4320] and options["max_tile_size"] == [1280, 720], "Tile flags not parsed!"
+
+    @unittest.skipUnless(HAS_VTK, "VTK is not installed")
+    def test_tile_camera_matches_full_frame(self):
+        """Ensure a point lands on the same output pixel in the full and the tiled render"""
+        resolution = [4000, 2000]
+        camera = vtkCamera()
+        camera.SetPosition(3, 2, 5)
+        camera.SetFocalPoint(0, 0, 0)
+        camera.SetViewUp(0, 0, 1)
+        point = (0.4, -0.3, 0.2)
+        nx, ny = project(camera, resolution[0] / resolution[1], point)
+        px, py = (nx + 1) / 2 * resolution[0], (ny + 1) / 2 * resolution[1]
+
+        tile = next(t for t in plan_tiles(resolution, [1500, 900])
+                    if t[0] <= px < t[0] + t[2] and t[1] <= py < t[1] + t[3])
+        angle, center = tile_camera(resolution, tile, camera.GetViewAngle())
+        camera.SetViewAngle(angle)
+        camera.SetWindowCenter(*center)
+        tx, ty = project(camera, tile[2] / tile[3], point)
+        assert abs(tile[0] + (tx + 1) / 2 * tile[2] - px) < 1e-6, "Tile camera shifts the image horizontally!"
+        assert abs(tile[1] + (ty + 1) / 2 * tile[3] - py) < 1e-6, "Tile camera shifts the image vertically!"
+
+    @unittest.skipUnless(HAS_VTK, "VTK is not installed")
+    def test_adaptive_tiles_share_one_sample_count(self):
+        """Ensure every tile ends at the sample count the noisiest tile needs"""
+        clock = FakeClock()
+        tiles = plan_tiles([64, 48], [32, 24])
+        view = FakeTileView(clock, [50.0, 0.0, 0.0, 0.0])
+        options = parse_render_options(["script.py", "--adaptive-samples", "--noise-threshold", "0.02",
+                                        "--frame-time-cap", "100000"])
+        with mock.patch.object(paraview_frames, "time", types.SimpleNamespace(time=clock.time)):
+            pixels, samples, change, _ = render_tiled(None, view, [64, 48], tiles, options)
+        assert pixels.shape == (48, 64, 3), "Stitched frame has the wrong shape!"
+        assert 1 < samples < options["max_samples"] and change <= 0.02, f"Noisy tile not refined: {samples} spp, change {change}"
+        assert len(view.captures) % len(tiles) == 0, "A refinement level skipped some tiles!"
+        assert {spp for _, spp in view.captures[-len(tiles):]} == {samples}, "Tiles ended at different sample counts!"
+        assert view.camera.center == (0.0, 0.0) and view.camera.angle == 30.0, "Camera not restored after tiling!"
+
+    @unittest.skipUnless(HAS_VTK, "VTK is not installed")
+    def test_frame_time_cap_covers_all_tiles(self):
+        """Ensure the time cap limits the whole frame, not each tile"""
+        clock = FakeClock()
+        tiles = plan_tiles([64, 48], [32, 24])
+        view = FakeTileView(clock, [5000.0] * len(tiles))
+        options = parse_render_options(["script.py", "--adaptive-samples", "--noise-threshold", "0",
+                                        "--frame-time-cap", "20"])
+        with mock.patch.object(paraview_frames, "time", types.SimpleNamespace(time=clock.time)):
+            _, samples, _, seconds = render_tiled(None, view, [64, 48], tiles, options)
+        # 4 tiles: 4 s at 1 spp, 8 s at 2 spp; 4 spp would take 16 s more and overrun the 20 s budget
+        assert samples == 2 and seconds == 12, f"Frame budget not shared: {samples} spp in {seconds} s"
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from timeseries_store import convert_pvd, TimeSeriesStore, mesh_grid, to_unstructured_grid
+from vtk_xml_reader import read_dataset
+from pvd_index import write_pvd
+
+try:
+    import vtkmodules.vtkIOXML
+    HAS_VTK = True
+except ImportError:
+    HAS_VTK = False
+
+def write_series(directory, steps=6, n=10, moving_mesh=False):
+    """Writes a hexahedral grid series with an evolving Velocity field as zlib-compressed .vtu files."""
+    from vtkmodules.vtkCommonDataModel import vtkImageData
+    from vtkmodules.vtkFiltersCore import vtkAppendFilter
+    from vtkmodules.vtkIOXML import vtkXMLUnstructuredGridWriter
+    from vtkmodules.util.numpy_support import numpy_to_vtk
+
+    image = vtkImageData()
+    image.SetDimensions(n, n, n)
+    image.SetSpacing(0.1, 0.1, 0.1)
+    append = vtkAppendFilter()
+    append.SetInputData(image)
+    append.Update()
+    grid = append.GetOutput()
+    points = np.array([grid.GetPoint(i) for i in range(grid.GetNumberOfPoints())])
+
+    entries = []
+    for step in range(steps):
+        if moving_mesh and step == steps - 1:
+            grid.GetPoints().SetPoint(0, -1.0, -1.0, -1.0)
+        velocity = np.stack([np.sin(points[:, 0] + 0.01 * step), points[:, 1], np.full(len(points), 0.5)], axis=1)
+        array = numpy_to_vtk(velocity.astype(np.float32), deep=True)
+        array.SetName("Velocity")
+        grid.GetPointData().AddArray(array)
+        pressure = numpy_to_vtk(np.full(grid.GetNumberOfCells(), float(step)), deep=True)
+        pressure.SetName("Pressure")
+        grid.GetCellData().AddArray(pressure)
+        writer = vtkXMLUnstructuredGridWriter()
+        writer.SetFileName(os.path.join(directory, f"step_{step}.vtu"))
+        writer.SetInputData(grid)
+        writer.SetCompressorTypeToZLib()
+        writer.Write()
+        entries.append({"timestep": 0.5 * step, "file": f"step_{step}.vtu"})
+    write_pvd(os.path.join(directory, "flow.pvd"), entries)
+    return entries
+
+@unittest.skipUnless(HAS_VTK, "VTK is required to write the test series")
+class TestTimeSeriesStore(unittest.TestCase):
+    def test_round_trip_with_delta_encoding(self):
+        """Ensure every timestep decodes bit-exactly, in any access order"""
+        with tempfile.TemporaryDirectory() as tmp:
+            entries = write_series(tmp)
+            store_path = os.path.join(tmp, "flow.tss")
+            index = convert_pvd(os.path.join(tmp, "flow.pvd"), store_path, keyframe_interval=4)
+            assert [r["point_data"]["Velocity"]["encoding"] for r in index["timesteps"]][:5] == \
+                ["raw", "delta", "delta", "delta", "raw"], "Keyframes not placed every 4 steps!"
+
+            with TimeSeriesStore(store_path) as store:
+                assert store.times == [entry["timestep"] for entry in entries], "Timesteps not preserved!"
+                source = read_dataset(os.path.join(tmp, entries[0]["file"]))
+                mesh = store.mesh()
+                for name in ("points", "connectivity", "offsets", "types"):
+                    assert np.array_equal(mesh[name], source[name]), f"Mesh array {name} changed!"
+                for step in (3, 0, 5, 1, 2, 2):
+                    expected = read_dataset(os.path.join(tmp, entries[step]["file"]))
+                    assert np.array_equal(store.array(step, "Velocity"), expected["point_data"]["Velocity"]), \
+                        f"Velocity of step {step} not bit-exact!"
+                    assert np.array_equal(store.array(step, "Pressure", "cell_data"), expected["cell_data"]["Pressure"]), \
+                        f"Cell data of step {step} not bit-exact!"
+
+    def test_store_is_smaller_than_xml_series(self):
+        """Ensure storing the mesh once makes the store smaller than the .vtu files"""
+        with tempfile.TemporaryDirectory() as tmp:
+            entries = write_series(tmp)
+            store_path = os.path.join(tmp, "flow.tss")
+            convert_pvd(os.path.join(tmp, "flow.pvd"), store_path)
+            xml_bytes = sum(os.path.getsize(os.path.join(tmp, entry["file"])) for entry in entries)
+            assert os.path.getsize(store_path) < xml_bytes / 2, "Store is not meaningfully smaller!"
+
+    def test_uncompressed_arrays_are_memory_mapped(self):
+        """Ensure raw stores hand out views of the mapped file instead of copies"""
+        with tempfile.TemporaryDirectory() as tmp:
+            entries = write_series(tmp, steps=2)
+            store_path = os.path.join(tmp, "flow.tss")
+            convert_pvd(os.path.join(tmp, "flow.pvd"), store_path, compression="none", delta=False)
+            store = TimeSeriesStore(store_path)
+            velocity = store.array(1, "Velocity")
+            assert not velocity.flags.owndata and not velocity.flags.writeable, "Array was copied, not mapped!"
+            expected = read_dataset(os.path.join(tmp, entries[1]["file"]))["point_data"]["Velocity"]
+            assert np.array_equal(velocity, expected), "Mapped array has the wrong content!"
+            del velocity
+            store.close()
+
+    def test_changing_mesh_is_rejected(self):
+        """Ensure a series whose mesh changes over time is not silently stored"""
+        with tempfile.TemporaryDirectory() as tmp:
+            write_series(tmp, steps=3, moving_mesh=True)
+            with self.assertRaises(ValueError):
+                convert_pvd(os.path.join(tmp, "flow.pvd"), os.path.join(tmp, "flow.tss"))
+            assert not os.path.exists(os.path.join(tmp, "flow.tss")), "Partial store left behind!"
+
+    def test_unstructured_grid_conversion(self):
+        """Ensure a stored timestep rebuilds the same VTK grid"""
+        with tempfile.TemporaryDirectory() as tmp:
+            write_series(tmp, steps=2, n=4)
+            store_path = os.path.join(tmp, "flow.tss")
+            convert_pvd(os.path.join(tmp, "flow.pvd"), store_path)
+            with TimeSeriesStore(store_path) as store:
+                grid = to_unstructured_grid(store.read_timestep(1))
+            assert grid.GetNumberOfPoints() == 64 and grid.GetNumberOfCells() == 27, "Grid size changed!"
+            assert grid.GetCellType(0) == 11, "Voxel cells not preserved!"
+            assert grid.GetPointData().GetArray("Velocity").GetNumberOfComponents() == 3, "Velocity array missing!"
+
+    def test_mesh_is_built_once_and_shared(self):
+        """Ensure timesteps reuse the decoded mesh and only convert their field arrays"""
+        with tempfile.TemporaryDirectory() as tmp:
+            write_series(tmp, steps=3, n=4)
+            store_path = os.path.join(tmp, "flow.tss")
+            convert_pvd(os.path.join(tmp, "flow.pvd"), store_path)
+            with TimeSeriesStore(store_path) as store:
+                assert store.mesh() is store.mesh(), "Mesh decoded again on every call!"
+                base = mesh_grid(store.mesh())
+                first = to_unstructured_grid(store.read_fields(1), base=base)
+                second = to_unstructured_grid(store.read_fields(2), base=base)
+                expected = to_unstructured_grid(store.read_timestep(2))
+            assert first.GetPoints() is base.GetPoints() and second.GetCells() is base.GetCells(), "Mesh copied per timestep!"
+            assert base.GetPointData().GetNumberOfArrays() == 0, "Field arrays leaked into the shared mesh!"
+            velocity = second.GetPointData().GetArray("Velocity")
+            reference = expected.GetPointData().GetArray("Velocity")
+            assert all(velocity.GetTuple3(i) == reference.GetTuple3(i) for i in range(64)), "Field arrays differ!"
+
+if __name__ == "__main__":
+    unittest.main()
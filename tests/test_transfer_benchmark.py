@@ -0,0 +1,43 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+import storage_backends
+from dropbox_emulator import start_emulator
+from transfer_benchmark import run_benchmark
+
+class TestTransferBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def check_results(self, results):
+        settings = [(r["direction"], r["concurrency"]) for r in results]
+        assert settings == [("upload", 1), ("download", 1), ("upload", 4), ("download", 4)], f"Settings not all measured: {settings}"
+        assert all(r["failures"] == 0 for r in results), f"Transfers failed: {results}"
+        assert all(r["files_per_second"] > 0 and r["chunk_size_mb"] == 0.004 for r in results), "Rates or chunk sizes not reported!"
+
+    def test_local_backend(self):
+        """Ensure every concurrency setting uploads and downloads the whole file set"""
+        backend = storage_backends.LocalBackend(os.path.join(self.work_dir, "remote"))
+        results = run_benchmark(backend, self.work_dir, 3, 10 * 1024, [1, 4], [4096])
+        self.check_results(results)
+        listed = backend.list_files("/")
+        assert len(listed) == 6 and all(size == 10 * 1024 for _, size in listed), "Uploaded files incomplete!"
+
+    def test_http_emulator_backend(self):
+        """Ensure the benchmark runs against the in-process emulator with chunked transfers"""
+        server, url = start_emulator(os.path.join(self.work_dir, "emulated"))
+        try:
+            results = run_benchmark(storage_backends.HttpEmulatorBackend(url), self.work_dir, 3, 10 * 1024, [1, 4], [4096])
+        finally:
+            server.shutdown()
+        self.check_results(results)
+
+if __name__ == "__main__":
+    unittest.main()